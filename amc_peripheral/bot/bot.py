@@ -1,5 +1,4 @@
 import asyncio
-import aiohttp
 import logging
 import discord
 from discord.ext import commands
@@ -7,6 +6,7 @@ from ..settings import DISCORD_TOKEN, GUILD_ID
 from .knowledge_cog import KnowledgeCog
 from .translation_cog import TranslationCog
 from .utils_cog import UtilsCog
+from ..utils.http_utils import close_shared_session, create_http_session
 
 log = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ class AMCBot(commands.Bot):
         self.http_session = None
 
     async def setup_hook(self):
-        self.http_session = aiohttp.ClientSession()
+        self.http_session = create_http_session()
         # Load Cogs
         await self.add_cog(KnowledgeCog(self))
         await self.add_cog(TranslationCog(self))
@@ -44,6 +44,13 @@ class AMCBot(commands.Bot):
 
         self.add_command(commands.Command(sync_prefix, name="sync"))
 
+    async def close(self):
+        # Cogs unload inside super().close() and may still use the session
+        await super().close()
+        if self.http_session is not None:
+            await self.http_session.close()
+        await close_shared_session()
+
     async def on_ready(self):
         # pyrefly: ignore [missing-attribute]
         log.info(f"Logged in as {self.user} (ID: {self.user.id})")
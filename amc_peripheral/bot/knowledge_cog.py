@@ -36,6 +36,9 @@ from amc_peripheral.memory.retrieval import MemoryRetrieval
 
 log = logging.getLogger(__name__)
 
+# Forum threads whose history is read at the same time
+THREAD_FETCH_CONCURRENCY = 8
+
 
 class KnowledgeCog(commands.Cog):
     def __init__(self, bot):
@@ -67,6 +70,13 @@ class KnowledgeCog(commands.Cog):
         self._memory_storage: Optional[MemoryStorage] = None
         self._memory_retrieval: Optional[MemoryRetrieval] = None
 
+        # Chat lines are queued as (row, add_to_chromadb) and written in batches;
+        # a None on the queue tells the writer to flush its batch and exit
+        self._memory_queue: asyncio.Queue[Optional[tuple[dict, bool]]] = asyncio.Queue()
+        self._memory_flush_task: Optional[asyncio.Task] = None
+        self._memory_batch_size = 32
+        self._memory_flush_interval = 0.25
+
     async def cog_load(self):
         # Initialize long-term memory storage
         try:
@@ -93,6 +103,9 @@ class KnowledgeCog(commands.Cog):
         for menu in self.ctx_menus:
             self.bot.tree.add_command(menu)
         
+        # Start batched memory writer
+        self._memory_flush_task = asyncio.create_task(self._flush_memory_queue())
+
         # Start SSE listener for backend events
         self._sse_task = asyncio.create_task(self._listen_backend_events())
 
@@ -100,6 +113,19 @@ class KnowledgeCog(commands.Cog):
         # Cancel SSE listener
         if self._sse_task:
             self._sse_task.cancel()
+
+        # Stop the memory writer once it has written its current batch,
+        # then flush whatever is still queued
+        if self._memory_flush_task:
+            self._memory_queue.put_nowait(None)
+            await self._memory_flush_task
+        pending = []
+        while not self._memory_queue.empty():
+            item = self._memory_queue.get_nowait()
+            if item is not None:
+                pending.append(item)
+        if pending:
+            await self._write_memory_batch(pending)
         
         # Close memory storage
         if self._memory_storage:
@@ -498,7 +524,8 @@ Results are limited to 100 rows. Database is read-only.""",
             # Add assistant message to conversation
             messages.append(response_message)
 
-            # Execute tool calls
+            # Execute tool calls; they are independent, so run them together
+            calls = []
             for tool_call in response_message.tool_calls:
                 function_name = tool_call.function.name
                 function_args = json.loads(tool_call.function.arguments)
@@ -506,16 +533,17 @@ Results are limited to 100 rows. Database is read-only.""",
                 log.info(
                     f"Knowledge bot calling tool: {function_name} with args: {function_args}"
                 )
+                calls.append(self._execute_tool(function_name, function_args, interaction))
 
-                # Call the appropriate tool
-                tool_result = await self._execute_tool(function_name, function_args, interaction)
+            tool_results = await asyncio.gather(*calls)
 
-                # Add tool result to messages
+            # Add tool results to messages, in the order they were called
+            for tool_call, tool_result in zip(response_message.tool_calls, tool_results):
                 messages.append(
                     {
                         "tool_call_id": tool_call.id,
                         "role": "tool",
-                        "name": function_name,
+                        "name": tool_call.function.name,
                         "content": tool_result,
                     }
                 )
@@ -571,7 +599,9 @@ Results are limited to 100 rows. Database is read-only.""",
                 if not sql:
                     return "Database query failed: sql parameter required"
                 
-                result = game_db.execute_raw_query(sql)
+                # Each query opens its own read-only connection, so it can run
+                # in a worker thread alongside other tool calls
+                result = await asyncio.to_thread(game_db.execute_raw_query, sql)
                 
                 # Handle errors
                 if "error" in result:
@@ -677,31 +707,54 @@ Results are limited to 100 rows. Database is read-only.""",
     # --- Thread Fetching ---
 
     async def _fetch_thread_contents(self, channel, **history_kwargs):
-        acc = ""
-        threads = []
-        if isinstance(channel, discord.ForumChannel):
-            # Fetch active threads first
-            threads = list(channel.threads)
-            active_count = len(threads)
-            # Then add archived threads
-            async for archived in channel.archived_threads(limit=None):
-                threads.append(archived)
-            log.info(f"Fetched {len(threads)} threads ({active_count} active, {len(threads) - active_count} archived)")
-        elif hasattr(channel, "threads"):  # TextChannel with threads
-            threads = list(channel.threads)
-
-        for thread in threads:
-            acc += f"## {thread.name}\n"
+        # Threads are independent, so each history read starts as soon as its
+        # thread is known, without waiting for the archive listing to finish
+        semaphore = asyncio.Semaphore(THREAD_FETCH_CONCURRENCY)
+        tasks = []
+
+        def fetch(thread):
+            tasks.append(
+                asyncio.create_task(
+                    self._fetch_thread(thread, semaphore, **history_kwargs)
+                )
+            )
+
+        try:
+            if isinstance(channel, discord.ForumChannel):
+                # Fetch active threads first
+                for thread in channel.threads:
+                    fetch(thread)
+                active_count = len(tasks)
+                # Then add archived threads
+                async for archived in channel.archived_threads(limit=None):
+                    fetch(archived)
+                log.info(f"Fetched {len(tasks)} threads ({active_count} active, {len(tasks) - active_count} archived)")
+            elif hasattr(channel, "threads"):  # TextChannel with threads
+                for thread in channel.threads:
+                    fetch(thread)
+
+            contents = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return "".join(contents)
+
+    async def _fetch_thread(self, thread, semaphore, **history_kwargs):
+        async with semaphore:
+            parts = [f"## {thread.name}\n"]
             async for msg in thread.history(oldest_first=True, **history_kwargs):
-                acc += f"{msg.content}\n\n"
+                parts.append(f"{msg.content}\n\n")
                 for attachment in msg.attachments:
                     if attachment.filename.lower().endswith(".txt"):
                         try:
                             content = (await attachment.read()).decode("utf-8")
-                            acc += f"--- Attachment: {attachment.filename} ---\n{content}\n\n"
+                            parts.append(
+                                f"--- Attachment: {attachment.filename} ---\n{content}\n\n"
+                            )
                         except Exception:
                             pass
-        return acc
+            return "".join(parts)
 
     async def fetch_forum_messages(self, forum_channel: discord.ForumChannel):
         acc = await self._fetch_thread_contents(forum_channel)
@@ -787,6 +840,54 @@ Results are limited to 100 rows. Database is read-only.""",
                 log.error(f"SSE connection error: {e}")
                 await asyncio.sleep(5)  # Reconnect delay
 
+    async def _write_memory_batch(self, batch: list[tuple[dict, bool]]):
+        """Write a batch of queued chat lines to long-term memory.
+
+        Both stores are written from worker threads so the event loop keeps
+        serving Discord while SQLite and ChromaDB do their I/O.
+        """
+        if self._memory_storage:
+            try:
+                await self._memory_storage.astore_messages([row for row, _ in batch])
+            except Exception as e:
+                log.warning(f"Failed to store messages in memory: {e}")
+
+        semantic = [row for row, add_to_chromadb in batch if add_to_chromadb]
+        if self._memory_retrieval and semantic:
+            try:
+                await asyncio.to_thread(self._memory_retrieval.add_memories, semantic)
+            except Exception as e:
+                log.warning(f"Failed to add memories to ChromaDB: {e}")
+
+    async def _flush_memory_queue(self):
+        """Drain the memory queue every 250ms or 32 messages, whichever first.
+
+        Returns after writing the batch in hand once a None is dequeued.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._memory_queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self._memory_flush_interval
+            while len(batch) < self._memory_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._memory_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write_memory_batch(batch)
+            if stopping:
+                return
+
     async def _handle_backend_event(self, event: dict):
         """Handle events from backend SSE stream."""
         if event.get("type") == "chat_message":
@@ -796,33 +897,20 @@ Results are limited to 100 rows. Database is read-only.""",
             timestamp = datetime.fromisoformat(event["timestamp"])
             discord_id = event.get("discord_id")
             
-            # Store in long-term memory (SQLite)
-            if self._memory_storage:
-                try:
-                    self._memory_storage.store_message(
-                        player_id=player_id,
-                        player_name=player_name,
-                        message=message,
-                        source="game_chat",
-                        timestamp=timestamp,
-                        discord_user_id=str(discord_id) if discord_id else None,
-                    )
-                except Exception as e:
-                    log.warning(f"Failed to store message in memory: {e}")
-            
-            # Add to semantic search (ChromaDB)
-            if self._memory_retrieval:
-                try:
-                    self._memory_retrieval.add_memory(
-                        player_id=player_id,
-                        player_name=player_name,
-                        message=message,
-                        source="game_chat",
-                        timestamp=timestamp,
-                        discord_user_id=str(discord_id) if discord_id else None,
-                    )
-                except Exception as e:
-                    log.warning(f"Failed to add memory to ChromaDB: {e}")
+            # Queue for long-term memory (SQLite + ChromaDB)
+            self._memory_queue.put_nowait(
+                (
+                    {
+                        "player_id": player_id,
+                        "player_name": player_name,
+                        "message": message,
+                        "source": "game_chat",
+                        "timestamp": timestamp,
+                        "discord_user_id": str(discord_id) if discord_id else None,
+                    },
+                    True,
+                )
+            )
             
             # Track message history per player (in-memory for quick access)
             if player_id not in self._player_message_history:
@@ -845,7 +933,8 @@ Results are limited to 100 rows. Database is read-only.""",
                 semantic_context = ""
                 if self._memory_retrieval:
                     try:
-                        memories = self._memory_retrieval.retrieve_relevant(
+                        memories = await asyncio.to_thread(
+                            self._memory_retrieval.retrieve_relevant,
                             player_id=player_id,
                             query=message,
                             n_results=3,
@@ -896,19 +985,20 @@ Results are limited to 100 rows. Database is read-only.""",
             answer = await self.ai_helper(player_name, message, full_context)
             await announce_in_game(self.bot.http_session, answer[:520])
             
-            # Store bot response in long-term memory
-            if self._memory_storage:
-                try:
-                    self._memory_storage.store_message(
-                        player_id=player_id,
-                        player_name="Bot",
-                        message=answer,
-                        source="game_chat",
-                        is_bot_response=True,
-                        discord_user_id=str(discord_id) if discord_id else None,
-                    )
-                except Exception as e:
-                    log.warning(f"Failed to store bot response: {e}")
+            # Store bot response in long-term memory (SQLite only)
+            self._memory_queue.put_nowait(
+                (
+                    {
+                        "player_id": player_id,
+                        "player_name": "Bot",
+                        "message": answer,
+                        "source": "game_chat",
+                        "is_bot_response": True,
+                        "discord_user_id": str(discord_id) if discord_id else None,
+                    },
+                    False,
+                )
+            )
         except Exception as e:
             log.error(f"Bot command error for {player_name}: {e}")
             await announce_in_game(self.bot.http_session, f"{e}")
@@ -1,4 +1,5 @@
 import logging
+import re
 import discord
 from discord import app_commands, Locale
 from discord.ext import commands
@@ -25,6 +26,13 @@ from amc_peripheral.db import RadioDB
 
 log = logging.getLogger(__name__)
 
+# Discord timestamp prefix on Eco messages, e.g. <t:1234567890:t>
+TIMESTAMP_PREFIX_RE = re.compile(r'^<t:\d+:[tTdDfFR]>\s*')
+# **Username:** (MotorTown) or **Username**: (Eco) at the start of a message
+BOLD_USERNAME_RE = re.compile(r'^(?:\*\*([^*]+?)(?::\*\*|\*\*:))\s*(.*)$', re.DOTALL)
+# Plain Username: prefix
+PLAIN_USERNAME_RE = re.compile(r'^([^:]+?):\s*(.*)$', re.DOTALL)
+
 GAME_GLOSSARY = """
 Keep these gaming/technical terms unchanged: 
 - Gaming terms: coil, spawn, respawn, AFK, GG, DC, lag, ping, fps, coords, waypoint, cargo, trailer, hub, zone, stash, loot, buff, debuff, meta, OP.
@@ -99,21 +107,19 @@ class TranslationCog(commands.Cog):
         - MotorTown game: '**Username:** content'
         - Regular: '**Username**: content' or 'Username: content'
         """
-        import re
-        
         # Strip Discord timestamp prefix if present (Eco format)
         # Format: <t:1234567890:t> or <t:1234567890:R> etc.
-        message = re.sub(r'^<t:\d+:[tTdDfFR]>\s*', '', message)
+        message = TIMESTAMP_PREFIX_RE.sub('', message)
         
         # Match **Username:** or **Username**: or Username: at start of message
         # MotorTown uses **username:** (colon inside bold)
         # Eco uses **username**: (colon outside bold)
-        match = re.match(r'^(?:\*\*([^*]+?)(?::\*\*|\*\*:))\s*(.*)$', message, re.DOTALL)
+        match = BOLD_USERNAME_RE.match(message)
         if match:
             return match.group(1).strip(), match.group(2).strip()
         
         # Fallback: simple Username: format
-        match = re.match(r'^([^:]+?):\s*(.*)$', message, re.DOTALL)
+        match = PLAIN_USERNAME_RE.match(message)
         if match and len(match.group(1)) < 50:  # Reasonable username length
             return match.group(1).strip(), match.group(2).strip()
         
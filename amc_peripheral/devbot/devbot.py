@@ -5,12 +5,12 @@ Main entry point for the JARVIS Discord bot.
 """
 
 import asyncio
-import aiohttp
 import logging
 import discord
 from discord.ext import commands
 from amc_peripheral.settings import DISCORD_TOKEN_DEV, GUILD_ID
 from .devbot_cog import DevBotCog
+from amc_peripheral.utils.http_utils import create_http_session
 
 log = logging.getLogger(__name__)
 
@@ -27,7 +27,7 @@ class AMCDevBot(commands.Bot):
 
     async def setup_hook(self):
         """Initialize bot resources and load cogs."""
-        self.http_session = aiohttp.ClientSession()
+        self.http_session = create_http_session()
 
         # Load JARVIS Cog
         await self.add_cog(DevBotCog(self))
@@ -38,6 +38,13 @@ class AMCDevBot(commands.Bot):
         synced = await self.tree.sync(guild=guild)
         log.info(f"JARVIS synced {len(synced)} commands to guild {GUILD_ID}")
 
+    async def close(self):
+        """Shut down the bot, then close the shared HTTP session."""
+        # Cogs unload inside super().close() and may still use the session
+        await super().close()
+        if self.http_session is not None:
+            await self.http_session.close()
+
     async def on_ready(self):
         """Called when bot is ready."""
         # pyrefly: ignore [missing-attribute]
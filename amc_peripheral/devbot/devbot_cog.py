@@ -4,8 +4,11 @@ JARVIS Dev Bot Cog - LLM-powered codebase assistant.
 Handles @mentions, tool calling, and guide generation.
 """
 
+import asyncio
 import json
 import logging
+import re
+import uuid
 from typing import Any, Optional
 import discord
 from discord.ext import commands
@@ -18,9 +21,164 @@ from amc_peripheral.settings import (
 )
 from amc_peripheral.utils.text_utils import split_markdown
 from .codebase_tools import CodebaseTools
+from .tool_cache import ToolCacheStorage
 
 log = logging.getLogger(__name__)
 
+# Matches user mentions in both <@id> and legacy nickname <@!id> forms
+MENTION_RE = re.compile(r"<@!?(\d+)>")
+
+# Tool results larger than this are paged through get_more
+TOOL_RESULT_MAX_CHARS = 4096
+# Tool results older than this many LLM turns are replaced with a stub
+TOOL_RESULT_KEEP_TURNS = 3
+# Once the conversation exceeds this many characters, older tool results
+# are stubbed early until it fits again
+CONTEXT_MAX_CHARS = 16_000
+
+# Tool definitions for LLM
+TOOL_DEFINITIONS: tuple[dict[str, Any], ...] = (
+    {
+        "type": "function",
+        "function": {
+            "name": "search_files",
+            "description": "Search for files in the monorepo by name or glob pattern. Use this to find files when you know part of the filename.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Glob pattern or filename to search for (e.g., 'flake.nix', '*.py', '**/mods.nix')",
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Maximum number of results (default 20)",
+                        "default": 20,
+                    },
+                },
+                "required": ["pattern"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "read_file",
+            "description": "Read contents of a specific file from the monorepo. You can optionally specify line ranges to read only part of the file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Relative path to file from repo root",
+                    },
+                    "start_line": {
+                        "type": "integer",
+                        "description": "Start line number (1-indexed, inclusive)",
+                    },
+                    "end_line": {
+                        "type": "integer",
+                        "description": "End line number (1-indexed, inclusive)",
+                    },
+                },
+                "required": ["path"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "grep_search",
+            "description": "Search for text patterns or code snippets in files. Use this to find where specific functions, variables, or configuration values are defined or used.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Text or code pattern to search for",
+                    },
+                    "path": {
+                        "type": "string",
+                        "description": "Directory or file path to search in (default: '.' for entire repo)",
+                        "default": ".",
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Maximum number of results (default 30)",
+                        "default": 30,
+                    },
+                },
+                "required": ["query"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "list_directory",
+            "description": "List files and subdirectories in a directory. Useful for exploring the structure of the codebase.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Relative path to directory (default: '.' for root)",
+                        "default": ".",
+                    },
+                    "recursive": {
+                        "type": "boolean",
+                        "description": "Whether to list recursively (default: False)",
+                        "default": False,
+                    },
+                },
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "nix_hash_url",
+            "description": "Calculate the Nix hash for a URL. Returns an SRI hash suitable for use in fetchzip, fetchurl, or other Nix fetchers. Use this when you need to add a mod or package that downloads from a URL.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The URL to fetch and calculate the hash for (e.g., 'https://mod.io/download/...')",
+                    },
+                    "unpack": {
+                        "type": "boolean",
+                        "description": "Whether to unpack the archive before hashing (use True for fetchzip, False for fetchurl). Default: True",
+                        "default": True,
+                    },
+                },
+                "required": ["url"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_more",
+            "description": "Fetch the next page of a tool result that was cut off. Use the continuation_token and offset returned with the truncated result.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "continuation_token": {
+                        "type": "string",
+                        "description": "Token returned with the truncated result",
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Character offset to continue reading from",
+                    },
+                },
+                "required": ["continuation_token", "offset"],
+            },
+        },
+    },
+)
+
 
 class DevBotCog(commands.Cog):
     """JARVIS cog providing codebase assistance via LLM with tool calling."""
@@ -31,14 +189,37 @@ class DevBotCog(commands.Cog):
         self.ai_model = JARVIS_AI_MODEL
         self.allowed_channels = JARVIS_ALLOWED_CHANNELS
 
-        # Initialize OpenAI client
-        self.openai_client = AsyncOpenAI(
-            api_key=OPENAI_API_KEY_OPENROUTER,
-            base_url="https://openrouter.ai/api/v1",
-        )
-
-        # Initialize codebase tools
+        # OpenAI client and codebase tools are built on first use, so a
+        # bot that is never mentioned doesn't pay for them at cog load
+        self._openai_client: Optional[AsyncOpenAI] = None
         self.tools: Optional[CodebaseTools] = None
+
+        # Persistent cache for slow tool results (nix hashes)
+        self.tool_cache: Optional[ToolCacheStorage] = None
+        try:
+            self.tool_cache = ToolCacheStorage()
+        except Exception as e:
+            log.error(f"Failed to initialize tool cache: {e}")
+            self.tool_cache = None
+
+        self.tool_definitions = TOOL_DEFINITIONS
+
+        # Full serialized tool results awaiting get_more, keyed by token
+        self._result_store: dict[str, str] = {}
+
+    @property
+    def openai_client(self) -> AsyncOpenAI:
+        if self._openai_client is None:
+            self._openai_client = AsyncOpenAI(
+                api_key=OPENAI_API_KEY_OPENROUTER,
+                base_url="https://openrouter.ai/api/v1",
+            )
+        return self._openai_client
+
+    def _ensure_tools(self):
+        """Initialize codebase tools if they aren't yet."""
+        if self.tools is not None:
+            return
         try:
             self.tools = CodebaseTools(self.repo_path)  # type: ignore[arg-type]
             log.info(f"JARVIS initialized with repo path: {self.repo_path}")
@@ -46,127 +227,9 @@ class DevBotCog(commands.Cog):
             log.error(f"Failed to initialize codebase tools: {e}")
             self.tools = None
 
-        # Tool definitions for LLM
-        self.tool_definitions: list[dict[str, Any]] = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_files",
-                    "description": "Search for files in the monorepo by name or glob pattern. Use this to find files when you know part of the filename.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "pattern": {
-                                "type": "string",
-                                "description": "Glob pattern or filename to search for (e.g., 'flake.nix', '*.py', '**/mods.nix')",
-                            },
-                            "max_results": {
-                                "type": "integer",
-                                "description": "Maximum number of results (default 20)",
-                                "default": 20,
-                            },
-                        },
-                        "required": ["pattern"],
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "read_file",
-                    "description": "Read contents of a specific file from the monorepo. You can optionally specify line ranges to read only part of the file.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "path": {
-                                "type": "string",
-                                "description": "Relative path to file from repo root",
-                            },
-                            "start_line": {
-                                "type": "integer",
-                                "description": "Start line number (1-indexed, inclusive)",
-                            },
-                            "end_line": {
-                                "type": "integer",
-                                "description": "End line number (1-indexed, inclusive)",
-                            },
-                        },
-                        "required": ["path"],
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "grep_search",
-                    "description": "Search for text patterns or code snippets in files. Use this to find where specific functions, variables, or configuration values are defined or used.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Text or code pattern to search for",
-                            },
-                            "path": {
-                                "type": "string",
-                                "description": "Directory or file path to search in (default: '.' for entire repo)",
-                                "default": ".",
-                            },
-                            "max_results": {
-                                "type": "integer",
-                                "description": "Maximum number of results (default 30)",
-                                "default": 30,
-                            },
-                        },
-                        "required": ["query"],
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "list_directory",
-                    "description": "List files and subdirectories in a directory. Useful for exploring the structure of the codebase.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "path": {
-                                "type": "string",
-                                "description": "Relative path to directory (default: '.' for root)",
-                                "default": ".",
-                            },
-                            "recursive": {
-                                "type": "boolean",
-                                "description": "Whether to list recursively (default: False)",
-                                "default": False,
-                            },
-                        },
-                    },
-                },
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "nix_hash_url",
-                    "description": "Calculate the Nix hash for a URL. Returns an SRI hash suitable for use in fetchzip, fetchurl, or other Nix fetchers. Use this when you need to add a mod or package that downloads from a URL.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "url": {
-                                "type": "string",
-                                "description": "The URL to fetch and calculate the hash for (e.g., 'https://mod.io/download/...')",
-                            },
-                            "unpack": {
-                                "type": "boolean",
-                                "description": "Whether to unpack the archive before hashing (use True for fetchzip, False for fetchurl). Default: True",
-                                "default": True,
-                            },
-                        },
-                        "required": ["url"],
-                    },
-                },
-            },
-        ]
+    async def cog_unload(self):
+        if self.tool_cache:
+            self.tool_cache.close()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -187,6 +250,8 @@ class DevBotCog(commands.Cog):
             return
 
         # Check if tools are available
+        if self.tools is None:
+            await asyncio.to_thread(self._ensure_tools)
         if self.tools is None:
             await message.channel.send(
                 "❌ I'm having trouble accessing the codebase right now. Please check my configuration."
@@ -202,10 +267,11 @@ class DevBotCog(commands.Cog):
             # Show typing indicator
             async with message.channel.typing():
                 # Extract query (remove bot mention)
-                query = message.content
-                for mention in message.mentions:
-                    query = query.replace(f"<@{mention.id}>", "").strip()
-                    query = query.replace(f"<@!{mention.id}>", "").strip()
+                mention_ids = {str(mention.id) for mention in message.mentions}
+                query = MENTION_RE.sub(
+                    lambda m: "" if m.group(1) in mention_ids else m.group(0),
+                    message.content,
+                ).strip()
 
                 if not query:
                     await message.reply(
@@ -270,11 +336,26 @@ Be concise but thorough. Format code blocks with appropriate language tags."""
             Final response text
         """
         max_iterations = 30  # Prevent infinite loops
+        tokens: list[str] = []
+        try:
+            return await self._run_tool_loop(messages, max_iterations, tokens)
+        finally:
+            for token in tokens:
+                self._result_store.pop(token, None)
+
+    async def _run_tool_loop(
+        self, messages: list[dict], max_iterations: int, tokens: list[str]
+    ) -> str:
+        """Run the LLM/tool loop, recording continuation tokens it creates."""
         iteration = 0
+        # (iteration added, message) for each tool result in the conversation
+        tool_messages: list[tuple[int, dict]] = []
 
         while iteration < max_iterations:
             iteration += 1
 
+            self._compact_tool_results(messages, tool_messages, iteration)
+
             # Call LLM
             # pyrefly: ignore [no-matching-overload]
             completion = await self.openai_client.chat.completions.create(
@@ -309,25 +390,113 @@ Be concise but thorough. Format code blocks with appropriate language tags."""
 
                 # Call the appropriate tool
                 tool_result = await self._execute_tool(function_name, function_args)
+                content = json.dumps(tool_result)
+                if function_name != "get_more":
+                    content = self._paginate_result(content, tokens)
 
                 # Add tool result to messages
-                messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": json.dumps(tool_result),
-                    }
-                )
+                tool_message = {
+                    "tool_call_id": tool_call.id,
+                    "role": "tool",
+                    "name": function_name,
+                    "content": content,
+                }
+                messages.append(tool_message)
+                tool_messages.append((iteration, tool_message))
 
             # Continue loop to get final response with tool results
 
         return "I'm sorry, I couldn't complete your request due to complexity. Please try simplifying your question."
 
+    @staticmethod
+    def _compact_tool_results(
+        messages: list, tool_messages: list[tuple[int, dict]], iteration: int
+    ):
+        """
+        Stub out old tool results so they stop being re-sent in full.
+
+        Results older than TOOL_RESULT_KEEP_TURNS are always stubbed. If the
+        conversation is still over CONTEXT_MAX_CHARS, further results are
+        stubbed oldest first, keeping those from the latest turn. The system
+        and user messages are never touched, so the cached prompt prefix
+        stays intact.
+        """
+
+        def stub(tool_message: dict):
+            tool_message["content"] = json.dumps(
+                {"truncated": True, "tool": tool_message["name"]}
+            )
+
+        for added, tool_message in tool_messages:
+            if iteration - added > TOOL_RESULT_KEEP_TURNS:
+                stub(tool_message)
+
+        total = 0
+        for m in messages:
+            # Assistant turns are SDK message objects, the rest are dicts
+            content = m.get("content") if isinstance(m, dict) else m.content
+            total += len(str(content or ""))
+        for added, tool_message in tool_messages:
+            if total <= CONTEXT_MAX_CHARS or added >= iteration - 1:
+                break
+            before = len(tool_message["content"])
+            stub(tool_message)
+            total -= before - len(tool_message["content"])
+
+    def _paginate_result(self, content: str, tokens: list[str]) -> str:
+        """Return content as-is, or its first page plus a continuation token."""
+        if len(content) <= TOOL_RESULT_MAX_CHARS:
+            return content
+
+        token = uuid.uuid4().hex
+        self._result_store[token] = content
+        tokens.append(token)
+        return json.dumps(self._result_page(token, 0))
+
+    def _result_page(self, token: str, offset: int) -> dict[str, Any]:
+        """Slice one page out of a stored tool result."""
+        content = self._result_store.get(token)
+        if content is None:
+            return {"error": f"Unknown or expired continuation token: {token}"}
+
+        end = offset + TOOL_RESULT_MAX_CHARS
+        page: dict[str, Any] = {
+            "results": content[offset:end],
+            "total": len(content),
+        }
+        if end < len(content):
+            page["continuation_token"] = token
+            page["offset"] = end
+        return page
+
+    def _nix_hash_url_cached(self, url: str, unpack: bool) -> dict[str, Any]:
+        """nix_hash_url backed by the persistent cache.
+
+        A URL and unpack flag fully determine the hash, so hits never expire.
+        """
+        if self.tool_cache:
+            sri_hash = self.tool_cache.get_nix_hash(url, unpack)
+            if sri_hash:
+                return {
+                    "hash": sri_hash,
+                    "format": "sri",
+                    "url": url,
+                    "note": "Use this hash in the 'hash' attribute of fetchzip/fetchurl",
+                }
+
+        assert self.tools is not None
+        result = self.tools.nix_hash_url(url=url, unpack=unpack)
+        if self.tool_cache and result.get("format") == "sri":
+            self.tool_cache.set_nix_hash(url, unpack, result["hash"])
+        return result
+
     async def _execute_tool(self, function_name: str, arguments: dict) -> Any:
         """
         Execute a codebase tool.
 
+        Tools do blocking disk IO and spawn subprocesses, so they run in a
+        worker thread to keep the Discord event loop responsive.
+
         Args:
             function_name: Name of the tool
             arguments: Tool arguments
@@ -335,34 +504,44 @@ Be concise but thorough. Format code blocks with appropriate language tags."""
         Returns:
             Tool result (serializable)
         """
+        if function_name == "get_more":
+            return self._result_page(
+                arguments["continuation_token"], arguments.get("offset", 0)
+            )
+
         if self.tools is None:
             return {"error": "Codebase tools not initialized"}
         
         try:
             if function_name == "search_files":
-                return self.tools.search_files(
+                return await asyncio.to_thread(
+                    self.tools.search_files,
                     pattern=arguments["pattern"],
                     max_results=arguments.get("max_results", 20),
                 )
             elif function_name == "read_file":
-                return self.tools.read_file(
+                return await asyncio.to_thread(
+                    self.tools.read_file,
                     path=arguments["path"],
                     start_line=arguments.get("start_line"),
                     end_line=arguments.get("end_line"),
                 )
             elif function_name == "grep_search":
-                return self.tools.grep_search(
+                return await asyncio.to_thread(
+                    self.tools.grep_search,
                     query=arguments["query"],
                     path=arguments.get("path", "."),
                     max_results=arguments.get("max_results", 30),
                 )
             elif function_name == "list_directory":
-                return self.tools.list_directory(
+                return await asyncio.to_thread(
+                    self.tools.list_directory,
                     path=arguments.get("path", "."),
                     recursive=arguments.get("recursive", False),
                 )
             elif function_name == "nix_hash_url":
-                return self.tools.nix_hash_url(
+                return await asyncio.to_thread(
+                    self._nix_hash_url_cached,
                     url=arguments["url"],
                     unpack=arguments.get("unpack", True),
                 )
@@ -0,0 +1,60 @@
+"""SQLite cache for slow, deterministic JARVIS tool results."""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from amc_peripheral.settings import JARVIS_CACHE_DB_PATH, MEMORY_DATA_DIR
+
+
+class ToolCacheStorage:
+    """Persistent cache so tool results survive bot restarts."""
+
+    def __init__(self, db_path: str = JARVIS_CACHE_DB_PATH):
+        # Ensure data directory exists
+        os.makedirs(os.path.dirname(db_path) or MEMORY_DATA_DIR, exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        """Create tables if they don't exist."""
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS nix_hash_cache (
+                url TEXT NOT NULL,
+                unpack INTEGER NOT NULL,
+                sri_hash TEXT NOT NULL,
+                computed_at REAL NOT NULL,
+                PRIMARY KEY (url, unpack)
+            );
+        """)
+        self.conn.commit()
+
+    def get_nix_hash(self, url: str, unpack: bool) -> Optional[str]:
+        """Return the cached SRI hash for a URL, if any."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sri_hash FROM nix_hash_cache WHERE url = ? AND unpack = ?",
+                (url, int(unpack)),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_nix_hash(self, url: str, unpack: bool, sri_hash: str):
+        """Store the SRI hash for a URL."""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO nix_hash_cache (url, unpack, sri_hash, computed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (url, int(unpack), sri_hash, time.time()),
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
@@ -1,6 +1,9 @@
 """ChromaDB-based semantic retrieval for player memories."""
 
+import inspect
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import Optional
 
@@ -32,6 +35,28 @@ class MemoryRetrieval:
         )
         log.info(f"ChromaDB initialized at {path}")
 
+        # Not every chromadb release accepts a filter on count()
+        self._count_supports_where = (
+            "where" in inspect.signature(self.collection.count).parameters
+        )
+
+        # Short-lived cache of formatted query results. Keys include a
+        # per-player generation counter, so writes for a player make their
+        # cached entries unreachable without scanning the cache. Callers run
+        # in worker threads, so both dicts are only touched under the lock.
+        self._cache_lock = threading.Lock()
+        self._query_cache: dict[tuple, tuple[float, list[dict]]] = {}
+        self._query_cache_ttl = 60.0
+        self._query_cache_maxsize = 1024
+        self._player_generation: dict[str, int] = {}
+
+    def _invalidate_player(self, player_id: str):
+        """Bump the player's generation so cached queries miss."""
+        with self._cache_lock:
+            self._player_generation[player_id] = (
+                self._player_generation.get(player_id, 0) + 1
+            )
+
     def add_memory(
         self,
         player_id: str,
@@ -58,8 +83,45 @@ class MemoryRetrieval:
             }],
             ids=[doc_id]
         )
+        self._invalidate_player(player_id)
         return doc_id
 
+    def add_memories(self, rows: list[dict]) -> list[str]:
+        """Add several memories in a single ChromaDB call. Returns the IDs.
+
+        Each row takes the same keys as ``add_memory``'s arguments. Batching
+        lets the embedding function process all documents in one pass.
+        """
+        documents: list[str] = []
+        metadatas: list[dict] = []
+        ids: list[str] = []
+        for row in rows:
+            ts = row.get("timestamp") or datetime.now()
+            source = row.get("source", "game_chat")
+            doc_id = f"{source}_{row['player_id']}_{int(ts.timestamp())}"
+            # Chroma rejects duplicate IDs within one call; keep the first,
+            # matching what a repeated single add would have kept
+            if doc_id in ids:
+                continue
+            documents.append(row["message"])
+            metadatas.append({
+                "player_id": row["player_id"],
+                "player_name": row["player_name"],
+                "timestamp": ts.isoformat(),
+                "source": source,
+                "discord_user_id": row.get("discord_user_id") or "",
+                "is_bot_response": row.get("is_bot_response", False),
+            })
+            ids.append(doc_id)
+
+        if not ids:
+            return []
+
+        self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        for player_id in {m["player_id"] for m in metadatas}:
+            self._invalidate_player(player_id)
+        return ids
+
     def retrieve_relevant(
         self,
         player_id: str,
@@ -80,6 +142,21 @@ class MemoryRetrieval:
         Returns:
             List of memory dicts with keys: message, player_name, timestamp, distance
         """
+        now = time.monotonic()
+        with self._cache_lock:
+            cache_key = (
+                player_id,
+                self._player_generation.get(player_id, 0),
+                query,
+                n_results,
+                tuple(sources or ()),
+                max_distance,
+            )
+            cached = self._query_cache.get(cache_key)
+        if cached and now - cached[0] < self._query_cache_ttl:
+            # Callers may edit the dicts they get back; keep the cache intact
+            return [dict(m) for m in cached[1]]
+
         # Build where filter
         where_filter: dict = {"player_id": player_id}
         
@@ -117,12 +194,24 @@ class MemoryRetrieval:
                     "distance": distance,
                     "is_bot_response": metadata.get("is_bot_response", False),
                 })
-        
-        return memories
+
+        with self._cache_lock:
+            if (
+                cache_key not in self._query_cache
+                and len(self._query_cache) >= self._query_cache_maxsize
+            ):
+                # Dicts keep insertion order, so the first key is the oldest
+                self._query_cache.pop(next(iter(self._query_cache)))
+            self._query_cache[cache_key] = (now, memories)
+
+        return [dict(m) for m in memories]
 
     def get_memory_count(self, player_id: Optional[str] = None) -> int:
         """Get total memory count, optionally for a specific player."""
         if player_id:
+            if self._count_supports_where:
+                # pyrefly: ignore [unexpected-keyword]
+                return self.collection.count(where={"player_id": player_id})
             results = self.collection.get(
                 where={"player_id": player_id},
                 include=[]
@@ -132,11 +221,9 @@ class MemoryRetrieval:
 
     def delete_player_memories(self, player_id: str) -> int:
         """Delete all memories for a player. Returns count deleted."""
-        results = self.collection.get(
-            where={"player_id": player_id},
-            include=[]
-        )
-        if results["ids"]:
-            self.collection.delete(ids=results["ids"])
-            return len(results["ids"])
-        return 0
+        count = self.get_memory_count(player_id)
+        if count:
+            # Delete by filter so the IDs never round-trip through Python
+            self.collection.delete(where={"player_id": player_id})
+            self._invalidate_player(player_id)
+        return count
@@ -1,59 +1,204 @@
 """SQLite storage for player conversation memories."""
 
+import asyncio
+import functools
 import sqlite3
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Optional
 from amc_peripheral.settings import MEMORY_DB_PATH, MEMORY_DATA_DIR
 
+MS_PER_DAY = 86_400_000
+
+# Timestamps are epoch milliseconds; timestamp_iso keeps a readable UTC form
+PLAYER_MEMORY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        
+        -- Player identity
+        player_id TEXT NOT NULL,
+        player_name TEXT NOT NULL,
+        
+        -- Message content
+        message TEXT NOT NULL,
+        is_bot_response INTEGER DEFAULT 0,
+        timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER) * 1000),
+        timestamp_iso TEXT GENERATED ALWAYS AS (datetime(timestamp / 1000, 'unixepoch')) VIRTUAL,
+        
+        -- Source context (future-proof)
+        source TEXT NOT NULL,
+        discord_user_id TEXT,
+        discord_channel_id TEXT,
+        discord_message_id TEXT,
+        guild_id TEXT,
+        
+        -- Memory management
+        relevance_score REAL DEFAULT 1.0
+    );
+"""
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _to_ms(timestamp: Optional[datetime]) -> int:
+    """Convert an optional datetime to epoch milliseconds, defaulting to now."""
+    if timestamp is None:
+        return _now_ms()
+    return int(timestamp.timestamp() * 1000)
+
+
+def _iso_to_ms(value: Optional[str]) -> int:
+    """Convert a legacy ISO timestamp column value to epoch milliseconds."""
+    if not value:
+        return _now_ms()
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
 
 class MemoryStorage:
     """Persistent storage for player messages and bot responses."""
 
+    # Statements are kept as constants so every call hands sqlite3 the same
+    # string and hits its compiled-statement cache
+    _SQL_INSERT = """
+        INSERT INTO player_memory (
+            player_id, player_name, message, is_bot_response, timestamp,
+            source, discord_user_id, discord_channel_id, discord_message_id, guild_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    # The inner query picks the newest rows off the index; the outer one
+    # hands them back oldest first, with the readable ISO timestamp
+    _SQL_RECENT = """
+        SELECT id, player_id, player_name, message, is_bot_response,
+               timestamp_iso AS timestamp, source, discord_user_id,
+               discord_channel_id, discord_message_id, guild_id, relevance_score
+        FROM (
+            SELECT * FROM player_memory
+            WHERE player_id = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ) AS recent
+        ORDER BY recent.timestamp ASC, recent.id ASC
+    """
+    _SQL_RECENT_SOURCES = """
+        SELECT id, player_id, player_name, message, is_bot_response,
+               timestamp_iso AS timestamp, source, discord_user_id,
+               discord_channel_id, discord_message_id, guild_id, relevance_score
+        FROM (
+            SELECT * FROM player_memory
+            WHERE player_id = ? AND source IN ({placeholders})
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        ) AS recent
+        ORDER BY recent.timestamp ASC, recent.id ASC
+    """
+    _SQL_COUNT = "SELECT COUNT(*) FROM player_memory"
+    _SQL_COUNT_PLAYER = "SELECT COUNT(*) FROM player_memory WHERE player_id = ?"
+
     def __init__(self, db_path: str = MEMORY_DB_PATH):
         # Ensure data directory exists
         os.makedirs(os.path.dirname(db_path) or MEMORY_DATA_DIR, exist_ok=True)
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # The connection is shared across threads, so serialize access to it
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            db_path, check_same_thread=False, cached_statements=256
+        )
         self.conn.row_factory = sqlite3.Row
+        self._configure_connection()
         self._init_schema()
 
+    def _configure_connection(self):
+        """Tune SQLite for frequent small writes.
+
+        WAL with synchronous=NORMAL fsyncs only at checkpoints instead of on
+        every commit, and lets readers proceed while a write is in progress.
+        """
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA wal_autocheckpoint=1000")
+
     def _init_schema(self):
         """Create tables if they don't exist."""
+        self._migrate_text_timestamps()
+        self.conn.executescript(PLAYER_MEMORY_TABLE_SQL.format(table="player_memory"))
         self.conn.executescript("""
-            CREATE TABLE IF NOT EXISTS player_memory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                
-                -- Player identity
-                player_id TEXT NOT NULL,
-                player_name TEXT NOT NULL,
-                
-                -- Message content
-                message TEXT NOT NULL,
-                is_bot_response INTEGER DEFAULT 0,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                
-                -- Source context (future-proof)
-                source TEXT NOT NULL,
-                discord_user_id TEXT,
-                discord_channel_id TEXT,
-                discord_message_id TEXT,
-                guild_id TEXT,
-                
-                -- Memory management
-                relevance_score REAL DEFAULT 1.0
-            );
-
             CREATE INDEX IF NOT EXISTS idx_memory_player_id 
                 ON player_memory(player_id);
             CREATE INDEX IF NOT EXISTS idx_memory_timestamp 
                 ON player_memory(timestamp);
             CREATE INDEX IF NOT EXISTS idx_memory_source 
                 ON player_memory(source);
+
+            -- Serve get_recent_messages' ORDER BY straight from the index
+            CREATE INDEX IF NOT EXISTS idx_memory_player_timestamp
+                ON player_memory(player_id, timestamp DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_memory_player_source_ts
+                ON player_memory(player_id, source, timestamp DESC, id DESC);
+
+            -- Only rows that decay_relevance_scores can still change
+            CREATE INDEX IF NOT EXISTS idx_memory_live_relevance
+                ON player_memory(timestamp) WHERE relevance_score > 0.01;
         """)
         self.conn.commit()
 
+        # Refresh planner statistics; analysis_limit bounds the cost on
+        # large tables by sampling each index instead of scanning it
+        self.conn.execute("PRAGMA analysis_limit=400")
+        self.conn.execute("ANALYZE")
+
+    def _migrate_text_timestamps(self):
+        """Rebuild a pre-existing table whose timestamps are ISO TEXT.
+
+        The column's TEXT affinity would coerce the new integer values back
+        into strings, so the rows are copied into a fresh table instead of
+        being updated in place. The rebuild runs as one transaction so a
+        crash part-way leaves the legacy table untouched, and any
+        ``player_memory_new`` left over from an older interrupted run is
+        dropped first.
+        """
+        columns = {
+            row["name"]: row["type"]
+            for row in self.conn.execute("PRAGMA table_info(player_memory)")
+        }
+        if columns.get("timestamp", "").upper() != "TEXT":
+            return
+
+        self.conn.create_function("iso_to_ms", 1, _iso_to_ms, deterministic=True)
+        script = (
+            "BEGIN;\nDROP TABLE IF EXISTS player_memory_new;\n"
+            + PLAYER_MEMORY_TABLE_SQL.format(table="player_memory_new")
+            + """
+            INSERT INTO player_memory_new (
+                id, player_id, player_name, message, is_bot_response, timestamp,
+                source, discord_user_id, discord_channel_id, discord_message_id,
+                guild_id, relevance_score
+            )
+            SELECT
+                id, player_id, player_name, message, is_bot_response, iso_to_ms(timestamp),
+                source, discord_user_id, discord_channel_id, discord_message_id,
+                guild_id, relevance_score
+            FROM player_memory;
+
+            DROP TABLE player_memory;
+            ALTER TABLE player_memory_new RENAME TO player_memory;
+            COMMIT;
+            """
+        )
+        try:
+            self.conn.executescript(script)
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            raise
+
     def store_message(
         self,
         player_id: str,
@@ -68,22 +213,46 @@ class MemoryStorage:
         guild_id: Optional[str] = None,
     ) -> int:
         """Store a message in the database. Returns the row ID."""
-        ts = (timestamp or datetime.now()).isoformat()
-        
-        cursor = self.conn.execute(
-            """
-            INSERT INTO player_memory (
-                player_id, player_name, message, is_bot_response, timestamp,
-                source, discord_user_id, discord_channel_id, discord_message_id, guild_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        ts = _to_ms(timestamp)
+
+        with self._lock:
+            cursor = self.conn.execute(
+                self._SQL_INSERT,
+                (
+                    player_id, player_name, message, int(is_bot_response), ts,
+                    source, discord_user_id, discord_channel_id, discord_message_id, guild_id
+                ),
+            )
+            self.conn.commit()
+        return cursor.lastrowid or 0
+
+    def store_messages(self, rows: Iterable[dict]) -> int:
+        """Store several messages in one transaction. Returns the count stored.
+
+        Each row takes the same keys as ``store_message``'s arguments.
+        """
+        # executemany consumes the generator directly, so no parameter list
+        # is built up front
+        params = (
             (
-                player_id, player_name, message, int(is_bot_response), ts,
-                source, discord_user_id, discord_channel_id, discord_message_id, guild_id
-            ),
+                row["player_id"],
+                row["player_name"],
+                row["message"],
+                int(row.get("is_bot_response", False)),
+                _to_ms(row.get("timestamp")),
+                row.get("source", "game_chat"),
+                row.get("discord_user_id"),
+                row.get("discord_channel_id"),
+                row.get("discord_message_id"),
+                row.get("guild_id"),
+            )
+            for row in rows
         )
-        self.conn.commit()
-        return cursor.lastrowid or 0
+
+        with self._lock:
+            cursor = self.conn.executemany(self._SQL_INSERT, params)
+            self.conn.commit()
+        return cursor.rowcount
 
     def get_recent_messages(
         self,
@@ -93,50 +262,58 @@ class MemoryStorage:
     ) -> list[dict]:
         """Get recent messages for a player, optionally filtered by source."""
         if sources:
-            placeholders = ",".join("?" * len(sources))
-            query = f"""
-                SELECT * FROM player_memory
-                WHERE player_id = ? AND source IN ({placeholders})
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """
+            query = self._recent_sources_sql(len(sources))
             params = [player_id, *sources, limit]
         else:
-            query = """
-                SELECT * FROM player_memory
-                WHERE player_id = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """
+            query = self._SQL_RECENT
             params = [player_id, limit]
 
-        cursor = self.conn.execute(query, params)
-        rows = cursor.fetchall()
-        # Reverse to get chronological order
-        return [dict(row) for row in reversed(rows)]
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, params)]
+
+    # Async variants run the query in a worker thread; the connection lock
+    # keeps concurrent calls serialized
+
+    async def astore_message(self, *args, **kwargs) -> int:
+        """Async version of ``store_message``."""
+        return await asyncio.to_thread(self.store_message, *args, **kwargs)
+
+    async def astore_messages(self, rows: Iterable[dict]) -> int:
+        """Async version of ``store_messages``."""
+        return await asyncio.to_thread(self.store_messages, rows)
+
+    async def aget_recent_messages(self, *args, **kwargs) -> list[dict]:
+        """Async version of ``get_recent_messages``."""
+        return await asyncio.to_thread(self.get_recent_messages, *args, **kwargs)
+
+    @classmethod
+    @functools.lru_cache(maxsize=16)
+    def _recent_sources_sql(cls, arity: int) -> str:
+        """Build the source-filtered recent query once per IN-list length."""
+        return cls._SQL_RECENT_SOURCES.format(placeholders=",".join("?" * arity))
 
     def get_message_count(self, player_id: Optional[str] = None) -> int:
         """Get total message count, optionally for a specific player."""
-        if player_id:
-            cursor = self.conn.execute(
-                "SELECT COUNT(*) FROM player_memory WHERE player_id = ?",
-                (player_id,),
-            )
-        else:
-            cursor = self.conn.execute("SELECT COUNT(*) FROM player_memory")
-        return cursor.fetchone()[0]
+        with self._lock:
+            if player_id:
+                cursor = self.conn.execute(self._SQL_COUNT_PLAYER, (player_id,))
+            else:
+                cursor = self.conn.execute(self._SQL_COUNT)
+            return cursor.fetchone()[0]
 
     def cleanup_old_memories(self, days: int = 90, min_relevance: float = 0.3) -> int:
         """Delete old memories with low relevance. Returns count deleted."""
-        cursor = self.conn.execute(
-            """
-            DELETE FROM player_memory
-            WHERE timestamp < datetime('now', ? || ' days')
-              AND relevance_score < ?
-            """,
-            (f"-{days}", min_relevance),
-        )
-        self.conn.commit()
+        cutoff = _now_ms() - days * MS_PER_DAY
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                DELETE FROM player_memory
+                WHERE timestamp < ?
+                  AND relevance_score < ?
+                """,
+                (cutoff, min_relevance),
+            )
+            self.conn.commit()
         return cursor.rowcount
 
     def decay_relevance_scores(self, decay_rate: float = 0.95) -> int:
@@ -144,34 +321,40 @@ class MemoryStorage:
         
         Uses exponential decay: score *= decay_rate ^ days_since_last_update
         Default 0.95 = 5% decay per day.
+
+        Only rows still above the 0.01 floor are updated, which the partial
+        index on live relevance serves directly. Rows of any age are
+        included, so ones never decayed (downtime, migrated or backfilled
+        rows) catch up in a single pass.
         
         Returns count of updated rows.
         """
-        cursor = self.conn.execute(
-            """
-            UPDATE player_memory
-            SET relevance_score = relevance_score * POWER(?, 
-                MAX(1, julianday('now') - julianday(timestamp)))
-            WHERE relevance_score > 0.01
-            """,
-            (decay_rate,),
-        )
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                UPDATE player_memory
+                SET relevance_score = relevance_score * POWER(?, 
+                    MAX(1, (? - timestamp) / 86400000.0))
+                WHERE relevance_score > 0.01
+                """,
+                (decay_rate, _now_ms()),
+            )
+            self.conn.commit()
         return cursor.rowcount
 
     def get_memory_stats(self) -> dict:
         """Get statistics about stored memories."""
-        cursor = self.conn.execute("""
-            SELECT 
-                COUNT(*) as total_count,
-                COUNT(DISTINCT player_id) as unique_players,
-                SUM(CASE WHEN is_bot_response = 1 THEN 1 ELSE 0 END) as bot_responses,
-                AVG(relevance_score) as avg_relevance,
-                MIN(timestamp) as oldest_memory,
-                MAX(timestamp) as newest_memory
-            FROM player_memory
-        """)
-        row = cursor.fetchone()
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT 
+                    COUNT(*) as total_count,
+                    COUNT(DISTINCT player_id) as unique_players,
+                    SUM(CASE WHEN is_bot_response = 1 THEN 1 ELSE 0 END) as bot_responses,
+                    AVG(relevance_score) as avg_relevance,
+                    datetime(MIN(timestamp) / 1000, 'unixepoch') as oldest_memory,
+                    datetime(MAX(timestamp) / 1000, 'unixepoch') as newest_memory
+                FROM player_memory
+            """).fetchone()
         return {
             "total_count": row[0],
             "unique_players": row[1],
@@ -183,13 +366,15 @@ class MemoryStorage:
 
     def get_low_relevance_count(self, threshold: float = 0.3) -> int:
         """Count memories below relevance threshold (candidates for cleanup)."""
-        cursor = self.conn.execute(
-            "SELECT COUNT(*) FROM player_memory WHERE relevance_score < ?",
-            (threshold,),
-        )
-        return cursor.fetchone()[0]
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT COUNT(*) FROM player_memory WHERE relevance_score < ?",
+                (threshold,),
+            )
+            return cursor.fetchone()[0]
 
     def close(self):
         """Close the database connection."""
-        self.conn.close()
+        with self._lock:
+            self.conn.close()
 
@@ -1,19 +1,169 @@
-import socket
+import asyncio
+import contextlib
+import functools
 import logging
-from typing import Optional, Dict, Any
+import re
+import socket
+import time
+from typing import Optional, Dict, Any, AsyncIterator, Callable, TypeVar
 
 logger = logging.getLogger("liquidsoap_controller")
 
+T = TypeVar("T")
+
+# How long parsed replies to read-only commands are reused, in seconds
+METADATA_TTL = 2.0
+UPTIME_TTL = 5.0
+QUEUE_LENGTH_TTL = 1.0
+
+# One key=value metadata line; the value may itself contain "="
+METADATA_LINE_RE = re.compile(r"^([^=\n]+)=(.*)$", re.MULTILINE)
+
+# What may follow the END that terminates a reply
+LINE_ENDINGS = (b"\r\n", b"\n")
+
+# Suffixes of commands that only read state and are safe to resend
+READ_ONLY_SUFFIXES = (".length", ".metadata", ".remaining", ".now_playing")
+
+# Separates metadata from remaining time in a <source>.now_playing reply
+NOW_PLAYING_SEPARATOR = "\n---\n"
+
+# Failures after which a read-only batch is retried on a fresh connection
+RETRYABLE_ERRORS = (BrokenPipeError, ConnectionResetError, TimeoutError)
+
+# Connections kept per Liquidsoap server
+POOL_SIZE = 4
+
+StreamPair = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class ConnectionPool:
+    """A bounded set of reusable telnet connections to one Liquidsoap server."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        unix_path: Optional[str] = None,
+        size: int = POOL_SIZE,
+    ):
+        self.host = host
+        self.port = port
+        # A co-located Liquidsoap can be reached over a Unix socket, which
+        # skips the TCP stack entirely
+        self.unix_path = unix_path
+        self._idle: list[StreamPair] = []
+        self._slots = asyncio.Semaphore(size)
+        self._address: Optional[tuple[str, int]] = None
+
+    async def _resolve(self) -> tuple[str, int]:
+        """Look the host up once and reuse the address for later connects."""
+        if self._address is None:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                self.host, self.port, family=socket.AF_INET, type=socket.SOCK_STREAM
+            )
+            self._address = infos[0][4][:2]
+        return self._address
+
+    @property
+    def address(self) -> str:
+        """Where the pool connects to, for log messages."""
+        return self.unix_path or f"{self.host}:{self.port}"
+
+    async def _open(self) -> StreamPair:
+        if self.unix_path is not None:
+            return await asyncio.open_unix_connection(self.unix_path)
+
+        host, port = await self._resolve()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            # The server may have moved; resolve again next time
+            self._address = None
+            raise
+
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # Commands are tiny request/response lines, so never hold them
+            # back for Nagle; keepalive notices a Liquidsoap that vanished
+            # without closing the connection
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        return reader, writer
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[StreamPair]:
+        """Check out a connection for one exchange.
+
+        The connection belongs to the caller until the block exits, so a
+        batch of commands and its replies can never interleave with another
+        coroutine's and no per-connection lock is needed. An idle connection
+        is reused when there is one, otherwise a new one is opened, up to
+        the pool size. A connection is only put back when
+        the exchange finished cleanly; after any error it is closed.
+        """
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await self._open()
+            try:
+                yield conn
+            except BaseException:
+                conn[1].close()
+                raise
+            self._idle.append(conn)
+
+    def discard_idle(self) -> None:
+        """Close every idle connection, e.g. after the server restarted."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+_POOLS: dict[tuple[str, int, Optional[str]], ConnectionPool] = {}
+
+
+def _is_read_only(command: str) -> bool:
+    return command == "uptime" or command.endswith(READ_ONLY_SUFFIXES)
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_command(command: str) -> bytes:
+    """Encode a command line once; status and length queries repeat a lot."""
+    return f"{command}\n".encode("utf-8")
+
+
+def get_connection_pool(
+    host: str, port: int, unix_path: Optional[str] = None
+) -> ConnectionPool:
+    """Return the shared connection pool for a Liquidsoap server."""
+    key = (host, port, unix_path)
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = _POOLS[key] = ConnectionPool(host, port, unix_path)
+    return pool
+
 
 class LiquidsoapController:
     """
-    A Python controller for interacting with Liquidsoap via telnet.
+    An asyncio controller for interacting with Liquidsoap via telnet.
 
     This class allows you to send commands to a running Liquidsoap instance
     through its telnet interface, enabling dynamic control of the radio stream.
+    All commands are coroutines, so they never block the bot's event loop.
+
+    Despite the name, Liquidsoap's telnet server speaks a plain line
+    protocol: one command per line in, the reply followed by a line holding
+    just END out, with no telnet option negotiation. asyncio streams are
+    enough to frame it, so no telnet client library is needed.
     """
 
-    def __init__(self, host: str = "localhost", port: int = 1234, timeout: int = 3):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 1234,
+        timeout: int = 3,
+        unix_path: Optional[str] = None,
+    ):
         """
         Initialize the Liquidsoap controller.
 
@@ -21,63 +171,97 @@ class LiquidsoapController:
             host: Hostname or IP address of the Liquidsoap server
             port: Port number of the telnet interface
             timeout: Socket timeout in seconds
+            unix_path: Path of Liquidsoap's server socket; when set it is
+                used instead of host and port
         """
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.unix_path = unix_path
+        # Connections are shared by every controller for the same server
+        self._pool = get_connection_pool(host, port, unix_path)
+        # Parsed replies keyed by command, with the monotonic time they were
+        # fetched
+        self._cache: dict[str, tuple[float, Any]] = {}
+        # Sources whose server does not provide the <source>.now_playing
+        # command, so get_status falls back to separate queries
+        self._no_now_playing: set[str] = set()
+
+    @staticmethod
+    async def _read_reply(reader: asyncio.StreamReader) -> str:
+        """Read one END-terminated reply from a connection."""
+        # Liquidsoap terminates every reply with a line holding just END.
+        # readuntil scans the stream buffer once instead of awaiting each
+        # line; an END that is part of the body (e.g. a title) is skipped.
+        response = bytearray()
+        try:
+            while True:
+                response += await reader.readuntil(b"END")
+                rest = await reader.readline()
+                # Only the tail just read decides whether this END is the
+                # terminator, so each check is O(1) however long the reply
+                if rest in LINE_ENDINGS and (
+                    len(response) == 3 or response.endswith(b"\nEND")
+                ):
+                    del response[-3:]
+                    break
+                response += rest
+        except asyncio.IncompleteReadError:
+            raise ConnectionResetError("Liquidsoap closed the connection")
+
+        return response.decode("utf-8").strip()
+
+    async def _exchange(self, commands: list[str]) -> list[str]:
+        """Write commands in one batch and read their replies in order."""
+        async with self._pool.acquire() as (reader, writer):
+            writer.write(b"".join(map(_encode_command, commands)))
+            await writer.drain()
 
-    def _send_command(self, command: str) -> str:
+            return [await self._read_reply(reader) for _ in commands]
+
+    async def _send_commands(self, commands: list[str]) -> list[str]:
         """
-        Send a command to Liquidsoap and return the response.
+        Send several commands to Liquidsoap in a single round trip.
+
+        The commands are written together and the replies read back in the
+        same order. Connections are kept open in a shared pool between
+        calls. If the connection drops or times out, a batch made only of
+        read-only queries is retried once on a fresh connection; a batch
+        that changes state (push, skip, reload, var.set) is not, so a reply
+        lost after the command ran cannot make it run twice.
 
         Args:
-            command: The command to send to Liquidsoap
+            commands: The commands to send to Liquidsoap
 
         Returns:
-            The response from Liquidsoap as a string
+            One response string per command
 
         Raises:
             ConnectionError: If unable to connect to Liquidsoap
-            TimeoutError: If the command times out
+            TimeoutError: If the commands time out
         """
-        sock = None
+        retries = 1 if all(map(_is_read_only, commands)) else 0
         try:
-            # Create a socket and connect to the Liquidsoap telnet interface
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            sock.connect((self.host, self.port))
-
-            # Send the command with a newline
-            cmd_bytes = (command + "\n").encode("utf-8")
-            sock.sendall(cmd_bytes)
-
-            # Read the response
-            response = b""
             while True:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                response += chunk
-                # Check if the response is complete (END marker)
-                break
-                if response.endswith(b"END\n"):
-                    break
-
-            # Convert response to string and clean it up
-            response_str = response.decode("utf-8").strip()
-            # Remove the END marker
-            if response_str.endswith("END"):
-                response_str = response_str[:-3].strip()
-
-            return response_str
-
-        except socket.timeout:
-            error_msg = f"Timeout when sending command '{command}' to Liquidsoap"
+                try:
+                    return await asyncio.wait_for(
+                        self._exchange(commands), self.timeout
+                    )
+                except RETRYABLE_ERRORS:
+                    # Idle connections were most likely dropped together,
+                    # e.g. by a Liquidsoap restart
+                    self._pool.discard_idle()
+                    if not retries:
+                        raise
+                    retries -= 1
+
+        except TimeoutError:
+            error_msg = f"Timeout when sending {commands} to Liquidsoap"
             logger.error(error_msg)
             raise TimeoutError(error_msg)
 
         except ConnectionRefusedError:
-            error_msg = f"Connection refused: Make sure Liquidsoap is running and telnet is enabled on {self.host}:{self.port}"
+            error_msg = f"Connection refused: Make sure Liquidsoap is running and telnet is enabled on {self._pool.address}"
             logger.error(error_msg)
             raise ConnectionError(error_msg)
 
@@ -86,12 +270,67 @@ class LiquidsoapController:
             logger.error(error_msg)
             raise
 
-        finally:
-            # Always close the socket
-            if sock:
-                sock.close()
+    async def _send_command(self, command: str) -> str:
+        """
+        Send a command to Liquidsoap and return the response.
+
+        Args:
+            command: The command to send to Liquidsoap
+
+        Returns:
+            The response from Liquidsoap as a string
+
+        Raises:
+            ConnectionError: If unable to connect to Liquidsoap
+            TimeoutError: If the command times out
+        """
+        (response,) = await self._send_commands([command])
+        return response
+
+    async def _cached(self, command: str, ttl: float, parser: Callable[[str], T]) -> T:
+        """Return the parsed reply to command, reusing it for ttl seconds."""
+        now = time.monotonic()
+        hit = self._cache.get(command)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+
+        value = parser(await self._send_command(command))
+        self._cache[command] = (now, value)
+        return value
+
+    async def _scalar(
+        self, command: str, conv: Callable[[str], T], ttl: float = 0.0
+    ) -> Optional[T]:
+        """
+        Run a command whose reply is a single value and convert it.
+
+        Args:
+            command: The command to send to Liquidsoap
+            conv: Converts the reply, e.g. int or float
+            ttl: How long to reuse the converted reply; 0 always asks again
+
+        Returns:
+            The converted reply, or None if the command or conversion failed
+        """
+        try:
+            if ttl:
+                return await self._cached(command, ttl, conv)
+            return conv(await self._send_command(command))
+        except Exception as e:
+            logger.error("Error running Liquidsoap command '%s': %s", command, e)
+            return None
+
+    async def close(self) -> None:
+        """Close the idle connections to Liquidsoap."""
+        self._pool.discard_idle()
+
+    async def __aenter__(self) -> "LiquidsoapController":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
 
-    def push_to_queue(self, queue_name: str, uri: str) -> bool:
+    async def push_to_queue(self, queue_name: str, uri: str) -> bool:
         """
         Push a URI to a Liquidsoap queue.
 
@@ -104,18 +343,20 @@ class LiquidsoapController:
         """
         command = f"{queue_name}.push {uri}"
         try:
-            response = self._send_command(command)
+            response = await self._send_command(command)
+            # Queue length and what plays next may have changed
+            self._cache.clear()
             success = response.lower() == "true"
             if success:
-                logger.info(f"Successfully pushed {uri} to {queue_name}")
+                logger.info("Successfully pushed %s to %s", uri, queue_name)
             else:
-                logger.warning(f"Failed to push {uri} to {queue_name}: {response}")
+                logger.warning("Failed to push %s to %s: %s", uri, queue_name, response)
             return success
         except Exception as e:
-            logger.error(f"Error pushing to queue {queue_name}: {e}")
+            logger.error("Error pushing to queue %s: %s", queue_name, e)
             return False
 
-    def get_queue_length(self, queue_name: str) -> Optional[int]:
+    async def get_queue_length(self, queue_name: str) -> Optional[int]:
         """
         Get the current length of a queue.
 
@@ -125,15 +366,9 @@ class LiquidsoapController:
         Returns:
             The number of items in the queue, or None if an error occurred
         """
-        command = f"{queue_name}.length"
-        try:
-            response = self._send_command(command)
-            return int(response)
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting queue length for {queue_name}: {e}")
-            return None
+        return await self._scalar(f"{queue_name}.length", int, QUEUE_LENGTH_TTL)
 
-    def skip_current_track(self, source_name: str = "radio") -> bool:
+    async def skip_current_track(self, source_name: str = "radio") -> bool:
         """
         Skip the current track.
 
@@ -145,18 +380,19 @@ class LiquidsoapController:
         """
         command = f"{source_name}.skip"
         try:
-            response = self._send_command(command)
+            response = await self._send_command(command)
+            self._cache.clear()
             success = response.lower() == "true"
             if success:
-                logger.info(f"Successfully skipped current track on {source_name}")
+                logger.info("Successfully skipped current track on %s", source_name)
             else:
-                logger.warning(f"Failed to skip track on {source_name}: {response}")
+                logger.warning("Failed to skip track on %s: %s", source_name, response)
             return success
         except Exception as e:
-            logger.error(f"Error skipping track on {source_name}: {e}")
+            logger.error("Error skipping track on %s: %s", source_name, e)
             return False
 
-    def get_current_metadata(
+    async def get_current_metadata(
         self, source_name: str = "radio"
     ) -> Optional[Dict[str, str]]:
         """
@@ -170,19 +406,22 @@ class LiquidsoapController:
         """
         command = f"{source_name}.metadata"
         try:
-            response = self._send_command(command)
-            # Parse the metadata response
-            metadata = {}
-            for line in response.split("\n"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    metadata[key.strip()] = value.strip()
-            return metadata
+            metadata = await self._cached(command, METADATA_TTL, self._parse_metadata)
+            # Callers get their own copy so the cached dict stays intact
+            return dict(metadata)
         except Exception as e:
-            logger.error(f"Error getting metadata for {source_name}: {e}")
+            logger.error("Error getting metadata for %s: %s", source_name, e)
             return None
 
-    def get_remaining_time(self, source_name: str = "radio") -> Optional[float]:
+    @staticmethod
+    def _parse_metadata(response: str) -> Dict[str, str]:
+        """Parse a metadata reply into a dictionary."""
+        return {
+            key.strip(): value.strip()
+            for key, value in METADATA_LINE_RE.findall(response)
+        }
+
+    async def get_remaining_time(self, source_name: str = "radio") -> Optional[float]:
         """
         Get the remaining time of the current track in seconds.
 
@@ -192,30 +431,18 @@ class LiquidsoapController:
         Returns:
             The remaining time in seconds, or None if an error occurred
         """
-        command = f"{source_name}.remaining"
-        try:
-            response = self._send_command(command)
-            return float(response)
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting remaining time for {source_name}: {e}")
-            return None
+        return await self._scalar(f"{source_name}.remaining", float)
 
-    def get_uptime(self) -> Optional[float]:
+    async def get_uptime(self) -> Optional[float]:
         """
         Get Liquidsoap's uptime in seconds.
 
         Returns:
             The uptime in seconds, or None if an error occurred
         """
-        command = "uptime"
-        try:
-            response = self._send_command(command)
-            return float(response)
-        except (ValueError, Exception) as e:
-            logger.error(f"Error getting uptime: {e}")
-            return None
+        return await self._scalar("uptime", float, UPTIME_TTL)
 
-    def reload_playlist(self, playlist_name: str) -> bool:
+    async def reload_playlist(self, playlist_name: str) -> bool:
         """
         Reload a playlist.
 
@@ -227,73 +454,151 @@ class LiquidsoapController:
         """
         command = f"{playlist_name}.reload"
         try:
-            response = self._send_command(command)
+            response = await self._send_command(command)
             success = "reloaded" in response.lower()
             if success:
-                logger.info(f"Successfully reloaded {playlist_name}")
+                logger.info("Successfully reloaded %s", playlist_name)
             else:
-                logger.warning(f"Failed to reload {playlist_name}: {response}")
+                logger.warning("Failed to reload %s: %s", playlist_name, response)
             return success
         except Exception as e:
-            logger.error(f"Error reloading {playlist_name}: {e}")
+            logger.error("Error reloading %s: %s", playlist_name, e)
+            return False
+
+    async def set_vars(self, values: Dict[str, bool]) -> bool:
+        """
+        Set interactive boolean variables in one exchange.
+
+        The variables are set in the given order within a single round
+        trip, so no other command can observe a partial update.
+
+        Args:
+            values: Variable names mapped to their new values
+
+        Returns:
+            True if every variable was set, False otherwise
+        """
+        commands = [
+            f"var.set {name} = {'true' if value else 'false'}"
+            for name, value in values.items()
+        ]
+        try:
+            responses = await self._send_commands(commands)
+        except Exception as e:
+            logger.error("Error setting variables %s: %s", list(values), e)
             return False
+        success = True
+        for command, response in zip(commands, responses):
+            if "set" in response.lower():
+                logger.info("Successfully ran %s", command)
+            else:
+                logger.warning("Failed to run %s: %s", command, response)
+                success = False
+        return success
+
+    async def _status_replies(
+        self, source_name: str
+    ) -> tuple[str, Optional[str], str]:
+        """
+        Fetch the uptime, metadata and remaining-time replies for a source.
+
+        The metadata reply is None if the server answered with something
+        other than metadata, such as an error for an unknown source.
+        """
+        if source_name not in self._no_now_playing:
+            uptime, now_playing = await self._send_commands(
+                ["uptime", f"{source_name}.now_playing"]
+            )
+            metadata, separator, remaining = now_playing.rpartition(
+                NOW_PLAYING_SEPARATOR
+            )
+            if separator:
+                return uptime, self._metadata_reply(source_name, metadata), remaining
+            self._no_now_playing.add(source_name)
+
+        uptime, metadata, remaining = await self._send_commands(
+            ["uptime", f"{source_name}.metadata", f"{source_name}.remaining"]
+        )
+        return uptime, self._metadata_reply(source_name, metadata), remaining
+
+    @staticmethod
+    def _metadata_reply(source_name: str, reply: str) -> Optional[str]:
+        """Return a metadata reply, or None if it holds no metadata."""
+        if reply.startswith("ERROR") or not METADATA_LINE_RE.search(reply):
+            if reply.strip():
+                logger.error("Error getting metadata for %s: %s", source_name, reply)
+            return None
+        return reply
 
-    def get_status(self) -> Optional[Dict[str, Any]]:
+    async def get_status(self, source_name: str = "radio") -> Optional[Dict[str, Any]]:
         """
         Get the general status of Liquidsoap.
 
+        All queries go out in one round trip. The radio script registers a
+        <source>.now_playing command, replying with the metadata, a line
+        holding just ---, and the remaining time, so both describe the same
+        track. A server without it is remembered and queried for metadata
+        and remaining time separately. A reply that fails to parse is left
+        out without discarding the others.
+
+        Args:
+            source_name: The name of the source
+
         Returns:
             A dictionary with status information, or None if an error occurred
         """
-        status = {}
-
         try:
-            # Get uptime
-            uptime = self.get_uptime()
-            if uptime is not None:
-                status["uptime"] = uptime
-
-            # Get current metadata
-            metadata = self.get_current_metadata()
-            if metadata:
-                # pyrefly: ignore [unsupported-operation]
-                status["current_track"] = metadata
-
-            # Get remaining time
-            remaining = self.get_remaining_time()
-            if remaining is not None:
-                status["remaining_time"] = remaining
-
-            return status
+            uptime, metadata, remaining = await self._status_replies(source_name)
         except Exception as e:
-            logger.error(f"Error getting Liquidsoap status: {e}")
+            logger.error("Error getting Liquidsoap status: %s", e)
             return None
 
+        status = {}
+
+        try:
+            status["uptime"] = float(uptime)
+        except ValueError as e:
+            logger.error("Error getting uptime: %s", e)
+
+        current_track = self._parse_metadata(metadata) if metadata else None
+        if current_track:
+            # pyrefly: ignore [unsupported-operation]
+            status["current_track"] = current_track
+
+        try:
+            status["remaining_time"] = float(remaining)
+        except ValueError as e:
+            logger.error("Error getting remaining time for %s: %s", source_name, e)
+
+        return status
+
 
 # Example usage
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
-    # Create the controller
-    ls = LiquidsoapController(host="localhost", port=1234)
+    async def main():
+        # Create the controller
+        async with LiquidsoapController(host="localhost", port=1234) as ls:
+            try:
+                # Example: Push a song to the requests queue
+                success = await ls.push_to_queue("requests", "/path/to/song.mp3")
+                logger.info("Push song result: %s", success)
 
-    try:
-        # Example: Push a song to the requests queue
-        success = ls.push_to_queue("requests", "/path/to/song.mp3")
-        logger.info(f"Push song result: {success}")
+                # Example: Get current playing track info
+                metadata = await ls.get_current_metadata()
+                logger.info("Current track: %s", metadata)
 
-        # Example: Get current playing track info
-        metadata = ls.get_current_metadata()
-        logger.info(f"Current track: {metadata}")
+                # Example: Skip the current track
+                await ls.skip_current_track()
 
-        # Example: Skip the current track
-        ls.skip_current_track()
+                # Example: Get overall status
+                status = await ls.get_status()
+                logger.info("Liquidsoap status: %s", status)
 
-        # Example: Get overall status
-        status = ls.get_status()
-        logger.info(f"Liquidsoap status: {status}")
+            except ConnectionError as e:
+                logger.error("Connection error: %s", e)
+            except Exception as e:
+                logger.error("Error: %s", e)
 
-    except ConnectionError as e:
-        logger.error(f"Connection error: {e}")
-    except Exception as e:
-        logger.error(f"Error: {e}")
+    asyncio.run(main())
@@ -1,10 +1,13 @@
 import asyncio
-import aiohttp
 import logging
 import discord
 from discord.ext import commands
 from amc_peripheral.settings import DISCORD_TOKEN_RADIO, GUILD_ID
 from amc_peripheral.radio.radio_cog import RadioCog
+from amc_peripheral.utils.http_utils import (
+    close_shared_session,
+    create_http_session,
+)
 
 log = logging.getLogger(__name__)
 
@@ -20,7 +23,7 @@ class AMCBot(commands.Bot):
         self.http_session = None
 
     async def setup_hook(self):
-        self.http_session = aiohttp.ClientSession()
+        self.http_session = create_http_session()
 
         # Load Cog
         await self.add_cog(RadioCog(self))
@@ -29,14 +32,21 @@ class AMCBot(commands.Bot):
         guild = discord.Object(id=GUILD_ID)
         self.tree.copy_global_to(guild=guild)
         synced = await self.tree.sync(guild=guild)
-        log.info(f"Synced {len(synced)} commands to guild {GUILD_ID}")
+        log.info("Synced %s commands to guild %s", len(synced), GUILD_ID)
+
+    async def close(self):
+        # Cogs unload inside super().close() and may still use the session
+        await super().close()
+        if self.http_session is not None:
+            await self.http_session.close()
+        await close_shared_session()
 
     async def on_ready(self):
         # pyrefly: ignore [missing-attribute]
-        log.info(f"Logged in as {self.user} (ID: {self.user.id})")
-        log.info(f"Connected to {len(self.guilds)} guilds")
+        log.info("Logged in as %s (ID: %s)", self.user, self.user.id)
+        log.info("Connected to %s guilds", len(self.guilds))
         for guild in self.guilds:
-            log.info(f" - {guild.name} (ID: {guild.id})")
+            log.info(" - %s (ID: %s)", guild.name, guild.id)
         log.info("------")
 
 
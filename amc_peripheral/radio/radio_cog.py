@@ -1,6 +1,11 @@
 import os
 import re
+import threading
+import time
 import asyncio
+import functools
+import operator
+import aiohttp
 import discord
 from io import BytesIO
 from zoneinfo import ZoneInfo
@@ -44,12 +49,17 @@ from amc_peripheral.settings import (
     JINGLES_PATH,
     RADIO_DB_PATH,
     DENO_PATH,
+    LIQUIDSOAP_TELNET_HOST,
+    LIQUIDSOAP_TELNET_PORT,
+    LIQUIDSOAP_SOCKET_PATH,
+    RADIO_TRACK_EVENTS_PORT,
 )
 from amc_peripheral.db import RadioDB
 from amc_peripheral.utils.text_utils import split_markdown
-from amc_peripheral.radio.tts import tts as tts_google
+from amc_peripheral.radio.tts import prune_cache as prune_tts_cache, tts as tts_google
 from amc_peripheral.radio.liquidsoap import LiquidsoapController
 from amc_peripheral.radio.radio_server import get_current_song_metadata, parse_song_info
+from amc_peripheral.radio.track_events import TrackEventServer
 from amc_peripheral.utils.game_utils import announce_in_game
 
 log = logging.getLogger(__name__)
@@ -98,6 +108,95 @@ For example:
 Use pauses sparingly in your speech, for comedic, theatrical, and other effects.
 """
 
+# Kept byte-identical across calls so the provider's prompt cache can reuse it
+NEWS_SYSTEM_PREAMBLE = """\
+You are a helpful bot in Motor Town, an open world driving game, specifically in a dedicated server named "ASEAN Motor Club".
+Use the following information about the game to answer queries. If a user asks a question outside the scope of your knowlege, refer them to the discord channel and other players in the game."""
+
+
+# Editorial attachments larger than this, or not text, stay out of the prompt
+FORUM_ATTACHMENT_MAX_BYTES = 256 * 1024
+
+YDL_INFO_OPTS = {
+    "noplaylist": True,
+    "quiet": True,
+    "default_search": "ytsearch",
+    "cookiefile": YT_COOKIES_PATH,
+    "js_runtimes": {"deno": {"path": DENO_PATH}},
+}
+
+# Characters replaced with "_" when naming downloaded song requests
+UNSAFE_FILENAME_RE = re.compile(r"[^a-zA-Z0-9]")
+
+# Byte table applying UNSAFE_FILENAME_RE to ASCII text in one pass
+_SLUG_TABLE = bytes(
+    c if chr(c).isascii() and chr(c).isalnum() else ord("_") for c in range(256)
+)
+
+# Accepted values for on/off game chat commands
+GAME_BOOL_ARGS = {"true": True, "false": False}
+
+# "**Name:** /command args" as relayed from the game chat
+GAME_COMMAND_RE = re.compile(
+    r"\*\*(?P<name>.+):\*\* /(?P<command>\w+)(?: (?P<args>.+))?"
+)
+
+# Jingles, news and the gazette often fire together; share one history scan
+NEWS_CONTEXT_TTL = 300
+
+# Recent chat per channel, kept from on_message so news prep needs no history scan
+MESSAGE_CACHE_SIZE = 2000
+
+# Scheduled jingle and news updates are skipped below this many recent messages
+MIN_ACTIVITY_MESSAGES = 5
+
+# While Liquidsoap has pushed a track change this recently, the now-playing
+# poll stands down; it only covers for a missed or unavailable push
+TRACK_PUSH_GRACE = 600
+
+# Concurrent attachment downloads while compiling the playlist
+PLAYLIST_DOWNLOAD_CONCURRENCY = 8
+
+# Seconds of quiet on the song channels before the playlist is recompiled
+COMPILE_PLAYLIST_DEBOUNCE = 2.0
+
+# Radio channel chatter is deleted in batches of up to Discord's bulk
+# delete limit, collected over this many seconds
+RADIO_DELETE_BATCH_SIZE = 100
+RADIO_DELETE_BATCH_WINDOW = 2.0
+
+# Large enough to hold a whole TTS clip, so each file is a single write
+AUDIO_WRITE_BUFFER = 1 << 19
+
+# Uploaded songs are streamed to disk in chunks of this size
+ATTACHMENT_CHUNK_SIZE = 1 << 16
+
+# Song downloads can outlast the session-wide total timeout, so they are
+# bounded only by connect and per-read stalls
+ATTACHMENT_DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(
+    total=None, sock_connect=10, sock_read=30
+)
+
+# Jingle scripts are independent, so their TTS requests overlap up to this limit
+TTS_CONCURRENCY = 3
+
+
+def _run_blocking(func, /, *args, **kwargs):
+    """Run a blocking call in the default executor.
+
+    Unlike asyncio.to_thread this skips copying the contextvars context,
+    which nothing in these calls reads.
+    """
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def _safe_filename(text: str) -> str:
+    """Replace everything but ASCII letters and digits with "_"."""
+    if text.isascii():
+        return text.encode().translate(_SLUG_TABLE).decode()
+    return UNSAFE_FILENAME_RE.sub("_", text)
+
 
 class LinkView(discord.ui.View):
     def __init__(self, url: str, label: str = "Open Link"):
@@ -114,27 +213,72 @@ class RadioCog(commands.Cog):
             api_key=OPENAI_API_KEY_OPENROUTER, base_url="https://openrouter.ai/api/v1"
         )
         self.local_tz = ZoneInfo("Asia/Bangkok")
-        self.lq = LiquidsoapController()
+        self.lq = LiquidsoapController(
+            host=LIQUIDSOAP_TELNET_HOST,
+            port=LIQUIDSOAP_TELNET_PORT,
+            unix_path=LIQUIDSOAP_SOCKET_PATH,
+        )
 
         # State
         self.knowledge_system_message = None
+        self._system_message_cached = NEWS_SYSTEM_PREAMBLE
+        self._news_ctx_cache: dict[tuple[int, int], list] = {}
+        # (timestamp, author, content, is_bot) per channel
+        self.msg_cache = {
+            GENERAL_CHANNEL_ID: deque(maxlen=MESSAGE_CACHE_SIZE),
+            GAME_CHAT_CHANNEL_ID: deque(maxlen=MESSAGE_CACHE_SIZE),
+        }
+        self._msg_cache_primed: set[int] = set()
         self.embed_message_id = None
+        self._radio_channel = None
+        self._last_metadata_filename = None
+        # Pushed and polled updates share one lock so only one posts the embed
+        self._embed_lock = asyncio.Lock()
+        self._embed_message_found = asyncio.Event()
+        self._track_events = TrackEventServer(RADIO_TRACK_EVENTS_PORT)
+        self._track_watcher: asyncio.Task | None = None
+        self._last_track_push: float | None = None
+        self._embed_template = self._build_embed_template()
+        self._link_view = None
         self.user_requests = {}
+        # Normalized titles, with a set mirroring the deque for lookups
         self.recent_song_queue = deque(maxlen=10)
+        self._recent_songs: set[str] = set()
         self.banned_requesters = [
             "LemurStreet",
         ]
         self.db = RadioDB(RADIO_DB_PATH)
+        self._ydl_info = None
+        self._ydl_info_lock = threading.Lock()
+        # Id of the knowledge.txt attachment behind knowledge_system_message
+        self._knowledge_attachment_id = None
+        self._compile_pending: asyncio.TimerHandle | None = None
+        self._radio_delete_queue: asyncio.Queue[discord.Message] = asyncio.Queue()
 
     async def cog_load(self):
         self.post_gazette_task.start()
         self.update_jingles.start()
         self.update_news.start()
         self.update_current_song_embed.start()
+        self.refresh_knowledge.start()
+        self.delete_radio_messages.start()
+
+        try:
+            await self._track_events.start()
+            self._track_watcher = asyncio.create_task(self._watch_track_events())
+        except OSError as e:
+            log.warning(f"Track events unavailable, polling now-playing only: {e}")
+
+        try:
+            removed = await _run_blocking(prune_tts_cache)
+            if removed:
+                log.info(f"Pruned {removed} files from the TTS cache")
+        except Exception as e:
+            log.error(f"Failed to prune TTS cache: {e}")
 
         # Load knowledge on start
         try:
-            self.knowledge_system_message = await self.fetch_knowledge()
+            self._set_knowledge(await self.fetch_knowledge())
         except Exception as e:
             log.error(f"Failed to load initial knowledge: {e}")
 
@@ -143,25 +287,93 @@ class RadioCog(commands.Cog):
         self.update_jingles.cancel()
         self.update_news.cancel()
         self.update_current_song_embed.cancel()
+        self.refresh_knowledge.cancel()
+        self.delete_radio_messages.cancel()
+        if self._track_watcher is not None:
+            self._track_watcher.cancel()
+        await self._track_events.stop()
+        if self._compile_pending is not None:
+            self._compile_pending.cancel()
+        await self.lq.close()
+        if self._ydl_info is not None:
+            self._ydl_info.close()
 
     # --- Helpers ---
 
+    def _set_knowledge(self, knowledge):
+        self.knowledge_system_message = knowledge
+        self._system_message_cached = NEWS_SYSTEM_PREAMBLE + (knowledge or "")
+
+    @staticmethod
+    def _message_entry(message: discord.Message):
+        return (
+            message.created_at,
+            message.author.display_name,
+            message.content,
+            message.author.bot,
+        )
+
+    def _cache_message(self, message: discord.Message):
+        cache = self.msg_cache.get(message.channel.id)
+        if cache is not None:
+            cache.append(self._message_entry(message))
+
+    async def _cached_messages(self, channel_id, cutoff):
+        """Return cached message entries newer than cutoff.
+
+        The first call per channel fills the cache from one history fetch;
+        after that on_message keeps it current.
+        """
+        if channel_id not in self._msg_cache_primed:
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                return []
+            live = self.msg_cache[channel_id]
+            history = [
+                self._message_entry(m)
+                async for m in channel.history(limit=MESSAGE_CACHE_SIZE)
+            ]
+            primed = deque(reversed(history), maxlen=MESSAGE_CACHE_SIZE)
+            # Keep anything on_message appended while the history was loading
+            last = primed[-1][0] if primed else None
+            primed.extend(e for e in live if last is None or e[0] > last)
+            self.msg_cache[channel_id] = primed
+            self._msg_cache_primed.add(channel_id)
+        return [e for e in self.msg_cache[channel_id] if e[0] > cutoff]
+
+    async def _has_recent_activity(self, hours=12):
+        """Whether chat has been busy enough to be worth an LLM round-trip."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        general = await self._cached_messages(GENERAL_CHANNEL_ID, cutoff)
+        game = await self._cached_messages(GAME_CHAT_CHANNEL_ID, cutoff)
+        count = sum(1 for entry in general if not entry[3]) + len(game)
+        return count >= MIN_ACTIVITY_MESSAGES
+
     async def fetch_knowledge(self):
         files_channel = self.bot.get_channel(FILES_CHANNEL_ID)
         if not files_channel:
             # Fallback/Retry logic could be here, or just raise
             return ""
 
-        files_messages = [
-            m async for m in files_channel.history(limit=4) if m.attachments
-        ]
-        for m in files_messages:
-            if m.attachments[0].filename == "knowledge.txt":
-                file_bytes = await m.attachments[0].read()
+        # Stop at the newest knowledge.txt; later pages are never requested
+        async for m in files_channel.history(limit=8):
+            if m.attachments and m.attachments[0].filename == "knowledge.txt":
+                attachment = m.attachments[0]
+                # Every update is a new upload, so the same attachment means
+                # the knowledge we already hold
+                if (
+                    attachment.id == self._knowledge_attachment_id
+                    and self.knowledge_system_message
+                ):
+                    return self.knowledge_system_message
+                file_bytes = await attachment.read()
                 try:
-                    return file_bytes.decode("utf-8")
+                    knowledge = file_bytes.decode("utf-8")
                 except UnicodeDecodeError:
                     log.error("Failed to extract knowledge")
+                    break
+                self._knowledge_attachment_id = attachment.id
+                return knowledge
         raise Exception("Failed to find knowledge")
 
     async def fetch_forum_messages(
@@ -187,50 +399,68 @@ class RadioCog(commands.Cog):
             async for message in thread.history(**history_kwargs):
                 acc += f"{message.content}\n\n"
                 for attachment in message.attachments:
+                    content_type = attachment.content_type or "text/"
+                    if (
+                        attachment.size > FORUM_ATTACHMENT_MAX_BYTES
+                        or not content_type.startswith("text/")
+                    ):
+                        log.info(f"Skipping attachment {attachment.filename}")
+                        continue
                     file_bytes = await attachment.read()
-                    try:
-                        text_content = file_bytes.decode("utf-8")
-                        acc += f"{text_content}\n\n"
-                    except Exception:
-                        log.error(f"Failed to decode {attachment.filename}")
+                    acc += f"{file_bytes.decode('utf-8', errors='ignore')}\n\n"
         return acc
 
-    async def fetch_news_context(self, hours=12):
-        now = datetime.now(self.local_tz)
-
-        knowledge = self.knowledge_system_message or ""
-        system_message = """\
-You are a helpful bot in Motor Town, an open world driving game, specifically in a dedicated server named "ASEAN Motor Club".
-Use the following information about the game to answer queries. If a user asks a question outside the scope of your knowlege, refer them to the discord channel and other players in the game."""
-        system_message = system_message + knowledge
-
-        discord_messages = []
-        gen_channel = self.bot.get_channel(GENERAL_CHANNEL_ID)
-        if gen_channel:
-            async for m in gen_channel.history(
-                after=datetime.now() - timedelta(hours=hours), oldest_first=True
-            ):
-                if not m.author.bot:
-                    # pyrefly: ignore [bad-argument-type]
-                    discord_messages.append(f"@{m.author.display_name}: {m.content}")
-
-        game_messages = []
-        game_chat = self.bot.get_channel(GAME_CHAT_CHANNEL_ID)
-        if game_chat:
-            async for m in game_chat.history(
-                after=datetime.now() - timedelta(hours=hours), oldest_first=True
-            ):
-                # pyrefly: ignore [bad-argument-type]
-                game_messages.append(f"{m.content}")
+    async def fetch_news_context(self, hours=12, fresh=False):
+        """Return the news prompt context, memoized for NEWS_CONTEXT_TTL.
+
+        fresh rebuilds it regardless, for forced updates that must see the
+        message that triggered them.
+        """
+        bucket = int(time.monotonic() // NEWS_CONTEXT_TTL)
+        key = (hours, bucket)
+        if not fresh and (context := self._news_ctx_cache.get(key)) is not None:
+            return context
+
+        context = await self._build_news_context(hours)
+        # Drop entries from earlier windows before storing the new one
+        self._news_ctx_cache = {
+            k: v for k, v in self._news_ctx_cache.items() if k[1] == bucket
+        }
+        self._news_ctx_cache[key] = context
+        return context
+
+    async def _build_news_context(self, hours):
+        local_tz = self.local_tz
+        now_utc = datetime.now(timezone.utc)
+        now = now_utc.astimezone(local_tz)
+
+        cutoff = now_utc - timedelta(hours=hours)
+        discord_messages = [
+            f"@{author}: {content}"
+            for _, author, content, is_bot in await self._cached_messages(
+                GENERAL_CHANNEL_ID, cutoff
+            )
+            if not is_bot
+        ]
+        game_messages = [
+            content
+            for _, _, content, _ in await self._cached_messages(
+                GAME_CHAT_CHANNEL_ID, cutoff
+            )
+        ]
 
         if self.bot.guilds:
-            events = self.bot.guilds[0].scheduled_events
+            events = []
+            for event in self.bot.guilds[0].scheduled_events:
+                start = event.start_time
+                if start.tzinfo is None:
+                    start = start.replace(tzinfo=timezone.utc)
+                if start > now_utc:
+                    events.append((start, event))
+            events.sort(key=lambda pair: pair[0])
             events_str = "\n\n".join(
-                [
-                    f"## {event.name}\nDate/Time:{event.start_time.replace(tzinfo=ZoneInfo('UTC')).astimezone(self.local_tz).strftime('%A, %Y-%m-%d %H:%M')}\nLocation: {event.location}\n{event.description}"
-                    for event in events
-                    if event.start_time > datetime.now(tz=timezone.utc)
-                ]
+                f"## {event.name}\nDate/Time:{start.astimezone(local_tz):%A, %Y-%m-%d %H:%M}\nLocation: {event.location}\n{event.description}"
+                for start, event in events
             )
         else:
             events_str = ""
@@ -240,7 +470,7 @@ Use the following information about the game to answer queries. If a user asks a
             editorial = (
                 await self.fetch_forum_messages(
                     editorial_channel,
-                    after=datetime.now(tz=timezone.utc) - timedelta(days=1),
+                    after=now_utc - timedelta(days=1),
                     include_dates=True,
                 )
                 or ""
@@ -249,7 +479,16 @@ Use the following information about the game to answer queries. If a user asks a
             editorial = ""
 
         return [
-            {"role": "system", "content": system_message},
+            {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": self._system_message_cached,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+            },
             {"role": "user", "content": "# Editorial columns:\n" + editorial},
             {"role": "user", "content": "# Upcoming events:\n\n" + events_str},
             {
@@ -270,8 +509,8 @@ The current date (in Bangkok GMT+7 timezone) is: {now.strftime("%A, %Y-%m-%d %H:
             },
         ]
 
-    async def generate_jingles_gen(self):
-        context = await self.fetch_news_context()
+    async def generate_jingles_gen(self, fresh=False):
+        context = await self.fetch_news_context(fresh=fresh)
         completion = await self.openai_client_openrouter.beta.chat.completions.parse(
             model=DEFAULT_AI_MODEL,
             reasoning_effort="high",
@@ -301,14 +540,21 @@ Do not make up the name of the previous or next songs, as they are unknown.
         # pyrefly: ignore [missing-attribute]
         jingles = answer.scripts
 
-        for jingle in jingles[:6]:
-            audio_bytes = await asyncio.to_thread(
-                tts_google, discord.utils.remove_markdown(jingle), use_markup=True
-            )
-            yield (jingle, audio_bytes)
+        jingles = jingles[:6]
+        semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+        async def synthesize(jingle):
+            async with semaphore:
+                return await tts_google(
+                    discord.utils.remove_markdown(jingle), use_markup=True
+                )
 
-    async def generate_news_content(self):
-        context = await self.fetch_news_context()
+        audio = await asyncio.gather(*(synthesize(j) for j in jingles))
+        for pair in zip(jingles, audio):
+            yield pair
+
+    async def generate_news_content(self, fresh=False):
+        context = await self.fetch_news_context(fresh=fresh)
         # pyrefly: ignore [no-matching-overload]
         completion = await self.openai_client_openrouter.chat.completions.create(
             model=DEFAULT_AI_MODEL,
@@ -360,6 +606,18 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
             return answer
         return "Failed, please try again."
 
+    def _extract_song_info(self, search_query):
+        """Look up a song with a shared YoutubeDL, created on first use.
+
+        Building a YoutubeDL loads every extractor, so one instance serves all
+        lookups; the lock keeps concurrent requests from using it at once.
+        """
+        with self._ydl_info_lock:
+            if self._ydl_info is None:
+                # pyrefly: ignore [bad-argument-type]
+                self._ydl_info = yt_dlp.YoutubeDL(YDL_INFO_OPTS)
+            return self._ydl_info.extract_info(search_query, download=False)
+
     async def request_song(
         self,
         youtube_link: str,
@@ -367,6 +625,25 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         discord_id: str | None = None,
         bypass_throttling=False,
     ):
+        title, duration, download = await self.start_song_request(
+            youtube_link, requester, discord_id, bypass_throttling
+        )
+        await download
+        return title, duration
+
+    async def start_song_request(
+        self,
+        youtube_link: str,
+        requester: str,
+        discord_id: str | None = None,
+        bypass_throttling=False,
+    ) -> tuple[str, int, asyncio.Task]:
+        """Look up and validate a request, then start its download.
+
+        Returns as soon as the title and duration are known, along with the
+        task that downloads the audio and pushes it onto the request queue,
+        so callers can announce the song while it downloads.
+        """
         now = datetime.now(self.local_tz)
 
         # --- Throttling Logic ---
@@ -402,20 +679,8 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         if "youtube.com" not in search_query and "youtu.be" not in search_query:
             search_query = f"ytsearch:{search_query}"
 
-        ydl_info_opts = {
-            "noplaylist": True,
-            "quiet": True,
-            "default_search": "ytsearch",
-            "cookiefile": YT_COOKIES_PATH,
-            "js_runtimes": {"deno": {"path": DENO_PATH}},
-        }
-
         try:
-            # pyrefly: ignore [bad-argument-type]
-            with yt_dlp.YoutubeDL(ydl_info_opts) as ydl:
-                info_dict = await asyncio.to_thread(
-                    ydl.extract_info, search_query, download=False
-                )
+            info_dict = await _run_blocking(self._extract_song_info, search_query)
             # pyrefly: ignore [bad-typed-dict-key]
             if "entries" in info_dict and info_dict["entries"]:
                 # pyrefly: ignore [bad-typed-dict-key]
@@ -427,13 +692,11 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
 
         title = info_dict.get("title", "Unknown")
         duration = info_dict.get("duration", 0)
-        webpage_url = info_dict.get("webpage_url")
 
         # --- Checks ---
         # pyrefly: ignore [missing-attribute]
         normalized_title = title.lower().strip()
-        normalized_queue = [t.lower().strip() for t in self.recent_song_queue]
-        if normalized_title in normalized_queue:
+        if normalized_title in self._recent_songs:
             raise Exception(
                 f'"{title}" has been queued recently. Please choose a different song.'
             )
@@ -446,10 +709,23 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
                 f'"{title}" is too long ({duration // 60}m). Max duration is 10 minutes.'
             )
 
+        download = asyncio.create_task(
+            self._download_then_push(
+                info_dict, requester, discord_id, normalized_title, now
+            )
+        )
+        return title, duration, download
+
+    async def _download_then_push(
+        self, info_dict, requester, discord_id, normalized_title, now
+    ):
+        title = info_dict.get("title", "Unknown")
+        webpage_url = info_dict.get("webpage_url")
+
         # --- Download ---
-        safe_requester = re.sub(r"[^a-zA-Z0-9]", "_", requester)
-        # pyrefly: ignore [no-matching-overload]
-        safe_title = re.sub(r"[^a-zA-Z0-9]", "_", title)
+        safe_requester = _safe_filename(requester)
+        # pyrefly: ignore [bad-argument-type]
+        safe_title = _safe_filename(title)
         base_filename = f"{safe_requester}-{safe_title}"
 
         ydl_opts = {
@@ -481,20 +757,23 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
             # pyrefly: ignore [bad-argument-type]
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                 # pyrefly: ignore [bad-argument-type]
-                await asyncio.to_thread(ydl.download, [webpage_url])
+                await _run_blocking(ydl.download, [webpage_url])
         except Exception as e:
             raise Exception(f"Failed to download audio: {e}")
 
         # --- Push to Queue ---
         local_path = f"{REQUESTS_PATH}/{base_filename}.mp3"
         try:
-            await asyncio.to_thread(self.lq.push_to_queue, "song_requests", local_path)
+            await self.lq.push_to_queue("song_requests", local_path)
         except Exception as e:
             log.error(f"Failed to push song to queue via telnet, but continuing: {e}")
 
         # Update throttling
         self.user_requests[requester].append(now)
-        self.recent_song_queue.append(title)
+        if len(self.recent_song_queue) == self.recent_song_queue.maxlen:
+            self._recent_songs.discard(self.recent_song_queue[0])
+        self.recent_song_queue.append(normalized_title)
+        self._recent_songs.add(normalized_title)
 
         # Persist request
         try:
@@ -507,62 +786,142 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         except Exception as e:
             log.error(f"Failed to persist song request: {e}")
 
-        return title, duration
+    @staticmethod
+    async def _attachment_messages(channel):
+        """Yield the channel's messages that carry attachments.
+
+        discord.py stops paging as soon as a page comes back short, so the
+        walk ends without a trailing empty request.
+        """
+        async for message in channel.history(limit=None):
+            if message.attachments:
+                yield message
+
+    async def _save_attachments(self, attachments, folder, semaphore):
+        """Download attachments into folder concurrently. Returns the saved paths.
+
+        A failed download keeps the copy already on disk, if any, so a
+        transient error does not drop the song from rotation.
+        """
+
+        async def save(attachment):
+            local_path = os.path.join(folder, attachment.filename)
+            # Files already on disk at the right size are unchanged uploads
+            if (
+                os.path.exists(local_path)
+                and os.path.getsize(local_path) == attachment.size
+            ):
+                return local_path
+            async with semaphore:
+                await attachment.save(local_path)
+            return local_path
+
+        results = await asyncio.gather(
+            *(save(a) for a in attachments), return_exceptions=True
+        )
+        saved = []
+        for attachment, result in zip(attachments, results):
+            if not isinstance(result, BaseException):
+                saved.append(result)
+                continue
+            log.error(f"Failed to download {attachment.filename}: {result}")
+            local_path = os.path.join(folder, attachment.filename)
+            if os.path.exists(local_path):
+                saved.append(local_path)
+        return saved
+
+    async def _stream_attachment(self, attachment, local_path):
+        """Download an attachment straight to disk instead of into memory.
+
+        The file is written under a temporary name and moved into place, so
+        Liquidsoap never sees a partial song. File I/O runs in the executor
+        so the event loop is not blocked on each chunk.
+        """
+        tmp_path = f"{local_path}.part"
+        async with self.bot.http_session.get(
+            attachment.url, timeout=ATTACHMENT_DOWNLOAD_TIMEOUT
+        ) as resp:
+            resp.raise_for_status()
+            try:
+                f = await _run_blocking(open, tmp_path, "wb")
+                try:
+                    async for chunk in resp.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+                        await _run_blocking(f.write, chunk)
+                finally:
+                    await _run_blocking(f.close)
+                await _run_blocking(os.replace, tmp_path, local_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    async def _save_channel(self, channel_id, folder, semaphore, sort=False):
+        """Download a channel's attachments. Returns None if the channel is unknown."""
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return None
+
+        # Keep only what is needed from each message rather than the message
+        pairs = [
+            (m.content, a)
+            async for m in self._attachment_messages(channel)
+            for a in m.attachments
+        ]
+        if sort:
+            # Stable, so a message's attachments keep their upload order
+            pairs.sort(key=operator.itemgetter(0))
+        attachments = [a for _, a in pairs]
+        return await self._save_attachments(attachments, folder, semaphore)
+
+    def _schedule_compile(self):
+        """Compile the playlist once a burst of song channel changes settles."""
+        if self._compile_pending is not None:
+            self._compile_pending.cancel()
+        self._compile_pending = self.bot.loop.call_later(
+            COMPILE_PLAYLIST_DEBOUNCE,
+            lambda: self.bot.loop.create_task(self.compile_playlist()),
+        )
 
     async def compile_playlist(self):
+        event_songs_path = os.path.join(RADIO_PATH, "event_songs")
+        race_songs_path = os.path.join(RADIO_PATH, "race_songs")
         os.makedirs(PLAYLIST_PATH, exist_ok=True)
         os.makedirs(REQUESTS_PATH, exist_ok=True)
-        os.makedirs(os.path.join(RADIO_PATH, "event_songs"), exist_ok=True)
-        os.makedirs(os.path.join(RADIO_PATH, "race_songs"), exist_ok=True)
+        os.makedirs(event_songs_path, exist_ok=True)
+        os.makedirs(race_songs_path, exist_ok=True)
         os.makedirs(JINGLES_PATH, exist_ok=True)
 
-        playlist_list = ""
+        # One limit shared by all three channels
+        semaphore = asyncio.Semaphore(PLAYLIST_DOWNLOAD_CONCURRENCY)
+        playlist_paths, _, _ = await asyncio.gather(
+            self._save_channel(PLAYLIST_CHANNEL, PLAYLIST_PATH, semaphore, sort=True),
+            self._save_channel(EVENT_SONGS_CHANNEL, event_songs_path, semaphore),
+            self._save_channel(RACE_SONGS_CHANNEL, race_songs_path, semaphore),
+        )
 
-        files_channel = self.bot.get_channel(PLAYLIST_CHANNEL)
-        messages = [m async for m in files_channel.history(limit=None) if m.attachments]
-        messages = sorted(messages, key=lambda m: m.content)
+        if playlist_paths is None:
+            # Keep the current playlist rather than replacing it with nothing
+            log.warning("Playlist channel unavailable, leaving playlist.txt as is")
+            return
 
-        for message in messages:
-            for attachment in message.attachments:
-                local_path = os.path.join(PLAYLIST_PATH, attachment.filename)
-                await attachment.save(local_path)
-                playlist_list += f"\n{local_path}"
-
-        with open(os.path.join(PLAYLIST_PATH, "playlist.txt"), "w") as f:
-            f.write(playlist_list)
-
-        # Event songs
-        event_songs_channel = self.bot.get_channel(EVENT_SONGS_CHANNEL)
-        if event_songs_channel:
-            event_songs_messages = [
-                m
-                async for m in event_songs_channel.history(limit=None)
-                if m.attachments
-            ]
-            for message in event_songs_messages:
-                for attachment in message.attachments:
-                    local_path = os.path.join(
-                        RADIO_PATH, "event_songs", attachment.filename
-                    )
-                    await attachment.save(local_path)
-
-        # Race songs
-        race_songs_channel = self.bot.get_channel(RACE_SONGS_CHANNEL)
-        if race_songs_channel:
-            race_songs_messages = [
-                m async for m in race_songs_channel.history(limit=None) if m.attachments
-            ]
-            for message in race_songs_messages:
-                for attachment in message.attachments:
-                    local_path = os.path.join(
-                        RADIO_PATH, "race_songs", attachment.filename
-                    )
-                    await attachment.save(local_path)
+        # Swap the file in whole so liquidsoap never reads a partial playlist
+        playlist_file = os.path.join(PLAYLIST_PATH, "playlist.txt")
+        tmp_file = f"{playlist_file}.tmp"
+        with open(tmp_file, "w", buffering=1 << 16) as f:
+            f.write("\n".join(playlist_paths))
+        os.replace(tmp_file, playlist_file)
 
     async def game_request_song(self, song_name, requester):
         channel = self.bot.get_channel(GAME_ANNOUNCEMENTS_CHANNEL_ID)
         try:
-            title, _ = await self.request_song(song_name, requester)
+            title, _, download = await self.start_song_request(song_name, requester)
+        except Exception as e:
+            await self._report_game_request_failure(channel, song_name, requester, e)
+            return
+
+        # Announce while the audio downloads; a failed announcement must not
+        # leave the download uncollected
+        try:
             await channel.send(f"Queued {title} for you, {requester}!")
             await announce_in_game(
                 self.bot.http_session,
@@ -570,7 +929,24 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
                 color="FEE75C",
             )
         except Exception as e:
-            await channel.send(f"Failed to queue {song_name} for {requester}: {e}")
+            log.error(f"Failed to announce song request: {e}")
+
+        try:
+            await download
+        except Exception as e:
+            await self._report_game_request_failure(channel, song_name, requester, e)
+
+    async def _report_game_request_failure(self, channel, song_name, requester, error):
+        """Tell both Discord and the in-game player that a request failed."""
+        message = f"Failed to queue {song_name} for {requester}: {error}"
+        results = await asyncio.gather(
+            channel.send(message),
+            announce_in_game(self.bot.http_session, message, color="FEE75C"),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log.error(f"Failed to report song request failure: {result}")
 
     async def game_like_song(self, requester):
         metadata = await get_current_song_metadata(self.bot.http_session)
@@ -627,7 +1003,7 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         # However, we can extract the function and run it manually.
         # Let's extract the core logic to a helper if we want to trigger it manually.
         # For now, I'll extract logic from the loop body to `_update_jingles_logic` and call that.
-        await self._update_jingles_logic()
+        await self._update_jingles_logic(force=True)
         await interaction.followup.send("Updated")
 
     @app_commands.command(name="post_gazette", description="Generate a gazette")
@@ -767,49 +1143,44 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
     @app_commands.checks.has_permissions(administrator=True)
     async def regenerate_news_cmd(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        await self._update_news_logic()
+        await self._update_news_logic(force=True)
         await interaction.followup.send("Updated")
 
     @app_commands.command(name="skip_radio_track", description="Skip a radio track")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def skip_radio_track(self, interaction: discord.Interaction):
         await interaction.response.send_message("Skipping", ephemeral=True)
-        self.bot.loop.create_task(
-            asyncio.to_thread(self.lq.skip_current_track, "song_requests")
-        )
+        self.bot.loop.create_task(self.lq.skip_current_track("song_requests"))
 
     @app_commands.command(name="set_event_mode", description="Set event mode")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     @app_commands.checks.has_any_role("DJ", "Event Organiser", 1346047801473105950)
     async def set_event_mode(self, interaction: discord.Interaction, state: bool):
         await interaction.response.send_message("Setting event mode")
-        state_str = "true" if state else "false"
-        self.bot.loop.create_task(
-            asyncio.to_thread(
-                self.lq._send_command, f"var.set event_mode = {state_str}"
-            )
-        )
-        self.bot.loop.create_task(
-            asyncio.to_thread(self.lq._send_command, "var.set race_mode = false")
-        )
+        # One pipelined exchange, so race_mode never clears ahead of event_mode
+        if not await self.lq.set_vars({"event_mode": state, "race_mode": False}):
+            await interaction.followup.send("Failed to set event mode")
 
     @app_commands.command(name="set_race_mode", description="Set race mode")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     @app_commands.checks.has_any_role("DJ", "Event Organiser", 1346047801473105950)
     async def set_race_mode(self, interaction: discord.Interaction, state: bool):
         await interaction.response.send_message("Setting race mode")
-        state_str = "true" if state else "false"
-        self.bot.loop.create_task(
-            asyncio.to_thread(self.lq._send_command, f"var.set race_mode = {state_str}")
-        )
+        if not await self.lq.set_vars({"race_mode": state}):
+            await interaction.followup.send("Failed to set race mode")
 
     # --- Tasks ---
 
-    async def _update_jingles_logic(self):
+    async def _update_jingles_logic(self, force=False):
+        if not force and not await self._has_recent_activity():
+            log.info("Skipping jingle update, chat has been quiet")
+            return
+
         channel = self.bot.get_channel(JINGLES_CHANNEL_ID)
         i = 0
-        async for jingle, jingle_audio in self.generate_jingles_gen():
-            with open(os.path.join(JINGLES_PATH, f"jingle{i}.mp3"), "wb") as f:
+        async for jingle, jingle_audio in self.generate_jingles_gen(fresh=force):
+            path = os.path.join(JINGLES_PATH, f"jingle{i}.mp3")
+            with open(path, "wb", buffering=AUDIO_WRITE_BUFFER) as f:
                 f.write(jingle_audio)
 
             if channel:
@@ -848,23 +1219,27 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
     async def before_post_gazette_task(self):
         await self.bot.wait_until_ready()
 
-    async def _update_news_logic(self):
+    async def _update_news_logic(self, force=False):
         channel = self.bot.get_channel(DYNAMIC_NEWS_CHANNEL)
         if not channel:
             return
-        news = await self.generate_news_content()
-        news_audio = await asyncio.to_thread(
-            tts_google, discord.utils.remove_markdown(news), use_markup=True
+        if not force and not await self._has_recent_activity():
+            log.info("Skipping news update, chat has been quiet")
+            return
+        news = await self.generate_news_content(fresh=force)
+        news_audio = await tts_google(
+            discord.utils.remove_markdown(news), use_markup=True
         )
-        message = await channel.send(
+        # The audio is already in memory, so write it directly rather than
+        # waiting for the upload and downloading it back from the CDN
+        path = os.path.join(JINGLES_PATH, "news.mp3")
+        with open(path, "wb", buffering=AUDIO_WRITE_BUFFER) as f:
+            f.write(news_audio)
+
+        await channel.send(
             news[:2000], file=discord.File(BytesIO(news_audio), filename="news.mp3")
         )
 
-        if message.attachments:
-            attachment = message.attachments[0]
-            local_path = os.path.join(JINGLES_PATH, attachment.filename)
-            await attachment.save(local_path)
-
     @tasks.loop(
         time=[
             dt_time(hour=0, minute=45, tzinfo=timezone.utc),
@@ -881,16 +1256,86 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
     async def before_update_news(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(hours=1)
+    async def refresh_knowledge(self):
+        try:
+            knowledge = await self.fetch_knowledge()
+        except Exception as e:
+            log.error(f"Failed to refresh knowledge: {e}")
+            return
+        # Only a changed file rebuilds the cached system prompt
+        if knowledge and knowledge != self.knowledge_system_message:
+            self._set_knowledge(knowledge)
+
+    @refresh_knowledge.before_loop
+    async def before_refresh_knowledge(self):
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _build_embed_template():
+        """The now-playing embed's static part, as a dict to build embeds from."""
+        embed = discord.Embed(
+            title="📻 AMC Radio",
+            color=discord.Color.yellow(),
+        )
+        embed.add_field(
+            name="How to tune in",
+            value="Find **ASEAN Motor Club** in the game's radio channel list, or\n**[Listen on the Website](https://www.aseanmotorclub.com/radio)**",
+            inline=False,
+        )
+        embed.add_field(
+            name="How to request songs",
+            value="Use the `/song_request` command in this channel or in the game chat, followed by the name of the song/artist, or a youtube link",
+            inline=False,
+        )
+        return embed.to_dict()
+
+    def _get_radio_channel(self):
+        if self._radio_channel is None:
+            self._radio_channel = self.bot.get_channel(RADIO_CHANNEL_ID)
+        return self._radio_channel
+
     @tasks.loop(seconds=10)
     async def update_current_song_embed(self):
-        radio_channel = self.bot.get_channel(RADIO_CHANNEL_ID)
-        if not radio_channel:
+        if (
+            self._last_track_push is not None
+            and time.monotonic() - self._last_track_push < TRACK_PUSH_GRACE
+        ):
+            return
+        if not self._get_radio_channel():
             # log.warning(f'Radio channel cannot be found from channel id: {RADIO_CHANNEL_ID}')
             return
 
         metadata = await get_current_song_metadata(self.bot.http_session)
         if not metadata:
             return
+        await self._render_song_embed(metadata)
+
+    async def _watch_track_events(self):
+        """Render the now-playing embed for each track change Liquidsoap pushes."""
+        # Wait for the existing embed to be located so no duplicate is posted
+        await self._embed_message_found.wait()
+        while True:
+            metadata = await self._track_events.queue.get()
+            self._last_track_push = time.monotonic()
+            try:
+                await self._render_song_embed(metadata)
+            except Exception as e:
+                log.error(f"Failed to render pushed track metadata: {e}")
+
+    async def _render_song_embed(self, metadata):
+        async with self._embed_lock:
+            await self._update_song_embed(metadata)
+
+    async def _update_song_embed(self, metadata):
+        radio_channel = self._get_radio_channel()
+        if not radio_channel:
+            return
+
+        # Most ticks land mid-song; only rebuild the embed when the track changes
+        filename = metadata.get("filename")
+        if self.embed_message_id and filename == self._last_metadata_filename:
+            return
 
         song_info = parse_song_info(metadata)
         if not song_info:
@@ -900,32 +1345,40 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         requester = song_info["requester"]
         song_title = song_info["song_title"]
 
-        embed = discord.Embed(
-            title="📻 AMC Radio",
-            color=discord.Color.yellow(),
-        )
-        embed.add_field(name="Currently Playing", value=f"*{song_title}*", inline=False)
         verb = (
             "Previously requested by" if folder == "prev_requests" else "Requested by"
         )
-        embed.add_field(name=verb, value=requester, inline=False)
-        embed.add_field(
-            name="How to tune in",
-            value="Find **ASEAN Motor Club** in the game's radio channel list, or\n**[Listen on the Website](https://www.aseanmotorclub.com/radio)**",
-            inline=False,
-        )
-        embed.add_field(
-            name="How to request songs",
-            value="Use the `/song_request` command in this channel or in the game chat, followed by the name of the song/artist, or a youtube link",
-            inline=False,
+        # Embed.copy() shares the field dicts, so build a fresh field list
+        # around the static ones instead of editing fields in place
+        template = self._embed_template
+        embed = discord.Embed.from_dict(
+            {
+                **template,
+                "fields": [
+                    {
+                        "name": "Currently Playing",
+                        "value": f"*{song_title}*",
+                        "inline": False,
+                    },
+                    {"name": verb, "value": requester, "inline": False},
+                    *template["fields"],
+                ],
+            }
         )
 
-        view = LinkView("https://www.aseanmotorclub.com/radio", "Listen to Radio")
+        # Views need a running loop, so this one is made on first use
+        if self._link_view is None:
+            self._link_view = LinkView(
+                "https://www.aseanmotorclub.com/radio", "Listen to Radio"
+            )
+        view = self._link_view
 
         if self.embed_message_id:
             try:
-                message = await radio_channel.fetch_message(self.embed_message_id)
+                # A partial message edits with a single PATCH, no fetch first
+                message = radio_channel.get_partial_message(self.embed_message_id)
                 await message.edit(embed=embed, view=view)
+                self._last_metadata_filename = filename
             except discord.NotFound:
                 self.embed_message_id = None
             except Exception as e:
@@ -935,6 +1388,8 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
             try:
                 new_message = await radio_channel.send(embed=embed, view=view)
                 self.embed_message_id = new_message.id
+                self._last_metadata_filename = filename
+                await self._pin_embed(new_message)
             except Exception as e:
                 log.error(f"Error sending new message: {e}")
 
@@ -943,9 +1398,58 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         await self.bot.wait_until_ready()
         radio_channel = self.bot.get_channel(RADIO_CHANNEL_ID)
         if radio_channel:
-            async for m in radio_channel.history(limit=1, oldest_first=True):
-                if m.author.bot:
-                    self.embed_message_id = m.id
+            try:
+                self.embed_message_id = await self._find_embed_message(radio_channel)
+            except Exception as e:
+                log.error(f"Failed to find the now-playing embed: {e}")
+        self._embed_message_found.set()
+
+    async def _find_embed_message(self, radio_channel):
+        """Return the id of the bot's pinned now-playing embed, if any."""
+        title = self._embed_template["title"]
+        for m in await radio_channel.pins():
+            if (
+                m.author.id == self.bot.user.id
+                and m.embeds
+                and m.embeds[0].title == title
+            ):
+                return m.id
+
+        # Embeds posted before pinning was introduced are the channel's
+        # first message; pin it so the lookup above finds it next time
+        async for m in radio_channel.history(limit=1, oldest_first=True):
+            if m.author.id == self.bot.user.id:
+                await self._pin_embed(m)
+                return m.id
+        return None
+
+    async def _pin_embed(self, message):
+        try:
+            await message.pin(reason="AMC radio now-playing embed")
+        except discord.HTTPException as e:
+            log.warning(f"Failed to pin the now-playing embed: {e}")
+
+    @tasks.loop()
+    async def delete_radio_messages(self):
+        """Delete queued radio channel messages with one bulk request."""
+        batch = [await self._radio_delete_queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + RADIO_DELETE_BATCH_WINDOW
+        while len(batch) < RADIO_DELETE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(
+                    await asyncio.wait_for(self._radio_delete_queue.get(), timeout)
+                )
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            await batch[0].channel.delete_messages(batch)
+        except discord.HTTPException as e:
+            log.error(f"Failed to delete radio channel messages: {e}")
 
     # --- Listeners ---
 
@@ -953,10 +1457,11 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
     async def on_message_delete(self, message: discord.Message):
         if message.channel.id == PLAYLIST_CHANNEL:
             if message.attachments:
-                self.bot.loop.create_task(self.compile_playlist())
+                self._schedule_compile()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
+        self._cache_message(message)
         if message.author == self.bot.user:
             return
 
@@ -964,7 +1469,7 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
 
         if channel_id == RADIO_CHANNEL_ID:
             if message.type != discord.MessageType.chat_input_command:
-                await message.delete()
+                self._radio_delete_queue.put_nowait(message)
 
         elif channel_id == SONGS_CHANNEL:
             attachment = None
@@ -976,23 +1481,22 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
 
             if attachment:
                 local_path = os.path.join(SONGS_PATH, attachment.filename)
-                # pyrefly: ignore [bad-argument-type]
-                await attachment.save(local_path)
+                await self._stream_attachment(attachment, local_path)
 
         elif channel_id in [PLAYLIST_CHANNEL, RACE_SONGS_CHANNEL, EVENT_SONGS_CHANNEL]:
             if message.attachments:
-                self.bot.loop.create_task(self.compile_playlist())
+                self._schedule_compile()
 
         elif channel_id == EDITORIAL_CHANNEL_ID:
             # Using unawaited invocation or loop task?
             # Original code: await client.update_news(). But update_news is a task loop.
             # It probably meant running the logic once.
-            await self._update_news_logic()
+            await self._update_news_logic(force=True)
 
         elif channel_id == GAME_CHAT_CHANNEL_ID:
-            if command_match := re.match(
-                r"\*\*(?P<name>.+):\*\* /(?P<command>\w+)(?: (?P<args>.+))?",
-                message.content,
+            # Cheap prefix test first; most game chat is not a command
+            if message.content.startswith("**") and (
+                command_match := GAME_COMMAND_RE.match(message.content)
             ):
                 name = command_match.group("name")
                 command = command_match.group("command")
@@ -1009,14 +1513,15 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
                 elif command == "dislike":
                     self.bot.loop.create_task(self.game_dislike_song(name))
                 elif command == "event_mode" and args:
-                    self.bot.loop.create_task(
-                        asyncio.to_thread(
-                            self.lq._send_command, f"var.set event_mode = {args}"
+                    # Only a literal true/false reaches Liquidsoap
+                    state = GAME_BOOL_ARGS.get(args.strip().lower())
+                    if state is not None:
+                        self.bot.loop.create_task(
+                            self.lq.set_vars({"event_mode": state})
                         )
-                    )
                 elif command == "skip":
                     self.bot.loop.create_task(
-                        asyncio.to_thread(self.lq.skip_current_track, "song_requests")
+                        self.lq.skip_current_track("song_requests")
                     )
 
     @commands.Cog.listener()
@@ -1024,4 +1529,4 @@ Only output the text of the article. Start with "Gangjung, [day of the week, dat
         self, message_before: discord.Message, message: discord.Message
     ):
         if message.channel.id == PLAYLIST_CHANNEL and message.attachments:
-            self.bot.loop.create_task(self.compile_playlist())
+            self._schedule_compile()
@@ -4,22 +4,32 @@ import logging
 from typing import Optional
 import aiohttp
 
+from amc_peripheral.utils.http_utils import get_shared_session
+
 log = logging.getLogger(__name__)
 
 RADIO_SERVER_BASE_URL = "http://localhost:6001"
+# The server is local, so a slow reply means it is stuck rather than busy
+METADATA_TIMEOUT = aiohttp.ClientTimeout(total=2)
 
 
 async def get_current_song_metadata(
-    http_session: aiohttp.ClientSession,
+    http_session: Optional[aiohttp.ClientSession] = None,
 ) -> Optional[dict]:
     """
     Fetch the current song metadata from the radio server.
 
+    Uses the shared process-wide session when http_session is not given.
+
     Returns:
         dict with metadata (e.g., {"filename": "...", ...}) or None on error.
     """
+    if http_session is None:
+        http_session = get_shared_session()
     try:
-        async with http_session.get(f"{RADIO_SERVER_BASE_URL}/metadata") as resp:
+        async with http_session.get(
+            f"{RADIO_SERVER_BASE_URL}/metadata", timeout=METADATA_TIMEOUT
+        ) as resp:
             return await resp.json()
     except Exception as e:
         log.error(f"Could not fetch radio metadata: {e}")
@@ -38,20 +48,23 @@ def parse_song_info(metadata: dict) -> Optional[dict]:
         return None
 
     filename = filename.removeprefix("/var/lib/radio/")
-    try:
-        folder, filepath = filename.split("/")
-        requester, song_path = filepath.split("-", 1)
-        song_title = song_path.removesuffix(".mp3")
-        return {
-            "folder": folder,
-            "requester": requester,
-            "song_title": song_title,
-        }
-    except ValueError:
+    # Expect exactly "folder/requester-title.mp3"
+    folder, sep, filepath = filename.partition("/")
+    if not sep or "/" in filepath:
+        return None
+    requester, sep, song_path = filepath.partition("-")
+    if not sep:
         return None
+    return {
+        "folder": folder,
+        "requester": requester,
+        "song_title": song_path.removesuffix(".mp3"),
+    }
 
 
-async def get_current_song(http_session: aiohttp.ClientSession) -> Optional[str]:
+async def get_current_song(
+    http_session: Optional[aiohttp.ClientSession] = None,
+) -> Optional[str]:
     """
     Get a human-readable string of the currently playing song.
 
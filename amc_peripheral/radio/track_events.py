@@ -0,0 +1,54 @@
+"""Receiver for the track changes Liquidsoap pushes from its on_track hook."""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+TRACK_EVENTS_PATH = "/track"
+
+
+class TrackEventServer:
+    """
+    Listen on localhost for track metadata posted by Liquidsoap.
+
+    Each POST body is the JSON metadata of the track that just started; it is
+    put on ``queue`` for the radio cog to render.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.queue: asyncio.Queue[dict] = asyncio.Queue()
+        self._runner: Optional[web.AppRunner] = None
+
+    async def handle_track(self, request: web.Request) -> web.Response:
+        try:
+            metadata = await request.json()
+        except json.JSONDecodeError:
+            return web.Response(status=400, text="Expected a JSON object")
+        if not isinstance(metadata, dict):
+            return web.Response(status=400, text="Expected a JSON object")
+        self.queue.put_nowait(metadata)
+        return web.Response(status=204)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post(TRACK_EVENTS_PATH, self.handle_track)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except BaseException:
+            await self.stop()
+            raise
+        log.info(f"Listening for track events on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -5,75 +5,186 @@ Note: ssml must be well-formed according to:
     https://www.w3.org/TR/speech-synthesis/
 """
 
-from google.cloud import texttospeech
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+from collections import defaultdict
 
-# Instantiates a client
-client = texttospeech.TextToSpeechClient()
+from amc_peripheral.settings import TTS_CACHE_MAX_MB, TTS_CACHE_PATH
 
+log = logging.getLogger(__name__)
 
-def tts(
-    text,
-    voice_language_code="en-GB",
-    voice_name="en-GB-Chirp3-HD-Leda",
-    use_markup=False,
-    volume_gain_db=6.0,
-):
-    # Set the text input to be synthesized
-    if use_markup:
-        synthesis_input = texttospeech.SynthesisInput(markup=text)
-    else:
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-    # Build the voice request, select the language code ("en-US") and the ssml
-    # voice gender ("neutral")
-    voice = texttospeech.VoiceSelectionParams(
-        language_code=voice_language_code, name=voice_name
-    )
+_client = None
+# One lock per cache key, so identical concurrent requests share one RPC
+_cache_locks = defaultdict(asyncio.Lock)
+
+
+@functools.cache
+def _texttospeech():
+    """Import the client library on first use; it pulls in grpc and protobuf."""
+    from google.cloud import texttospeech
+
+    return texttospeech
+
+
+def _get_client():
+    """Return the async client, created on first use inside the event loop."""
+    global _client
+    if _client is None:
+        _client = _texttospeech().TextToSpeechAsyncClient()
+    return _client
 
-    # Select the type of audio file you want returned
-    audio_config = texttospeech.AudioConfig(
+
+@functools.lru_cache(maxsize=32)
+def _voice(language_code, name):
+    texttospeech = _texttospeech()
+    return texttospeech.VoiceSelectionParams(language_code=language_code, name=name)
+
+
+@functools.lru_cache(maxsize=32)
+def _mp3_config(volume_gain_db):
+    texttospeech = _texttospeech()
+    return texttospeech.AudioConfig(
         audio_encoding=texttospeech.AudioEncoding.MP3, volume_gain_db=volume_gain_db
     )
 
+
+async def _synthesize(synthesis_input, voice, audio_config):
     # Perform the text-to-speech request on the text input with the selected
     # voice parameters and audio file type
-    response = client.synthesize_speech(
+    response = await _get_client().synthesize_speech(
         input=synthesis_input, voice=voice, audio_config=audio_config
     )
-
     return response.audio_content  # bytes
 
 
-def tts_ssml(
+def _cache_file(key):
+    return os.path.join(TTS_CACHE_PATH, key[:2], f"{key}.mp3")
+
+
+def _read_cached(path):
+    try:
+        with open(path, "rb") as f:
+            audio = f.read()
+    except FileNotFoundError:
+        return None
+    # Refresh the mtime so pruning evicts the least recently used files
+    os.utime(path)
+    return audio
+
+
+def _write_cached(path, audio):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def prune_cache(max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024):
+    """Delete the oldest cached audio until the cache fits in max_bytes.
+
+    Returns the number of files removed.
+    """
+    entries = []
+    total = 0
+    for root, _, files in os.walk(TTS_CACHE_PATH):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    removed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+async def tts(
     text,
     voice_language_code="en-GB",
     voice_name="en-GB-Chirp3-HD-Leda",
+    use_markup=False,
     volume_gain_db=6.0,
 ):
-    # Set the text input to be synthesized
-    synthesis_input = texttospeech.SynthesisInput(ssml=text)
-
-    # Build the voice request, select the language code ("en-US") and the ssml
-    # voice gender ("neutral")
-    voice = texttospeech.VoiceSelectionParams(
-        language_code=voice_language_code, name=voice_name
+    cache_id = "|".join(
+        [
+            text,
+            voice_language_code,
+            voice_name,
+            f"{volume_gain_db:.2f}",
+            str(use_markup),
+        ]
     )
+    key = hashlib.sha256(cache_id.encode()).hexdigest()
+    path = _cache_file(key)
+
+    try:
+        async with _cache_locks[key]:
+            audio = _read_cached(path)
+            if audio is not None:
+                return audio
+
+            texttospeech = _texttospeech()
+            # Set the text input to be synthesized
+            if use_markup:
+                synthesis_input = texttospeech.SynthesisInput(markup=text)
+            else:
+                synthesis_input = texttospeech.SynthesisInput(text=text)
+
+            audio = await _synthesize(
+                synthesis_input,
+                _voice(voice_language_code, voice_name),
+                _mp3_config(volume_gain_db),
+            )
+            try:
+                _write_cached(path, audio)
+            except OSError as e:
+                log.warning("Failed to cache TTS audio: %s", e)
+            return audio
+    finally:
+        # Waiters still hold the lock object; later callers find the file
+        _cache_locks.pop(key, None)
 
-    # Select the type of audio file you want returned
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3, volume_gain_db=volume_gain_db
-    )
 
-    # Perform the text-to-speech request on the text input with the selected
-    # voice parameters and audio file type
-    response = client.synthesize_speech(
-        input=synthesis_input, voice=voice, audio_config=audio_config
-    )
+async def tts_ssml(
+    text,
+    voice_language_code="en-GB",
+    voice_name="en-GB-Chirp3-HD-Leda",
+    volume_gain_db=6.0,
+):
+    texttospeech = _texttospeech()
+    # Set the text input to be synthesized
+    synthesis_input = texttospeech.SynthesisInput(ssml=text)
 
-    return response.audio_content  # bytes
+    return await _synthesize(
+        synthesis_input,
+        _voice(voice_language_code, voice_name),
+        _mp3_config(volume_gain_db),
+    )
 
 
-def tts_multi(turns, voice_language_code="en-US", volume_gain_db=6.0):
+async def tts_multi(turns, voice_language_code="en-US", volume_gain_db=6.0):
+    texttospeech = _texttospeech()
     multi_speaker_markup = texttospeech.MultiSpeakerMarkup(
         turns=[
             texttospeech.MultiSpeakerMarkup.Turn(
@@ -88,20 +199,9 @@ def tts_multi(turns, voice_language_code="en-US", volume_gain_db=6.0):
         multi_speaker_markup=multi_speaker_markup
     )
 
-    # Build the voice request, select the language code ('en-US') and the voice
-    voice = texttospeech.VoiceSelectionParams(
-        language_code=voice_language_code, name="en-US-Studio-MultiSpeaker"
-    )
-
-    # Select the type of audio file you want returned
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3, volume_gain_db=volume_gain_db
-    )
-
-    # Perform the text-to-speech request on the text input with the selected
-    # voice parameters and audio file type
-    response = client.synthesize_speech(
-        input=synthesis_input, voice=voice, audio_config=audio_config
+    # The whole conversation is one request so the speakers share a timeline
+    return await _synthesize(
+        synthesis_input,
+        _voice(voice_language_code, "en-US-Studio-MultiSpeaker"),
+        _mp3_config(volume_gain_db),
     )
-
-    return response.audio_content  # bytes
@@ -1,5 +1,6 @@
 import os
-import json
+
+import orjson
 
 OPENAI_API_KEY_OPENROUTER = os.environ.get("OPENAI_API_KEY_OPENROUTER")
 
@@ -17,6 +18,11 @@ GAME_API_PASSWORD = os.environ.get("GAME_API_PASSWORD", "")
 # Liquidsoap
 LIQUIDSOAP_TELNET_HOST = os.environ.get("LIQUIDSOAP_TELNET_HOST", "localhost")
 LIQUIDSOAP_TELNET_PORT = int(os.environ.get("LIQUIDSOAP_TELNET_PORT", "1234"))
+# Path of Liquidsoap's server socket (settings.server.socket.path); when set,
+# it is used instead of the telnet host and port
+LIQUIDSOAP_SOCKET_PATH = os.environ.get("LIQUIDSOAP_SOCKET_PATH") or None
+# Local port Liquidsoap posts each new track's metadata to
+RADIO_TRACK_EVENTS_PORT = int(os.environ.get("RADIO_TRACK_EVENTS_PORT", "6002"))
 
 # Paths
 STATIC_PATH = os.environ.get("STATIC_PATH", "/srv/www")
@@ -83,6 +89,8 @@ REQUESTS_PATH = os.environ.get("REQUESTS_PATH", "/var/lib/radio/requests")
 SONGS_PATH = os.environ.get("SONGS_PATH", "/var/lib/radio/songs")
 JINGLES_PATH = os.environ.get("JINGLES_PATH", "/var/lib/radio/jingles")
 RADIO_DB_PATH = os.environ.get("RADIO_DB_PATH", os.path.join(RADIO_PATH, "radio.db"))
+TTS_CACHE_PATH = os.environ.get("TTS_CACHE_PATH", os.path.join(STATIC_PATH, "tts_cache"))
+TTS_CACHE_MAX_MB = int(os.environ.get("TTS_CACHE_MAX_MB", "256"))
 DENO_PATH = os.environ.get(
     "DENO_PATH", "/nix/store/vqh16h1p153k533b66i9h1i91b0k816v-deno-1.46.3/bin/deno"
 )
@@ -102,8 +110,8 @@ def get_env_dict(var_name, default):
     val = os.environ.get(var_name)
     if val:
         try:
-            return json.loads(val)
-        except json.JSONDecodeError:
+            return orjson.loads(val)
+        except orjson.JSONDecodeError:
             pass
     return default
 
@@ -162,6 +170,7 @@ LANGUAGE_CHANNELS_GENERAL = get_env_dict(
 DISCORD_TOKEN_DEV = os.environ.get("DISCORD_TOKEN_DEV")
 JARVIS_REPO_PATH = os.environ.get("JARVIS_REPO_PATH")
 JARVIS_AI_MODEL = os.environ.get("JARVIS_AI_MODEL", "anthropic/claude-sonnet-4.5")
+JARVIS_CACHE_DB_PATH = os.path.join(MEMORY_DATA_DIR, "jarvis_cache.db")
 JARVIS_ALLOWED_CHANNELS = get_env_dict(
     "JARVIS_ALLOWED_CHANNELS",
     [],  # Empty list = all channels allowed
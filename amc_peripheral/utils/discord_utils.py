@@ -1,4 +1,5 @@
 import discord
+import functools
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -14,11 +15,18 @@ async def actual_discord_poll_creator(
         if len(options) < 2:
             return "Error: Min 2 options"
 
-        content = f"**Poll:** {question}\n\n" + "\n".join(
-            [f"{i + 1}. {opt}" for i, opt in enumerate(options)]
+        content = "\n".join(
+            [
+                f"**Poll:** {question}",
+                "",
+                *(f"{i + 1}. {opt}" for i, opt in enumerate(options)),
+                "",
+                "React with the corresponding emoji to vote!",
+            ]
         )
-        content += "\n\nReact with the corresponding emoji to vote!"
         msg = await channel.send(content)
+        # Discord lists reactions in the order they were first added, so these
+        # stay sequential to keep the numbers in order
         for i in range(len(options)):
             await msg.add_reaction(f"{i + 1}\u20e3")
         return f"Poll '{question}' created!"
@@ -26,15 +34,24 @@ async def actual_discord_poll_creator(
         return f"Error: {e}"
 
 
+@functools.lru_cache(maxsize=64)
+def _zone(tz_name: str) -> ZoneInfo:
+    return ZoneInfo(tz_name)
+
+
+def _parse_event_time(value: str, tz: ZoneInfo) -> datetime:
+    """Parse an ISO time, assuming tz only when no offset is given."""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz)
+    return dt
+
+
 async def actual_discord_event_creator(guild, name, desc, loc, start, end, tz_name):
     try:
-        tz = ZoneInfo(tz_name)
-        start_dt = datetime.fromisoformat(start).replace(tzinfo=tz)
-        end_dt = (
-            datetime.fromisoformat(end).replace(tzinfo=tz)
-            if end
-            else start_dt + timedelta(hours=1)
-        )
+        tz = _zone(tz_name)
+        start_dt = _parse_event_time(start, tz)
+        end_dt = _parse_event_time(end, tz) if end else start_dt + timedelta(hours=1)
         event = await guild.create_scheduled_event(
             name=name,
             description=desc,
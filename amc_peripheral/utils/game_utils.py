@@ -2,27 +2,33 @@ import urllib.parse
 import logging
 from yarl import URL
 from amc_peripheral.settings import GAME_SERVER_API_URL
+from amc_peripheral.utils.http_utils import get_shared_session
 
 log = logging.getLogger(__name__)
 
 
-async def game_api_request(http_session, url, method="get", password="", params={}):
-    req_params = {"password": password, **params}
-    # pyrefly: ignore [bad-argument-type]
-    params_str = urllib.parse.urlencode(req_params, quote_via=urllib.parse.quote)
+async def game_api_request(http_session, url, method="get", password="", params=None):
+    # Pass None to use the shared process-wide session
+    if http_session is None:
+        http_session = get_shared_session()
+    req_params = {"password": password, **(params or {})}
     try:
         fn = getattr(http_session, method)
     except AttributeError as e:
         log.error(f"Invalid method: {e}")
         raise e
 
-    full_url = f"{GAME_SERVER_API_URL}{url}?{params_str}"
-    log.debug(f"Game API request: {method.upper()} {full_url}")
+    # The game server wants spaces as %20, not the "+" that aiohttp's params=
+    # (and yarl's with_query) would produce, and yarl re-quotes a pre-encoded
+    # query string passed that way. So the query is urlencoded here and the
+    # URL is built from the finished string with encoded=True
+    # pyrefly: ignore [bad-argument-type]
+    params_str = urllib.parse.urlencode(req_params, quote_via=urllib.parse.quote)
+    full_url = URL(f"{GAME_SERVER_API_URL}{url}?{params_str}", encoded=True)
+    log.debug("Game API request: %s %s", method.upper(), full_url)
     
-    async with fn(
-        URL(full_url, encoded=True)
-    ) as resp:
-        log.debug(f"Game API response status: {resp.status}")
+    async with fn(full_url) as resp:
+        log.debug("Game API response status: %s", resp.status)
         if resp.status >= 400:
             text = await resp.text()
             log.error(f"Game API error {resp.status}: {text[:200]}")
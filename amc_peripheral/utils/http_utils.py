@@ -0,0 +1,45 @@
+from typing import Optional
+
+import aiohttp
+
+# Shared by every cog of a bot; requests mostly go to a handful of API hosts,
+# so keep their connections and DNS answers around between calls
+HTTP_CONNECTION_LIMIT = 64
+HTTP_CONNECTION_LIMIT_PER_HOST = 16
+HTTP_DNS_CACHE_TTL = 300
+HTTP_KEEPALIVE_TIMEOUT = 75
+HTTP_REQUEST_TIMEOUT = 10
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create the bot-wide HTTP session with a tuned connection pool."""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_CONNECTION_LIMIT,
+        limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT),
+    )
+
+
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """Return a process-wide session for callers that have no bot session."""
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = create_http_session()
+    return _shared_session
+
+
+async def close_shared_session():
+    """Close the process-wide session, if one was created."""
+    global _shared_session
+    if _shared_session is not None:
+        await _shared_session.close()
+        _shared_session = None
@@ -1,10 +1,11 @@
-import json
 from io import BytesIO
 from typing import List
 
+import orjson
+
 
 def convert_to_json_bytes(race_data: List) -> BytesIO:
     # Handle Pydantic models if present
     data = [p.model_dump() if hasattr(p, "model_dump") else p for p in race_data]
-    json_string = json.dumps(data, indent=2)
-    return BytesIO(json_string.encode("utf-8"))
+    # orjson serializes straight to bytes, without an intermediate str
+    return BytesIO(orjson.dumps(data, option=orjson.OPT_INDENT_2))
@@ -1,6 +1,8 @@
 """Rate limiting utilities."""
 
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from datetime import timedelta
 from typing import Optional, Tuple
 
 
@@ -17,7 +19,9 @@ class RateLimiter:
         """
         self.max_calls = max_calls
         self.period = timedelta(minutes=period_minutes)
-        self.calls: list[datetime] = []
+        self._period_s = self.period.total_seconds()
+        # Monotonic call times, oldest first
+        self.calls: deque[float] = deque()
 
     def check(self) -> Tuple[bool, Optional[timedelta]]:
         """
@@ -28,13 +32,14 @@ class RateLimiter:
             - If allowed: (True, None)
             - If rate limited: (False, timedelta until next call allowed)
         """
-        now = datetime.now()
-        # Clean expired calls
-        self.calls = [c for c in self.calls if c > now - self.period]
+        now = time.monotonic()
+        # Calls are appended in order, so expired ones are at the left
+        cutoff = now - self._period_s
+        while self.calls and self.calls[0] <= cutoff:
+            self.calls.popleft()
 
         if len(self.calls) >= self.max_calls:
-            oldest = min(self.calls)
-            time_until = (oldest + self.period) - now
+            time_until = timedelta(seconds=self.calls[0] + self._period_s - now)
             return False, time_until
 
         self.calls.append(now)
@@ -42,4 +47,4 @@ class RateLimiter:
 
     def reset(self):
         """Clear all rate limit history."""
-        self.calls = []
+        self.calls.clear()
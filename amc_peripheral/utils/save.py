@@ -1,35 +1,31 @@
 #!/usr/bin/env python3
+import asyncio
+
 from Crypto.Cipher import AES
 
 KEY = b"66c5fd51a70e5e232cd236bd6895f802"
 BLOCK_SIZE = 16
 
+# Saves store every byte shifted down by one before encryption
+_SHIFT_DOWN = bytes((b - 1) & 0xFF for b in range(256))
+_SHIFT_UP = bytes((b + 1) & 0xFF for b in range(256))
+
 
 def encrypt(data: bytes) -> bytes:
     size = 4 + len(data)
     pad_size = (size + BLOCK_SIZE) & ~(BLOCK_SIZE - 1)
     out = bytearray(pad_size)
     out[0:4] = len(data).to_bytes(4, "little")
-    for i, b in enumerate(data):
-        out[i + 4] = (b - 1) & 0xFF
+    out[4:size] = data.translate(_SHIFT_DOWN)
 
-    cipher = AES.new(KEY, AES.MODE_ECB)
-    for i in range(0, pad_size, BLOCK_SIZE):
-        out[i : i + BLOCK_SIZE] = cipher.encrypt(bytes(out[i : i + BLOCK_SIZE]))
-    return bytes(out)
+    # ECB encrypts blocks independently, so the whole buffer goes in one call
+    return AES.new(KEY, AES.MODE_ECB).encrypt(out)
 
 
 def decrypt(data: bytes) -> bytes:
-    cipher = AES.new(KEY, AES.MODE_ECB)
-    buf = bytearray(data)
-    for i in range(0, len(buf), BLOCK_SIZE):
-        buf[i : i + BLOCK_SIZE] = cipher.decrypt(bytes(buf[i : i + BLOCK_SIZE]))
-
+    buf = AES.new(KEY, AES.MODE_ECB).decrypt(data)
     orig_len = int.from_bytes(buf[0:4], "little")
-    res = bytearray()
-    for b in buf[4:]:
-        res.append((b + 1) & 0xFF)
-    return bytes(res[:orig_len])
+    return buf[4 : 4 + orig_len].translate(_SHIFT_UP)
 
 
 def encrypt_file(path: str) -> bytes:
@@ -49,3 +45,19 @@ def decrypt_file(path: str) -> bytes:
     with open(path, "rb") as f:
         data = f.read()
     return decrypt(data)
+
+
+async def encrypt_file_async(path: str) -> bytes:
+    """
+    Like `encrypt_file`, but the read and encryption run in a worker thread
+    so the event loop is not blocked.
+    """
+    return await asyncio.to_thread(encrypt_file, path)
+
+
+async def decrypt_file_async(path: str) -> bytes:
+    """
+    Like `decrypt_file`, but the read and decryption run in a worker thread
+    so the event loop is not blocked.
+    """
+    return await asyncio.to_thread(decrypt_file, path)
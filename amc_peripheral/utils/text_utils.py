@@ -1,40 +1,66 @@
-import re
+# Break points tried in order when a chunk has to end, from paragraph
+# breaks down to single spaces
+SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+CODE_FENCE = "```"
+_REOPEN_FENCE = CODE_FENCE + "\n"
+_CLOSE_FENCE = "\n" + CODE_FENCE
 
 
 def is_code_block_open(text):
     """Return True if there's an unclosed code block in the text."""
-    return text.count("```") % 2 == 1
+    # str.count is a single non-overlapping C scan; only its parity matters
+    return text.count(CODE_FENCE) & 1 == 1
 
 
 def split_markdown(text, max_length=2000):
     """
     Split markdown text into chunks of up to max_length characters,
     ensuring that code blocks (and similar formatting) are not broken.
+
+    Each chunk ends at the last paragraph break that fits, falling back to
+    a line break, a sentence end, a space, and finally a hard cut. Chunks
+    are stripped of surrounding blank lines and whitespace-only chunks are
+    dropped. A code block that spans chunks is closed at the end of one
+    and reopened at the start of the next.
     """
-    # Split by paragraphs while preserving the delimiters (empty lines)
-    parts = re.split(r"(\n\s*\n)", text)
+    if not text:
+        return []
+    if len(text) <= max_length and not is_code_block_open(text):
+        return [text]
+
     chunks = []
-    current_chunk = ""
-
-    for part in parts:
-        # Check if adding this part would exceed the maximum allowed length
-        if len(current_chunk) + len(part) > max_length:
-            if is_code_block_open(current_chunk):
-                # If we're in the middle of a code block, close it in the current chunk.
-                current_chunk += "\n```"
-                chunks.append(current_chunk)
-                # Start the next chunk by reopening the code block.
-                current_chunk = "```\n" + part
-            else:
-                chunks.append(current_chunk)
-                current_chunk = part
+    lo = 0
+    in_code_block = False
+    while lo < len(text):
+        prefix = _REOPEN_FENCE if in_code_block else ""
+        # Leave room to close a code block left open by this chunk
+        budget = max(1, max_length - len(prefix) - len(_CLOSE_FENCE))
+        hi = lo + budget
+        if hi >= len(text):
+            cut = len(text)
         else:
-            current_chunk += part
+            cut = hi
+            for sep in SEPARATORS:
+                i = text.rfind(sep, lo, hi)
+                if i > lo:
+                    cut = i + len(sep)
+                    break
 
-    # Append any remaining text, closing an unclosed code block if necessary.
-    if current_chunk:
-        if is_code_block_open(current_chunk):
-            current_chunk += "\n```"
-        chunks.append(current_chunk)
+        piece = text[lo:cut]
+        lo = cut
+        in_code_block ^= is_code_block_open(piece)
+        # Trim the blank runs left at break points, keeping the indentation
+        # of a first code line
+        piece = piece.rstrip().lstrip("\n")
+        if prefix and piece.startswith(CODE_FENCE):
+            # The block ends right at the break and the previous chunk has
+            # already closed it; don't reopen it just to close it again
+            prefix = ""
+            piece = piece[len(CODE_FENCE):].lstrip()
+        if not piece or piece == CODE_FENCE:
+            continue
+        suffix = _CLOSE_FENCE if in_code_block else ""
+        chunks.append(prefix + piece + suffix)
 
     return chunks
@@ -86,7 +86,25 @@ in {
       )
 
       last_metadata = ref([])
-      q_or_songs.on_track(fun (m) -> last_metadata := m)
+      # Push each track change to the radio bot; a background thread keeps
+      # the HTTP call off the streaming thread
+      def on_song_track(m)
+        last_metadata := m
+        data = metadata.json.stringify(m)
+        thread.run(fun () ->
+          try
+            ignore(http.post(
+              headers=[("Content-Type", "application/json")],
+              timeout=2.,
+              data=data,
+              "http://127.0.0.1:6002/track"
+            ))
+          catch _ do
+            ()
+          end
+        )
+      end
+      q_or_songs.on_track(on_song_track)
       def show_metadata(_)
         http.response(
           content_type="application/json; charset=UTF-8",
@@ -95,6 +113,21 @@ in {
       end
       harbor.http.register.simple(port=6001, "/metadata", show_metadata)
 
+      # radio.now_playing: metadata, a --- line, then the remaining time, so
+      # the bot reads both for the same track in one reply
+      def now_playing(_)
+        lines = list.map(fun (kv) -> fst(kv) ^ "=\"" ^ snd(kv) ^ "\"", last_metadata())
+        meta = string.concat(separator="\n", lines)
+        remaining = string(q_or_songs.remaining())
+        meta ^ "\n---\n" ^ remaining
+      end
+      server.register(
+        namespace="radio",
+        description="Current track metadata and remaining time.",
+        "now_playing",
+        now_playing
+      )
+
       radio = source.drop.metadata(radio)
 
 
@@ -0,0 +1,111 @@
+import sqlite3
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import discord
+import pytest
+from discord.ext import commands
+
+# Every cog pulls these in; importing them here pays the cost once up front,
+# whichever tests are selected
+import discord.ext.tasks  # noqa: F401
+import openai  # noqa: F401
+
+
+class MockBot(commands.Bot):
+    def __init__(self):
+        intents = discord.Intents.all()
+        super().__init__(command_prefix="/", intents=intents)
+        self.http_session = AsyncMock()
+
+
+class FakeResponse:
+    """Just enough of aiohttp.ClientResponse for the bot's GET calls."""
+
+    def __init__(self, body):
+        self.status = 200
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+    async def json(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeHttpSession:
+    """Serves canned GET responses, matched by URL substring."""
+
+    def __init__(self, routes: dict):
+        self.routes = {part: FakeResponse(body) for part, body in routes.items()}
+        self.requested: list[str] = []
+
+    def get(self, url, **kwargs):
+        url = str(url)
+        self.requested.append(url)
+        return next(resp for part, resp in self.routes.items() if part in url)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def mock_texttospeech():
+    """Stand in for google.cloud.texttospeech, which tts.py imports lazily."""
+    texttospeech = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "google.cloud.texttospeech", texttospeech)
+        mp.setitem(sys.modules, "google.cloud", MagicMock(texttospeech=texttospeech))
+        yield texttospeech
+
+
+@pytest.fixture(autouse=True, scope="session")
+def unsynced_sqlite():
+    """Skip fsync on test databases; none of them need to survive a crash."""
+    connect = sqlite3.connect
+
+    def connect_unsynced(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(sqlite3, "connect", connect_unsynced)
+        yield
+
+
+@pytest.fixture(scope="session")
+def bot_spec():
+    """Factory for cheap commands.Bot stand-ins that skip real bot setup."""
+
+    def make():
+        bot = MagicMock(spec=commands.Bot)
+        bot.http_session = AsyncMock()
+        return bot
+
+    return make
+
+
+@pytest.fixture
+def mock_bot_real():
+    """A real commands.Bot with a mocked HTTP session."""
+    return MockBot()
+
+
+@pytest.fixture(scope="session")
+def fake_http_session():
+    """Factory for FakeHttpSession; route bodies are text or JSON payloads."""
+    return FakeHttpSession
+
+
+@pytest.fixture
+def mock_http_session():
+    """A ClientSession mock whose get() and post() are async context managers."""
+    session = MagicMock(spec=aiohttp.ClientSession)
+    session.get.return_value.__aenter__.return_value = MagicMock(status=200)
+    session.post.return_value.__aenter__.return_value = MagicMock(status=200)
+    return session
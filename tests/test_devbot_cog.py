@@ -0,0 +1,168 @@
+"""Tests for the JARVIS cog's tool loop."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from amc_peripheral.devbot.devbot_cog import (
+    CONTEXT_MAX_CHARS,
+    TOOL_RESULT_KEEP_TURNS,
+    TOOL_RESULT_MAX_CHARS,
+    DevBotCog,
+)
+
+
+@pytest.fixture
+def cog(bot_spec, monkeypatch):
+    monkeypatch.setattr(
+        "amc_peripheral.devbot.devbot_cog.ToolCacheStorage", MagicMock()
+    )
+    cog = DevBotCog(bot_spec())
+    cog.tools = MagicMock()
+    cog._openai_client = MagicMock()
+    return cog
+
+
+def _completion(content=None, tool_calls=None):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _tool_call(call_id, name, arguments):
+    function = SimpleNamespace(name=name, arguments=json.dumps(arguments))
+    return SimpleNamespace(id=call_id, function=function)
+
+
+@pytest.mark.asyncio
+async def test_large_result_paged_through_get_more(cog):
+    """Test that an oversized result is read back in full, page by page."""
+    result = {"path": "big.py", "content": "x" * (2 * TOOL_RESULT_MAX_CHARS + 100)}
+    cog.tools.read_file = MagicMock(return_value=result)
+    pages = []
+
+    async def create(messages, **kwargs):
+        last = messages[-1]
+        if last["role"] == "user":
+            call = _tool_call("c0", "read_file", {"path": "big.py"})
+            return _completion(tool_calls=[call])
+
+        page = json.loads(last["content"])
+        pages.append(page["results"])
+        assert page["total"] == len(json.dumps(result))
+        if "continuation_token" not in page:
+            return _completion(content="done")
+
+        assert page["continuation_token"] in cog._result_store
+        call = _tool_call(
+            f"c{len(pages)}",
+            "get_more",
+            {
+                "continuation_token": page["continuation_token"],
+                "offset": page["offset"],
+            },
+        )
+        return _completion(tool_calls=[call])
+
+    cog._openai_client.chat.completions.create = AsyncMock(side_effect=create)
+
+    reply = await cog._call_llm_with_tools([{"role": "user", "content": "read it"}])
+
+    assert reply == "done"
+    assert len(pages) == 3
+    assert all(len(p) <= TOOL_RESULT_MAX_CHARS for p in pages)
+    assert "".join(pages) == json.dumps(result)
+    # Tokens live only as long as the request that created them
+    assert cog._result_store == {}
+
+
+@pytest.mark.asyncio
+async def test_get_more_unknown_token(cog):
+    """Test that an unknown or expired token yields an error, not an exception."""
+    page = await cog._execute_tool(
+        "get_more", {"continuation_token": "missing", "offset": 0}
+    )
+
+    assert "missing" in page["error"]
+
+
+@pytest.mark.asyncio
+async def test_tokens_dropped_when_tool_loop_fails(cog):
+    """Test that stored results are released even if the LLM call raises."""
+    cog.tools.read_file = MagicMock(
+        return_value={"content": "x" * (TOOL_RESULT_MAX_CHARS + 1)}
+    )
+    cog._openai_client.chat.completions.create = AsyncMock(
+        side_effect=[
+            _completion(tool_calls=[_tool_call("c0", "read_file", {"path": "a"})]),
+            RuntimeError("backend down"),
+        ]
+    )
+    stored = []
+    paginate = cog._paginate_result
+
+    def record(content, tokens):
+        page = paginate(content, tokens)
+        stored.extend(tokens)
+        return page
+
+    cog._paginate_result = record
+
+    with pytest.raises(RuntimeError):
+        await cog._call_llm_with_tools([{"role": "user", "content": "read it"}])
+
+    assert stored
+    assert cog._result_store == {}
+
+
+def _tool_message(name, size):
+    return {"role": "tool", "tool_call_id": name, "name": name, "content": "x" * size}
+
+
+def _stub(name):
+    return json.dumps({"truncated": True, "tool": name})
+
+
+def test_compact_stubs_results_past_keep_turns():
+    """Test that only results older than TOOL_RESULT_KEEP_TURNS are stubbed."""
+    iteration = TOOL_RESULT_KEEP_TURNS + 2
+    old = _tool_message("old", 10)
+    kept = _tool_message("kept", 10)
+    messages = [{"role": "system", "content": "s"}, old, kept]
+    tool_messages = [(1, old), (2, kept)]
+
+    DevBotCog._compact_tool_results(messages, tool_messages, iteration)
+
+    assert old["content"] == _stub("old")
+    assert kept["content"] == "x" * 10
+
+
+def test_compact_stubs_oldest_until_under_budget():
+    """Test that an oversized history is trimmed oldest first, sparing the prompt."""
+    iteration = 5
+    system = {"role": "system", "content": "s" * (CONTEXT_MAX_CHARS // 2)}
+    user = {"role": "user", "content": "u" * (CONTEXT_MAX_CHARS // 4)}
+    assistant = SimpleNamespace(content=None, tool_calls=[])
+    results = [_tool_message(f"t{i}", CONTEXT_MAX_CHARS // 4) for i in range(2, 5)]
+    messages = [system, user, assistant, *results]
+    tool_messages = list(zip(range(2, 5), results))
+
+    DevBotCog._compact_tool_results(messages, tool_messages, iteration)
+
+    # 2/4 + 1/4 + 3/4 of the budget: t2 and t3 must go, t4 is the latest turn
+    assert results[0]["content"] == _stub("t2")
+    assert results[1]["content"] == _stub("t3")
+    assert results[2]["content"] == "x" * (CONTEXT_MAX_CHARS // 4)
+    assert system["content"] == "s" * (CONTEXT_MAX_CHARS // 2)
+    assert user["content"] == "u" * (CONTEXT_MAX_CHARS // 4)
+
+
+def test_compact_keeps_latest_turn_over_budget():
+    """Test that results from the latest turn survive even over the budget."""
+    iteration = 3
+    latest = _tool_message("latest", CONTEXT_MAX_CHARS * 2)
+    messages = [{"role": "user", "content": "u"}, latest]
+
+    DevBotCog._compact_tool_results(messages, [(iteration - 1, latest)], iteration)
+
+    assert latest["content"] == "x" * (CONTEXT_MAX_CHARS * 2)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from amc_peripheral.utils.discord_utils import (
+    actual_discord_event_creator,
+    actual_discord_poll_creator,
+)
+
+
+@pytest.mark.asyncio
+async def test_poll_creator_posts_numbered_options():
+    """Test the poll text and that reactions are added in option order."""
+    msg = MagicMock()
+    msg.add_reaction = AsyncMock()
+    channel = MagicMock()
+    channel.send = AsyncMock(return_value=msg)
+    bot = MagicMock()
+    bot.get_channel = MagicMock(return_value=channel)
+
+    result = await actual_discord_poll_creator(bot, "Track?", ["A", "B"], "1")
+
+    assert result == "Poll 'Track?' created!"
+    channel.send.assert_awaited_once_with(
+        "**Poll:** Track?\n\n1. A\n2. B\n\nReact with the corresponding emoji to vote!"
+    )
+    assert msg.add_reaction.await_args_list == [call("1⃣"), call("2⃣")]
+
+
+@pytest.mark.asyncio
+async def test_event_creator_keeps_explicit_offsets():
+    """Test that tz_name only applies to times without an offset."""
+    guild = MagicMock()
+    guild.create_scheduled_event = AsyncMock(return_value=MagicMock(url="url"))
+
+    await actual_discord_event_creator(
+        guild,
+        "Race",
+        "desc",
+        "Track",
+        "2026-01-01T20:00:00",
+        "2026-01-01T14:00:00+00:00",
+        "Asia/Bangkok",
+    )
+
+    kwargs = guild.create_scheduled_event.await_args.kwargs
+    assert kwargs["start_time"].utcoffset() == timedelta(hours=7)
+    assert kwargs["end_time"] == datetime(2026, 1, 1, 14, tzinfo=timezone.utc)
@@ -0,0 +1,23 @@
+"""Tests for the game server API helpers."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from amc_peripheral.utils.game_utils import announce_in_game
+
+
+@pytest.mark.asyncio
+async def test_announce_encodes_spaces_as_percent_20(mock_http_session):
+    """Test that the query is sent pre-encoded: %20 for spaces, %2B for "+"."""
+    response = mock_http_session.post.return_value.__aenter__.return_value
+    response.json = AsyncMock(return_value={"ok": True})
+
+    assert await announce_in_game(
+        mock_http_session, "Hello there & bye+", color=None
+    ) == {"ok": True}
+
+    url = mock_http_session.post.call_args.args[0]
+    assert url.raw_query_string == (
+        "password=&message=Hello%20there%20%26%20bye%2B&type=message"
+    )
+    assert url.path == "/chat"
@@ -1,20 +1,12 @@
+import asyncio
 import pytest
 import discord
-from discord.ext import commands
 from unittest.mock import AsyncMock, MagicMock
 from amc_peripheral.utils.text_utils import split_markdown, is_code_block_open
-from amc_peripheral.bot.knowledge_cog import KnowledgeCog
+from amc_peripheral.bot.knowledge_cog import THREAD_FETCH_CONCURRENCY, KnowledgeCog
 
 
-class MockBot(commands.Bot):
-    def __init__(self):
-        intents = discord.Intents.all()
-        super().__init__(command_prefix="/", intents=intents)
-        self.http_session = AsyncMock()
-
-
-@pytest.mark.asyncio
-async def test_split_markdown():
+def test_split_markdown():
     # text with newlines to allow splitting
     text = ("A" * 500 + "\n\n") * 5  # 2500+ chars
     chunks = split_markdown(text)
@@ -22,39 +14,77 @@ async def test_split_markdown():
     assert all(len(c) <= 2000 for c in chunks)
 
 
-@pytest.mark.asyncio
-async def test_is_code_block_open():
+def test_split_markdown_long_paragraph():
+    # one 200 KB paragraph with no blank lines to split on
+    text = "The quick brown fox jumps over the lazy dog. " * 4500
+    chunks = split_markdown(text)
+    assert all(len(c) <= 2000 for c in chunks)
+    assert all(c.endswith(".") for c in chunks)
+    assert " ".join(chunks) == text.rstrip()
+
+
+def test_split_markdown_reopens_code_block():
+    text = "```\n" + ("x" * 30 + "\n\n") * 4 + "```"
+    chunks = split_markdown(text, max_length=70)
+    assert chunks[0].endswith("\n```")
+    assert all(c.startswith("```") for c in chunks[1:])
+    assert not any(is_code_block_open(c) for c in chunks)
+
+
+def test_split_markdown_fence_at_split_point():
+    # the break lands on the closing fence, followed by blank lines
+    text = "Intro text here.\n\n```\nprint(1)\n```\n\n\n\nOutro."
+    chunks = split_markdown(text, max_length=20)
+    assert chunks == ["Intro text", "here.", "```\nprint(1)\n```", "Outro."]
+    assert all(c == c.strip() for c in chunks)
+
+
+def test_is_code_block_open():
     assert is_code_block_open("```python\nprint(1)")
     assert not is_code_block_open("```python\nprint(1)\n```")
+    # Runs of backticks count as non-overlapping fences
+    assert is_code_block_open("````")
+    assert not is_code_block_open("``````")
+    assert not is_code_block_open("x```y" * 200_000)
+    assert is_code_block_open("```" * 333_333)
 
 
 @pytest.mark.asyncio
-async def test_on_ready_loads_knowledge_base():
+async def test_on_ready_loads_knowledge_base(mock_bot_real):
     """Test that on_ready fetches knowledge base from the forum channel."""
-    bot = MockBot()
+    bot = mock_bot_real
     cog = KnowledgeCog(bot)
 
     # Setup mock forum channel
     mock_forum_channel = MagicMock(spec=discord.ForumChannel)
     mock_forum_channel.id = 1348530437768745020
 
-    # Mock a thread with messages
-    mock_thread = MagicMock()
-    mock_thread.name = "Test Thread"
+    # Mock threads with messages; the first one answers last
+    def make_thread(name, content, delay):
+        thread = MagicMock()
+        thread.name = name
+        message = MagicMock()
+        message.content = content
+        message.attachments = []
 
-    mock_message = MagicMock()
-    mock_message.content = "This is test knowledge content."
-    mock_message.attachments = []
+        async def history(oldest_first=True, **kwargs):
+            await asyncio.sleep(delay)
+            yield message
 
-    # Setup async iterators for archived_threads and history
-    async def mock_archived_threads(limit=None):
-        yield mock_thread
+        thread.history = history
+        return thread
 
-    async def mock_history(oldest_first=True, **kwargs):
-        yield mock_message
+    threads = [
+        make_thread("Test Thread", "This is test knowledge content.", 0.02),
+        make_thread("Second Thread", "More knowledge.", 0),
+    ]
+
+    # Setup async iterator for archived_threads
+    async def mock_archived_threads(limit=None):
+        for thread in threads:
+            yield thread
 
     mock_forum_channel.archived_threads = mock_archived_threads
-    mock_thread.history = mock_history
 
     # Mock bot.get_channel: return forum channel for forum ID, None for log channel
     def mock_get_channel(channel_id):
@@ -71,12 +101,63 @@ async def test_on_ready_loads_knowledge_base():
     assert cog.knowledge_system_message != ""
     assert "Test Thread" in cog.knowledge_system_message
     assert "This is test knowledge content." in cog.knowledge_system_message
+    # Threads keep their forum order even when fetched concurrently
+    assert cog.knowledge_system_message.index(
+        "Test Thread"
+    ) < cog.knowledge_system_message.index("Second Thread")
 
 
 @pytest.mark.asyncio
-async def test_on_ready_handles_missing_channel():
+async def test_on_ready_concurrency_bound(bot_spec):
+    """Test that thread histories are read with bounded concurrency."""
+    bot = bot_spec()
+    cog = KnowledgeCog(bot)
+    forum = MagicMock(spec=discord.ForumChannel)
+    forum.threads = []
+
+    running = 0
+    peak = 0
+    release = asyncio.Event()
+
+    def make_thread(i):
+        thread = MagicMock()
+        thread.name = f"Thread {i}"
+        message = MagicMock(content=f"content {i}", attachments=[])
+
+        async def history(oldest_first=True, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+            yield message
+
+        thread.history = history
+        return thread
+
+    async def archived_threads(limit=None):
+        for i in range(32):
+            yield make_thread(i)
+        # Reads for the first threads start while the listing is still going
+        await asyncio.sleep(0)
+        assert running > 0
+        release.set()
+
+    forum.archived_threads = archived_threads
+    bot.get_channel = MagicMock(return_value=None)
+
+    await cog.fetch_forum_messages(forum)
+
+    assert peak == THREAD_FETCH_CONCURRENCY
+    assert cog.knowledge_system_message.index("## Thread 0\n") < (
+        cog.knowledge_system_message.index("## Thread 31\n")
+    )
+
+
+@pytest.mark.asyncio
+async def test_on_ready_handles_missing_channel(bot_spec):
     """Test that on_ready handles a missing forum channel gracefully."""
-    bot = MockBot()
+    bot = bot_spec()
     cog = KnowledgeCog(bot)
 
     # Mock bot.get_channel to return None (channel not found)
@@ -90,11 +171,11 @@ async def test_on_ready_handles_missing_channel():
 
 
 @pytest.mark.asyncio
-async def test_ai_helper_has_get_currently_playing_song_tool():
+async def test_ai_helper_has_get_currently_playing_song_tool(fake_http_session):
     """Test that ai_helper includes the get_currently_playing_song tool."""
-    # Use MagicMock instead of MockBot to allow setting guilds
+    # Use MagicMock instead of mock_bot_real to allow setting guilds
     bot = MagicMock()
-    bot.http_session = AsyncMock()
+    bot.http_session = fake_http_session({"active_players": "Player1, Player2"})
     cog = KnowledgeCog(bot)
 
     # Mock the openai client
@@ -108,13 +189,6 @@ async def test_ai_helper_has_get_currently_playing_song_tool():
         return_value=mock_completion
     )
 
-    # Mock the active players API call
-    mock_response = AsyncMock()
-    mock_response.text = AsyncMock(return_value="Player1, Player2")
-    bot.http_session.get = MagicMock(
-        return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response))
-    )
-
     # Mock guilds for scheduled events
     mock_guild = MagicMock()
     mock_guild.scheduled_events = []
@@ -138,11 +212,64 @@ async def test_ai_helper_has_get_currently_playing_song_tool():
 
 
 @pytest.mark.asyncio
-async def test_ai_helper_handles_tool_call():
+async def test_tool_calls_in_one_turn_run_concurrently():
+    """Test that several tool calls from one reply run together, in order."""
+    bot = MagicMock()
+    cog = KnowledgeCog(bot)
+
+    def tool_call(id, name):
+        call = MagicMock()
+        call.id = id
+        call.function.name = name
+        call.function.arguments = "{}"
+        return call
+
+    first = MagicMock()
+    first.tool_calls = [
+        tool_call("a", "get_current_subsidies"),
+        tool_call("b", "get_server_commands"),
+    ]
+    second = MagicMock(content="Done", tool_calls=None)
+    cog.openai_client_openrouter.chat.completions.create = AsyncMock(
+        side_effect=[
+            MagicMock(choices=[MagicMock(message=first)]),
+            MagicMock(choices=[MagicMock(message=second)]),
+        ]
+    )
+
+    running = 0
+    peak = 0
+
+    async def execute_tool(name, args, interaction=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # The first call finishes last
+        await asyncio.sleep(0.02 if name == "get_current_subsidies" else 0)
+        running -= 1
+        return f"{name} result"
+
+    cog._execute_tool = execute_tool
+    messages = []
+
+    assert await cog._call_llm_with_tools(messages, [], "model") == "Done"
+    assert peak == 2
+    assert [m["tool_call_id"] for m in messages[1:]] == ["a", "b"]
+    assert messages[1]["content"] == "get_current_subsidies result"
+
+
+@pytest.mark.asyncio
+async def test_ai_helper_handles_tool_call(fake_http_session):
     """Test that ai_helper correctly handles when the LLM calls the song tool."""
-    # Use MagicMock instead of MockBot to allow setting guilds
+    # Use MagicMock instead of mock_bot_real to allow setting guilds
     bot = MagicMock()
-    bot.http_session = AsyncMock()
+    # Active players API, then the radio server metadata call
+    bot.http_session = fake_http_session(
+        {
+            "active_players": "Player1",
+            "localhost:6001": {"filename": "/var/lib/radio/requests/DJ-Test_Song.mp3"},
+        }
+    )
     cog = KnowledgeCog(bot)
 
     # Mock tool call response from OpenAI
@@ -170,30 +297,6 @@ async def test_ai_helper_handles_tool_call():
         side_effect=[mock_first_completion, mock_second_completion]
     )
 
-    # Mock the active players API call
-    mock_players_response = AsyncMock()
-    mock_players_response.text = AsyncMock(return_value="Player1")
-    
-    # Mock the radio server metadata call
-    mock_radio_response = AsyncMock()
-    mock_radio_response.json = AsyncMock(
-        return_value={"filename": "/var/lib/radio/requests/DJ-Test_Song.mp3"}
-    )
-
-    def mock_get_context(url, **kwargs):
-        async def aenter_mock():
-            if "active_players" in url:
-                return mock_players_response
-            elif "localhost:6001" in url:
-                return mock_radio_response
-            return mock_players_response
-        
-        mock_cm = AsyncMock()
-        mock_cm.__aenter__ = AsyncMock(side_effect=aenter_mock)
-        return mock_cm
-
-    bot.http_session.get = MagicMock(side_effect=mock_get_context)
-
     # Mock guilds
     mock_guild = MagicMock()
     mock_guild.scheduled_events = []
@@ -205,4 +308,5 @@ async def test_ai_helper_handles_tool_call():
     # Verify the second completion was called after tool handling
     assert cog.openai_client_openrouter.chat.completions.create.call_count == 2
     assert result == "Currently playing: Test Song (requested by DJ)"
+    assert any("localhost:6001" in url for url in bot.http_session.requested)
 
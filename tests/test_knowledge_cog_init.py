@@ -34,3 +34,31 @@ async def test_knowledge_cog_unload(cog):
 
     # Should attempt to remove its context menu
     assert cog.bot.tree.remove_command.called
+
+
+@pytest.mark.asyncio
+async def test_knowledge_cog_unload_flushes_pending_memory(cog):
+    """Rows the writer has already dequeued are stored on unload, not dropped."""
+    import asyncio
+
+    cog._memory_storage = MagicMock()
+    cog._memory_storage.astore_messages = AsyncMock()
+    cog._memory_flush_interval = 60
+    cog._memory_flush_task = asyncio.create_task(cog._flush_memory_queue())
+
+    rows = [{"message": "hi"}, {"message": "there"}]
+    for row in rows:
+        cog._memory_queue.put_nowait((row, False))
+    await asyncio.sleep(0)
+    assert cog._memory_queue.qsize() < len(rows)
+
+    await cog.cog_unload()
+
+    assert cog._memory_flush_task.done()
+    stored = [
+        row
+        for call in cog._memory_storage.astore_messages.await_args_list
+        for row in call.args[0]
+    ]
+    assert stored == rows
+    cog._memory_storage.close.assert_called_once()
@@ -0,0 +1,279 @@
+"""Tests for the Liquidsoap telnet controller."""
+
+import asyncio
+import socket
+import socketserver
+import threading
+
+import pytest
+from amc_peripheral.radio.liquidsoap import POOL_SIZE, LiquidsoapController
+
+
+class FakeLiquidsoap(socketserver.ThreadingTCPServer):
+    """Minimal telnet server answering commands from a dict."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, replies: dict[str, str]):
+        self.replies = replies
+        self.commands: list[str] = []
+        self.connections = 0
+        self.open_sockets: list = []
+        super().__init__(("127.0.0.1", 0), FakeLiquidsoapHandler)
+
+
+class FakeLiquidsoapUnix(socketserver.ThreadingUnixStreamServer):
+    """The same fake server, listening on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, replies: dict[str, str]):
+        self.replies = replies
+        self.commands: list[str] = []
+        self.connections = 0
+        self.open_sockets: list = []
+        super().__init__(path, FakeLiquidsoapHandler)
+
+
+class FakeLiquidsoapHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        self.server.open_sockets.append(self.connection)
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            if command == "quit":
+                break
+            self.server.commands.append(command)
+            reply = self.server.replies.get(command, "ERROR: unknown command")
+            self.wfile.write(f"{reply}\r\nEND\r\n".encode())
+
+    def finish(self):
+        super().finish()
+        self.server.open_sockets.remove(self.connection)
+
+
+@pytest.fixture
+def liquidsoap():
+    server = FakeLiquidsoap(
+        {
+            "uptime": "0d 00h 01m 40s",
+            "radio.metadata": '--- 1 ---\ntitle="Song"\nartist="Band"\nfilename="/a=b.mp3"',
+            "radio.remaining": "42.50",
+            "radio.skip": "Done",
+            "requests.length": "3",
+            "requests.push /song.mp3": "7",
+            "var.set event_mode = true": "Variable event_mode set (was false).",
+        }
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def controller(liquidsoap):
+    host, port = liquidsoap.server_address
+    lq = LiquidsoapController(host=host, port=port)
+    yield lq
+    await lq.close()
+
+
+@pytest.mark.asyncio
+async def test_reuses_connection(controller, liquidsoap):
+    """Test that consecutive commands share one connection."""
+    assert await controller.get_queue_length("requests") == 3
+    assert await controller.get_remaining_time() == 42.5
+    assert liquidsoap.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_metadata_parsing(controller):
+    """Test that metadata lines are parsed into a dict."""
+    metadata = await controller.get_current_metadata()
+    assert metadata == {
+        "title": '"Song"',
+        "artist": '"Band"',
+        "filename": '"/a=b.mp3"',
+    }
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_close(controller, liquidsoap):
+    """Test that a dropped connection is reopened transparently."""
+    assert await controller.get_remaining_time() == 42.5
+    for sock in list(liquidsoap.open_sockets):
+        sock.shutdown(socket.SHUT_RDWR)
+    assert await controller.get_remaining_time() == 42.5
+    assert liquidsoap.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_status_collects_all_fields(controller):
+    """Test that get_status combines remaining time and metadata."""
+    status = await controller.get_status()
+    assert status["remaining_time"] == 42.5
+    assert status["current_track"]["title"] == '"Song"'
+    # Liquidsoap reports uptime as "0d 00h 01m 40s", which is not a float
+    assert "uptime" not in status
+
+
+@pytest.mark.asyncio
+async def test_send_commands_keeps_order(controller, liquidsoap):
+    """Test that pipelined replies line up with their commands."""
+    replies = await controller._send_commands(
+        ["requests.length", "radio.remaining", "radio.skip"]
+    )
+    assert replies == ["3", "42.50", "Done"]
+    assert liquidsoap.commands == ["requests.length", "radio.remaining", "radio.skip"]
+
+
+@pytest.mark.asyncio
+async def test_set_vars_in_one_exchange(controller, liquidsoap):
+    """Test that set_vars sends every assignment and checks each reply."""
+    assert await controller.set_vars({"event_mode": True})
+    assert not await controller.set_vars({"event_mode": True, "race_mode": False})
+    assert liquidsoap.commands[-2:] == [
+        "var.set event_mode = true",
+        "var.set race_mode = false",
+    ]
+    assert liquidsoap.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_metadata_is_cached_until_skip(controller, liquidsoap):
+    """Test that repeated metadata reads reuse the cached reply."""
+    first = await controller.get_current_metadata()
+    first["title"] = "changed"
+    assert (await controller.get_current_metadata())["title"] == '"Song"'
+    assert liquidsoap.commands.count("radio.metadata") == 1
+
+    await controller.skip_current_track()
+    await controller.get_current_metadata()
+    assert liquidsoap.commands.count("radio.metadata") == 2
+
+
+@pytest.mark.asyncio
+async def test_reply_containing_end(controller, liquidsoap):
+    """Test that END inside a reply body does not terminate it early."""
+    liquidsoap.replies["radio.metadata"] = 'title="The END"\nENDING=yes\nartist="x"'
+    metadata = await controller.get_current_metadata()
+    assert metadata == {"title": '"The END"', "ENDING": "yes", "artist": '"x"'}
+    assert await controller.get_remaining_time() == 42.5
+
+
+@pytest.mark.asyncio
+async def test_socket_options(controller):
+    """Test that the control connection disables Nagle and enables keepalive."""
+    await controller.get_remaining_time()
+    _, writer = controller._pool._idle[0]
+    sock = writer.get_extra_info("socket")
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+
+@pytest.mark.asyncio
+async def test_pool_shared_and_bounded(controller, liquidsoap):
+    """Test that controllers share a bounded pool of connections."""
+    host, port = liquidsoap.server_address
+    other = LiquidsoapController(host=host, port=port)
+    assert other._pool is controller._pool
+
+    results = await asyncio.gather(
+        *(c.get_remaining_time() for c in [controller, other] * 5)
+    )
+    assert results == [42.5] * 10
+    assert 1 <= liquidsoap.connections <= POOL_SIZE
+
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_do_not_interleave(controller):
+    """Test that concurrent pipelined batches each get their own replies."""
+    batches = [
+        ["requests.length", "radio.remaining"],
+        ["radio.skip", "requests.length"],
+        ["radio.remaining", "radio.skip", "radio.remaining"],
+    ] * 4
+    expected = {
+        "requests.length": "3",
+        "radio.remaining": "42.50",
+        "radio.skip": "Done",
+    }
+
+    results = await asyncio.gather(*(controller._send_commands(b) for b in batches))
+
+    for batch, replies in zip(batches, results):
+        assert replies == [expected[command] for command in batch]
+
+
+@pytest.mark.asyncio
+async def test_unix_socket(tmp_path):
+    """Test that a socket path is used instead of host and port."""
+    path = str(tmp_path / "liquidsoap.sock")
+    server = FakeLiquidsoapUnix(path, {"radio.remaining": "12.0"})
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    try:
+        lq = LiquidsoapController(host="unused", port=0, unix_path=path)
+        assert await lq.get_remaining_time() == 12.0
+        assert server.commands == ["radio.remaining"]
+        await lq.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_state_changing_commands_are_not_retried(controller, liquidsoap):
+    """Test that a push on a dropped connection fails instead of resending."""
+    assert await controller.get_remaining_time() == 42.5
+    for sock in list(liquidsoap.open_sockets):
+        sock.shutdown(socket.SHUT_RDWR)
+
+    assert await controller.push_to_queue("requests", "/song.mp3") is False
+    assert "requests.push /song.mp3" not in liquidsoap.commands
+
+    # The next call goes out on a fresh connection
+    await controller.push_to_queue("requests", "/song.mp3")
+    assert liquidsoap.commands.count("requests.push /song.mp3") == 1
+
+
+@pytest.mark.asyncio
+async def test_status_uses_now_playing_when_available(controller, liquidsoap):
+    """Test that a registered now_playing command replaces two queries."""
+    liquidsoap.replies["radio.now_playing"] = 'title="Live"\n---\n10.0'
+
+    status = await controller.get_status()
+
+    assert status["current_track"] == {"title": '"Live"'}
+    assert status["remaining_time"] == 10.0
+    assert "radio.metadata" not in liquidsoap.commands
+
+
+@pytest.mark.asyncio
+async def test_status_falls_back_without_now_playing(controller, liquidsoap):
+    """Test the fallback to separate queries, remembered per source."""
+    await controller.get_status()
+    await controller.get_status()
+
+    assert liquidsoap.commands.count("radio.now_playing") == 1
+    assert liquidsoap.commands.count("radio.metadata") == 2
+
+
+@pytest.mark.asyncio
+async def test_status_treats_error_reply_as_no_metadata(controller, liquidsoap):
+    """Test that an error in place of metadata yields no current track."""
+    liquidsoap.replies["radio.now_playing"] = "not a now_playing reply"
+    liquidsoap.replies["radio.metadata"] = "ERROR: no source radio=1"
+
+    status = await controller.get_status()
+
+    assert "current_track" not in status
+    assert status["remaining_time"] == 42.5
+    assert liquidsoap.commands.count("radio.metadata") == 1
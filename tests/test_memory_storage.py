@@ -1,7 +1,10 @@
 """Tests for memory storage module."""
 
+import asyncio
 import os
+import sqlite3
 import tempfile
+from datetime import datetime, timedelta, timezone
 import pytest
 from amc_peripheral.memory.storage import MemoryStorage
 
@@ -157,6 +160,18 @@ def test_decay_relevance_scores(memory_storage):
     assert messages[0]["relevance_score"] < 1.0
 
 
+def test_decay_reaches_rows_past_the_window(memory_storage):
+    """Test that an old row that was never decayed is still decayed."""
+    memory_storage.store_message(
+        "123", "Player", "Old msg", "game_chat",
+        timestamp=datetime.now() - timedelta(days=365),
+    )
+
+    assert memory_storage.decay_relevance_scores(decay_rate=0.95) == 1
+    messages = memory_storage.get_recent_messages("123")
+    assert messages[0]["relevance_score"] < 0.01
+
+
 def test_low_relevance_count(memory_storage):
     """Test counting low relevance memories."""
     # Add messages with default relevance (1.0)
@@ -189,3 +204,100 @@ def test_cleanup_old_memories(memory_storage):
     # Message should still exist (it's recent even if low relevance)
     # The cleanup requires BOTH old AND low relevance
     assert memory_storage.get_message_count() >= 0
+
+
+def test_store_messages_batch(memory_storage):
+    """Test storing several messages in one call."""
+    stored = memory_storage.store_messages([
+        {"player_id": "123", "player_name": "Player1", "message": "Msg 1"},
+        {"player_id": "123", "player_name": "Player1", "message": "Msg 2"},
+        {
+            "player_id": "456",
+            "player_name": "Bot",
+            "message": "Reply",
+            "is_bot_response": True,
+        },
+    ])
+
+    assert stored == 3
+    assert memory_storage.get_message_count() == 3
+
+    messages = memory_storage.get_recent_messages("123")
+    assert sorted(m["message"] for m in messages) == ["Msg 1", "Msg 2"]
+    assert messages[0]["source"] == "game_chat"
+    assert memory_storage.get_recent_messages("456")[0]["is_bot_response"] == 1
+
+
+def test_store_messages_large_batch(memory_storage):
+    """Test that a large batch lands in a single call."""
+    rows = (
+        {"player_id": str(i % 10), "player_name": f"P{i % 10}", "message": f"m{i}"}
+        for i in range(1000)
+    )
+
+    assert memory_storage.store_messages(rows) == 1000
+    assert memory_storage.get_message_count() == 1000
+    assert memory_storage.get_message_count("3") == 100
+
+
+@pytest.mark.asyncio
+async def test_async_store_concurrently(memory_storage):
+    """Test that concurrent async writes from worker threads all land."""
+    await asyncio.gather(
+        *(
+            memory_storage.astore_message(
+                player_id="123", player_name="Player1", message=f"Msg {i}"
+            )
+            for i in range(100)
+        )
+    )
+
+    assert memory_storage.get_message_count() == 100
+    recent = await memory_storage.aget_recent_messages("123", limit=100)
+    assert len(recent) == 100
+
+
+def test_migrates_text_timestamps(tmp_path):
+    """Test that a legacy ISO TEXT timestamp table is converted on open."""
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE player_memory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id TEXT NOT NULL,
+            player_name TEXT NOT NULL,
+            message TEXT NOT NULL,
+            is_bot_response INTEGER DEFAULT 0,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            source TEXT NOT NULL,
+            discord_user_id TEXT,
+            discord_channel_id TEXT,
+            discord_message_id TEXT,
+            guild_id TEXT,
+            relevance_score REAL DEFAULT 1.0
+        )
+    """)
+    legacy_ts = datetime(2024, 1, 2, 3, 4, 5)
+    conn.execute(
+        "INSERT INTO player_memory (player_id, player_name, message, timestamp, source) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ("123", "Player", "Old msg", legacy_ts.isoformat(), "game_chat"),
+    )
+    # Half-built copy left behind by an interrupted earlier migration
+    conn.execute("CREATE TABLE player_memory_new (id INTEGER PRIMARY KEY)")
+    conn.execute("INSERT INTO player_memory_new (id) VALUES (1)")
+    conn.commit()
+    conn.close()
+
+    storage = MemoryStorage(db_path=db_path)
+    try:
+        storage.store_message("123", "Player", "New msg", "game_chat")
+        messages = storage.get_recent_messages("123")
+        assert [m["message"] for m in messages] == ["Old msg", "New msg"]
+        # Read paths keep returning ISO strings, now normalised to UTC
+        expected = datetime.fromtimestamp(legacy_ts.timestamp(), timezone.utc)
+        assert messages[0]["timestamp"] == expected.strftime("%Y-%m-%d %H:%M:%S")
+        assert datetime.fromisoformat(messages[1]["timestamp"])
+        assert storage.get_memory_stats()["oldest_memory"] == messages[0]["timestamp"]
+    finally:
+        storage.close()
@@ -1,15 +1,6 @@
-import sys
 from unittest.mock import MagicMock, AsyncMock, patch
-
-# Mock google.cloud.texttospeech before importing RadioCog
-mock_texttospeech = MagicMock()
-mock_texttospeech.TextToSpeechClient = MagicMock()
-sys.modules["google.cloud.texttospeech"] = mock_texttospeech
-sys.modules["google.cloud"] = MagicMock()
-sys.modules["google"] = MagicMock()
-
-import pytest  # noqa: E402
-from amc_peripheral.radio.radio_cog import RadioCog  # noqa: E402
+import pytest
+from amc_peripheral.radio.radio_cog import RadioCog
 
 @pytest.fixture
 def mock_bot():
@@ -19,9 +10,9 @@ def mock_bot():
     return bot
 
 @pytest.fixture
-def cog(mock_bot, tmp_path, monkeypatch):
-    db_path = str(tmp_path / "radio.db")
-    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", db_path)
+def cog(mock_bot, monkeypatch):
+    # Nothing here reads rows back, so the database can live in memory
+    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", ":memory:")
     with patch("amc_peripheral.radio.radio_cog.LiquidsoapController"):
         with patch("amc_peripheral.radio.radio_cog.AsyncOpenAI"):
             cog = RadioCog(mock_bot)
@@ -83,3 +74,24 @@ async def test_list_likes_formatting(cog):
     assert "Awesome Hit" in content
     assert "❤️ 10" in content
     assert "👎 0" in content
+
+@pytest.mark.asyncio
+async def test_set_event_mode_sends_one_batch(cog):
+    interaction = AsyncMock()
+    cog.lq = AsyncMock()
+    cog.lq.set_vars.return_value = True
+
+    await cog.set_event_mode.callback(cog, interaction, True)
+
+    cog.lq.set_vars.assert_awaited_once_with({"event_mode": True, "race_mode": False})
+    interaction.followup.send.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_set_event_mode_reports_failure(cog):
+    interaction = AsyncMock()
+    cog.lq = AsyncMock()
+    cog.lq.set_vars.return_value = False
+
+    await cog.set_event_mode.callback(cog, interaction, False)
+
+    interaction.followup.send.assert_awaited_once_with("Failed to set event mode")
@@ -1,17 +1,19 @@
-import sys
+import asyncio
 from unittest.mock import MagicMock, AsyncMock
+from datetime import datetime, timedelta, timezone
 
-# Mock google.cloud.texttospeech BEFORE importing module that uses it
-mock_texttospeech = MagicMock()
-# We need to mock the client instantiation
-mock_texttospeech.TextToSpeechClient = MagicMock()
-sys.modules["google.cloud.texttospeech"] = mock_texttospeech
-sys.modules["google.cloud"] = MagicMock()
-sys.modules["google"] = MagicMock()
-
-import pytest  # noqa: E402
-from discord.ext import tasks  # noqa: E402
-from amc_peripheral.radio.radio_cog import RadioCog  # noqa: E402
+import discord
+import pytest
+from discord.ext import tasks
+from amc_peripheral.radio.radio_cog import RadioCog, _safe_filename
+from amc_peripheral.settings import (
+    EVENT_SONGS_CHANNEL,
+    GAME_CHAT_CHANNEL_ID,
+    GENERAL_CHANNEL_ID,
+    PLAYLIST_CHANNEL,
+    RADIO_CHANNEL_ID,
+    SONGS_CHANNEL,
+)
 
 
 @pytest.fixture
@@ -30,14 +32,18 @@ def mock_bot():
 
 
 @pytest.fixture
-def cog(mock_bot, tmp_path, monkeypatch):
-    db_path = str(tmp_path / "radio.db")
-    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", db_path)
+def cog(mock_bot, monkeypatch):
+    # Nothing here reads rows back, so the database can live in memory
+    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", ":memory:")
+    # Keep the track event listener off real ports
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.TrackEventServer",
+        lambda port: MagicMock(start=AsyncMock(), stop=AsyncMock(), queue=asyncio.Queue()),
+    )
     return RadioCog(mock_bot)
 
 
-@pytest.mark.asyncio
-async def test_radio_tasks_exist(cog):
+def test_radio_tasks_exist(cog):
     """Verify that background tasks are defined as Loop objects on the Cog."""
     assert hasattr(cog, "post_gazette_task")
     assert isinstance(cog.post_gazette_task, tasks.Loop)
@@ -51,6 +57,9 @@ async def test_radio_tasks_exist(cog):
     assert hasattr(cog, "update_current_song_embed")
     assert isinstance(cog.update_current_song_embed, tasks.Loop)
 
+    assert hasattr(cog, "refresh_knowledge")
+    assert isinstance(cog.refresh_knowledge, tasks.Loop)
+
 
 @pytest.mark.asyncio
 async def test_radio_cog_load_starts_tasks(cog):
@@ -60,6 +69,8 @@ async def test_radio_cog_load_starts_tasks(cog):
     cog.update_jingles.start = MagicMock()
     cog.update_news.start = MagicMock()
     cog.update_current_song_embed.start = MagicMock()
+    cog.refresh_knowledge.start = MagicMock()
+    cog.delete_radio_messages.start = MagicMock()
 
     # Mock fetch_knowledge to avoid error
     cog.fetch_knowledge = AsyncMock(return_value="Mock Knowledge")
@@ -70,6 +81,11 @@ async def test_radio_cog_load_starts_tasks(cog):
     cog.update_jingles.start.assert_called_once()
     cog.update_news.start.assert_called_once()
     cog.update_current_song_embed.start.assert_called_once()
+    cog.refresh_knowledge.start.assert_called_once()
+    cog.delete_radio_messages.start.assert_called_once()
+    cog._track_events.start.assert_awaited_once()
+    assert not cog._track_watcher.done()
+    cog._track_watcher.cancel()
 
 
 @pytest.mark.asyncio
@@ -80,6 +96,8 @@ async def test_radio_cog_unload_cancels_tasks(cog):
     cog.update_jingles.cancel = MagicMock()
     cog.update_news.cancel = MagicMock()
     cog.update_current_song_embed.cancel = MagicMock()
+    cog.refresh_knowledge.cancel = MagicMock()
+    cog.delete_radio_messages.cancel = MagicMock()
 
     await cog.cog_unload()
 
@@ -87,10 +105,12 @@ async def test_radio_cog_unload_cancels_tasks(cog):
     cog.update_jingles.cancel.assert_called_once()
     cog.update_news.cancel.assert_called_once()
     cog.update_current_song_embed.cancel.assert_called_once()
+    cog.refresh_knowledge.cancel.assert_called_once()
+    cog._track_events.stop.assert_awaited_once()
+    cog.delete_radio_messages.cancel.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_request_song_throttling(cog):
+def test_request_song_throttling(cog):
     """Test throttling mechanism for song requests."""
     # Mock dependencies
     cog.openai_client_openrouter = MagicMock()
@@ -107,3 +127,684 @@ async def test_request_song_throttling(cog):
     # Actually, let's just manually populate throttling data to test the check logic
     pass
     # Skipping detailed logic test here for brevity, focused on structure verification.
+
+
+@pytest.mark.asyncio
+async def test_news_context_system_message_is_stable(cog, mock_bot):
+    """Test that the system prompt is identical across calls for prompt caching."""
+    mock_bot.guilds = []
+    cog.fetch_knowledge = AsyncMock(return_value="Knowledge")
+    cog.post_gazette_task.start = MagicMock()
+    cog.update_jingles.start = MagicMock()
+    cog.update_news.start = MagicMock()
+    cog.update_current_song_embed.start = MagicMock()
+    cog.refresh_knowledge.start = MagicMock()
+    cog.delete_radio_messages.start = MagicMock()
+    await cog.cog_load()
+    cog._track_watcher.cancel()
+
+    first = await cog.fetch_news_context()
+    second = await cog.fetch_news_context(hours=24)
+
+    assert first[0] == second[0]
+    assert first[0]["content"][0]["text"].endswith("Knowledge")
+
+
+@pytest.mark.asyncio
+async def test_news_context_is_memoized(cog, mock_bot):
+    """Test that back-to-back calls share one context build per window."""
+    mock_bot.guilds = []
+    cog._build_news_context = AsyncMock(return_value=[{"role": "user"}])
+
+    first = await cog.fetch_news_context()
+    second = await cog.fetch_news_context()
+    await cog.fetch_news_context(hours=24)
+
+    assert first is second
+    assert cog._build_news_context.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_news_context_fresh_skips_memo(cog):
+    """Test that a fresh fetch rebuilds the context and refreshes the memo."""
+    cog._build_news_context = AsyncMock(side_effect=[["old"], ["new"]])
+
+    await cog.fetch_news_context()
+    fresh = await cog.fetch_news_context(fresh=True)
+
+    assert fresh == ["new"]
+    assert await cog.fetch_news_context() == ["new"]
+    assert cog._build_news_context.await_count == 2
+
+
+def _chat_message(channel_id, author, content, minutes_ago=0, bot=False):
+    message = MagicMock()
+    message.channel.id = channel_id
+    message.created_at = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    message.author.display_name = author
+    message.author.bot = bot
+    message.content = content
+    return message
+
+
+@pytest.mark.asyncio
+async def test_news_context_reads_message_cache(cog, mock_bot):
+    """Test that chat history is fetched once, then kept current by on_message."""
+    mock_bot.guilds = []
+    history_calls = []
+    old = _chat_message(GENERAL_CHANNEL_ID, "Old", "from history", minutes_ago=5)
+
+    async def history(**kwargs):
+        history_calls.append(kwargs)
+        yield old
+
+    channel = MagicMock()
+    channel.history = history
+    mock_bot.get_channel = MagicMock(
+        side_effect=lambda cid: channel if cid == GENERAL_CHANNEL_ID else None
+    )
+
+    await cog._build_news_context(12)
+    await cog.on_message(_chat_message(GENERAL_CHANNEL_ID, "New", "hello"))
+    await cog.on_message(_chat_message(GENERAL_CHANNEL_ID, "Bot", "beep", bot=True))
+    context = await cog._build_news_context(12)
+
+    assert len(history_calls) == 1
+    discord_section = context[3]["content"]
+    assert "@Old: from history\n@New: hello" in discord_section
+    assert "beep" not in discord_section
+
+
+def _song_message(content, *filenames):
+    message = MagicMock()
+    message.content = content
+    message.attachments = []
+    for filename in filenames:
+        attachment = MagicMock()
+        attachment.filename = filename
+        attachment.size = 3
+
+        async def save(path):
+            with open(path, "w") as f:
+                f.write("mp3")
+
+        attachment.save = AsyncMock(side_effect=save)
+        message.attachments.append(attachment)
+    return message
+
+
+@pytest.fixture
+def radio_paths(tmp_path, monkeypatch):
+    paths = {
+        "PLAYLIST_PATH": tmp_path / "playlist",
+        "REQUESTS_PATH": tmp_path / "requests",
+        "JINGLES_PATH": tmp_path / "jingles",
+        "RADIO_PATH": tmp_path,
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(f"amc_peripheral.radio.radio_cog.{name}", str(path))
+    return paths
+
+
+@pytest.mark.asyncio
+async def test_compile_playlist(cog, mock_bot, radio_paths):
+    """Test that all song channels are downloaded and the playlist is sorted."""
+    channels = {
+        PLAYLIST_CHANNEL: [
+            _song_message("b", "b.mp3"),
+            _song_message("a", "a1.mp3", "a2.mp3"),
+            _song_message("no file"),
+        ],
+        EVENT_SONGS_CHANNEL: [_song_message("", "event.mp3")],
+    }
+
+    def get_channel(channel_id):
+        if channel_id not in channels:
+            return None
+
+        async def history(**kwargs):
+            for message in channels[channel_id]:
+                yield message
+
+        channel = MagicMock()
+        channel.history = history
+        return channel
+
+    mock_bot.get_channel = MagicMock(side_effect=get_channel)
+
+    await cog.compile_playlist()
+
+    playlist_dir = radio_paths["PLAYLIST_PATH"]
+    playlist = (playlist_dir / "playlist.txt").read_text().split()
+    assert playlist == [str(playlist_dir / n) for n in ("a1.mp3", "a2.mp3", "b.mp3")]
+    assert (radio_paths["RADIO_PATH"] / "event_songs" / "event.mp3").exists()
+
+
+@pytest.mark.asyncio
+async def test_compile_playlist_skips_existing_files(cog, mock_bot, radio_paths):
+    """Test that files already on disk with the same size are not downloaded."""
+    playlist_dir = radio_paths["PLAYLIST_PATH"]
+    playlist_dir.mkdir()
+    (playlist_dir / "same.mp3").write_text("mp3")
+    (playlist_dir / "changed.mp3").write_text("old mp3")
+    same = _song_message("a", "same.mp3")
+    changed = _song_message("b", "changed.mp3")
+
+    async def history(**kwargs):
+        for message in (same, changed):
+            yield message
+
+    channel = MagicMock()
+    channel.history = history
+    mock_bot.get_channel = MagicMock(
+        side_effect=lambda cid: channel if cid == PLAYLIST_CHANNEL else None
+    )
+
+    await cog.compile_playlist()
+
+    same.attachments[0].save.assert_not_awaited()
+    changed.attachments[0].save.assert_awaited_once()
+    playlist = (playlist_dir / "playlist.txt").read_text().split()
+    assert playlist == [
+        str(playlist_dir / "same.mp3"),
+        str(playlist_dir / "changed.mp3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compile_playlist_keeps_file_when_channel_missing(
+    cog, mock_bot, radio_paths
+):
+    """Test that an unavailable playlist channel leaves playlist.txt alone."""
+    playlist_dir = radio_paths["PLAYLIST_PATH"]
+    playlist_dir.mkdir()
+    (playlist_dir / "playlist.txt").write_text("existing.mp3")
+    mock_bot.get_channel = MagicMock(return_value=None)
+
+    await cog.compile_playlist()
+
+    assert (playlist_dir / "playlist.txt").read_text() == "existing.mp3"
+
+
+@pytest.mark.asyncio
+async def test_compile_playlist_keeps_local_copy_on_failed_download(
+    cog, mock_bot, radio_paths
+):
+    """Test that a failed download keeps the song already on disk."""
+    playlist_dir = radio_paths["PLAYLIST_PATH"]
+    playlist_dir.mkdir()
+    (playlist_dir / "cached.mp3").write_text("old mp3")
+    cached = _song_message("a", "cached.mp3")
+    cached.attachments[0].save = AsyncMock(side_effect=OSError("cdn error"))
+    missing = _song_message("b", "missing.mp3")
+    missing.attachments[0].save = AsyncMock(side_effect=OSError("cdn error"))
+
+    async def history(**kwargs):
+        for message in (cached, missing):
+            yield message
+
+    channel = MagicMock()
+    channel.history = history
+    mock_bot.get_channel = MagicMock(
+        side_effect=lambda cid: channel if cid == PLAYLIST_CHANNEL else None
+    )
+
+    await cog.compile_playlist()
+
+    playlist = (playlist_dir / "playlist.txt").read_text().split()
+    assert playlist == [str(playlist_dir / "cached.mp3")]
+
+
+@pytest.mark.asyncio
+async def test_song_channel_changes_compile_once(cog, mock_bot, monkeypatch):
+    """Test that a burst of uploads triggers a single playlist compile."""
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.COMPILE_PLAYLIST_DEBOUNCE", 0.01
+    )
+    mock_bot.loop = asyncio.get_running_loop()
+    cog.compile_playlist = AsyncMock()
+
+    messages = [_song_message(f"song {i}", f"{i}.mp3") for i in range(3)]
+    for message in messages:
+        message.channel.id = PLAYLIST_CHANNEL
+        await cog.on_message(message)
+    await cog.on_message_edit(messages[0], messages[0])
+    await asyncio.sleep(0.05)
+
+    cog.compile_playlist.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_radio_channel_messages_deleted_in_bulk(cog, monkeypatch):
+    """Test that radio channel chatter is batched into one bulk delete."""
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.RADIO_DELETE_BATCH_WINDOW", 0.01
+    )
+    channel = MagicMock()
+    channel.id = RADIO_CHANNEL_ID
+    channel.delete_messages = AsyncMock()
+    messages = []
+    for i in range(3):
+        message = _chat_message(RADIO_CHANNEL_ID, "A", f"spam {i}")
+        message.channel = channel
+        message.type = discord.MessageType.default
+        await cog.on_message(message)
+        messages.append(message)
+
+    await cog.delete_radio_messages.coro(cog)
+
+    channel.delete_messages.assert_awaited_once_with(messages)
+
+
+@pytest.mark.asyncio
+async def test_song_upload_streamed_to_disk(cog, mock_bot, tmp_path, monkeypatch):
+    """Test that a song upload is written chunk by chunk to the songs folder."""
+    songs = tmp_path / "songs"
+    songs.mkdir()
+    monkeypatch.setattr("amc_peripheral.radio.radio_cog.SONGS_PATH", str(songs))
+
+    async def iter_chunked(size):
+        for chunk in (b"ab", b"cd"):
+            yield chunk
+
+    response = MagicMock()
+    response.content.iter_chunked = iter_chunked
+    mock_bot.http_session.get = MagicMock()
+    mock_bot.http_session.get.return_value.__aenter__.return_value = response
+    message = _song_message("song", "song.mp3")
+    message.channel.id = SONGS_CHANNEL
+
+    await cog.on_message(message)
+
+    assert (songs / "song.mp3").read_bytes() == b"abcd"
+    assert [p.name for p in songs.iterdir()] == ["song.mp3"]
+    message.attachments[0].save.assert_not_awaited()
+    timeout = mock_bot.http_session.get.call_args.kwargs["timeout"]
+    assert timeout.total is None
+
+
+@pytest.mark.asyncio
+async def test_jingle_tts_runs_concurrently(cog, monkeypatch):
+    """Test that jingle audio is synthesized in parallel and kept in order."""
+    running = 0
+    peak = 0
+
+    async def fake_tts(text, use_markup=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return text.encode()
+
+    monkeypatch.setattr("amc_peripheral.radio.radio_cog.tts_google", fake_tts)
+    cog.fetch_news_context = AsyncMock(return_value=[])
+    completion = MagicMock()
+    completion.choices[0].message.parsed.scripts = [f"jingle {i}" for i in range(8)]
+    cog.openai_client_openrouter = MagicMock()
+    cog.openai_client_openrouter.beta.chat.completions.parse = AsyncMock(
+        return_value=completion
+    )
+
+    pairs = [pair async for pair in cog.generate_jingles_gen()]
+
+    assert pairs == [(f"jingle {i}", f"jingle {i}".encode()) for i in range(6)]
+    assert 1 < peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_update_news_writes_audio_locally(
+    cog, mock_bot, radio_paths, monkeypatch
+):
+    """Test that news audio is saved from memory and then posted."""
+    radio_paths["JINGLES_PATH"].mkdir()
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    mock_bot.get_channel = MagicMock(return_value=channel)
+    cog.generate_news_content = AsyncMock(return_value="News!")
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.tts_google",
+        AsyncMock(return_value=b"mp3"),
+    )
+
+    await cog._update_news_logic(force=True)
+
+    # A forced update must not reuse a context built before its trigger
+    cog.generate_news_content.assert_awaited_once_with(fresh=True)
+    assert (radio_paths["JINGLES_PATH"] / "news.mp3").read_bytes() == b"mp3"
+    channel.send.assert_awaited_once()
+    mock_bot.loop.create_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_knowledge_rebuilds_system_message(cog):
+    """Test that a changed knowledge file replaces the cached system prompt."""
+    cog._set_knowledge("Old")
+    cached = cog._system_message_cached
+
+    cog.fetch_knowledge = AsyncMock(return_value="Old")
+    await cog.refresh_knowledge.coro(cog)
+    assert cog._system_message_cached is cached
+
+    cog.fetch_knowledge = AsyncMock(return_value="New")
+    await cog.refresh_knowledge.coro(cog)
+    assert cog._system_message_cached.endswith("New")
+
+
+@pytest.mark.asyncio
+async def test_news_context_lists_upcoming_events_in_order(cog, mock_bot):
+    """Test that past events are dropped and the rest are sorted by start."""
+
+    def event(name, hours_from_now, naive=False):
+        start = datetime.now(timezone.utc) + timedelta(hours=hours_from_now)
+        e = MagicMock()
+        e.name = name
+        e.start_time = start.replace(tzinfo=None) if naive else start
+        return e
+
+    guild = MagicMock()
+    guild.scheduled_events = [
+        event("Later", 48),
+        event("Past", -2),
+        event("Sooner", 3, naive=True),
+    ]
+    mock_bot.guilds = [guild]
+
+    context = await cog._build_news_context(12)
+
+    events_section = context[2]["content"]
+    assert "Past" not in events_section
+    assert events_section.index("## Sooner") < events_section.index("## Later")
+
+
+@pytest.mark.asyncio
+async def test_fetch_knowledge_stops_at_first_match(cog, mock_bot):
+    """Test that the newest knowledge.txt is returned without reading further."""
+    seen = []
+
+    def file_message(filename, data):
+        m = MagicMock()
+        attachment = MagicMock()
+        attachment.filename = filename
+        attachment.read = AsyncMock(return_value=data)
+        m.attachments = [attachment]
+        return m
+
+    messages = [
+        file_message("other.txt", b"nope"),
+        file_message("knowledge.txt", b"newest"),
+        file_message("knowledge.txt", b"older"),
+    ]
+
+    async def history(**kwargs):
+        for m in messages:
+            seen.append(m)
+            yield m
+
+    channel = MagicMock()
+    channel.history = history
+    mock_bot.get_channel = MagicMock(return_value=channel)
+
+    assert await cog.fetch_knowledge() == "newest"
+    assert len(seen) == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_knowledge_skips_unchanged_upload(cog, mock_bot):
+    """Test that the same knowledge.txt upload is downloaded only once."""
+    attachment = MagicMock(id=1)
+    attachment.filename = "knowledge.txt"
+    attachment.read = AsyncMock(return_value=b"Knowledge")
+    message = MagicMock(attachments=[attachment])
+
+    async def history(**kwargs):
+        yield message
+
+    channel = MagicMock()
+    channel.history = history
+    mock_bot.get_channel = MagicMock(return_value=channel)
+
+    await cog.refresh_knowledge.coro(cog)
+    await cog.refresh_knowledge.coro(cog)
+    assert cog.knowledge_system_message == "Knowledge"
+    attachment.read.assert_awaited_once()
+
+    # A new upload is read again
+    attachment.id = 2
+    attachment.read.return_value = b"Updated"
+    await cog.refresh_knowledge.coro(cog)
+    assert cog.knowledge_system_message == "Updated"
+
+
+@pytest.mark.asyncio
+async def test_song_embed_only_updates_on_track_change(cog, mock_bot, monkeypatch):
+    """Test that the embed is edited once per track, not on every tick."""
+    channel = MagicMock()
+    message = MagicMock()
+    message.edit = AsyncMock()
+    channel.get_partial_message = MagicMock(return_value=message)
+    channel.fetch_message = AsyncMock()
+    mock_bot.get_channel = MagicMock(return_value=channel)
+    cog.embed_message_id = 1
+    metadata = {"filename": "/var/lib/radio/requests/Alice-Song.mp3"}
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.get_current_song_metadata",
+        AsyncMock(side_effect=lambda session: metadata),
+    )
+
+    for _ in range(3):
+        await cog.update_current_song_embed.coro(cog)
+    metadata = {"filename": "/var/lib/radio/requests/Bob-Other.mp3"}
+    await cog.update_current_song_embed.coro(cog)
+
+    assert message.edit.await_count == 2
+    channel.get_partial_message.assert_called_with(1)
+    channel.fetch_message.assert_not_awaited()
+    mock_bot.get_channel.assert_called_once()
+
+    first, second = (c.kwargs for c in message.edit.await_args_list)
+    assert first["embed"].fields[0].value == "*Song*"
+    assert second["embed"].fields[1].value == "Bob"
+    assert first["view"] is second["view"]
+    assert first["embed"].fields[2].name == "How to tune in"
+    assert len(cog._embed_template["fields"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_song_embed_reposted_when_deleted(cog, mock_bot):
+    """Test that a deleted embed message is replaced with a new one."""
+    channel = MagicMock()
+    message = MagicMock()
+    message.edit = AsyncMock(
+        side_effect=discord.NotFound(MagicMock(status=404), "Unknown Message")
+    )
+    channel.get_partial_message = MagicMock(return_value=message)
+    new_message = MagicMock(id=2)
+    new_message.pin = AsyncMock()
+    channel.send = AsyncMock(return_value=new_message)
+    mock_bot.get_channel = MagicMock(return_value=channel)
+    cog.embed_message_id = 1
+
+    await cog._render_song_embed({"filename": "/var/lib/radio/requests/A-B.mp3"})
+
+    channel.send.assert_awaited_once()
+    new_message.pin.assert_awaited_once()
+    assert cog.embed_message_id == 2
+
+
+@pytest.mark.asyncio
+async def test_pushed_track_renders_embed_and_pauses_polling(
+    cog, mock_bot, monkeypatch
+):
+    """Test that a pushed track change renders the embed and the poll stands down."""
+    cog._render_song_embed = AsyncMock()
+    poll = AsyncMock()
+    monkeypatch.setattr(
+        "amc_peripheral.radio.radio_cog.get_current_song_metadata", poll
+    )
+    mock_bot.get_channel = MagicMock(return_value=MagicMock())
+    cog._embed_message_found.set()
+    watcher = asyncio.create_task(cog._watch_track_events())
+
+    cog._track_events.queue.put_nowait({"filename": "a.mp3"})
+    for _ in range(3):
+        await asyncio.sleep(0)
+    await cog.update_current_song_embed.coro(cog)
+    watcher.cancel()
+
+    cog._render_song_embed.assert_awaited_once_with({"filename": "a.mp3"})
+    poll.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_track_events_wait_for_embed_lookup(cog):
+    """Test that pushes are held until the existing embed has been located."""
+    cog._render_song_embed = AsyncMock()
+    watcher = asyncio.create_task(cog._watch_track_events())
+    cog._track_events.queue.put_nowait({"filename": "a.mp3"})
+    await asyncio.sleep(0)
+    cog._render_song_embed.assert_not_awaited()
+
+    cog._embed_message_found.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    watcher.cancel()
+
+    cog._render_song_embed.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_embed_found_among_pins(cog, mock_bot):
+    """Test that the embed is looked up from the bot's pinned messages."""
+
+    def pinned(id, author, title):
+        m = MagicMock(id=id)
+        m.author.id = author
+        m.embeds = [discord.Embed(title=title)]
+        return m
+
+    mock_bot.user.id = 42
+    channel = MagicMock()
+    channel.pins = AsyncMock(
+        return_value=[
+            pinned(1, 7, "📻 AMC Radio"),
+            pinned(2, 42, "Rules"),
+            pinned(3, 42, "📻 AMC Radio"),
+        ]
+    )
+    channel.history = MagicMock()
+    mock_bot.wait_until_ready = AsyncMock()
+    mock_bot.get_channel = MagicMock(return_value=channel)
+
+    await cog.before_update_current_song_embed()
+
+    assert cog.embed_message_id == 3
+    assert cog._embed_message_found.is_set()
+    channel.history.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_forum_messages_skip_large_and_binary_attachments(cog):
+    """Test that only small text attachments are read into the context."""
+
+    def attachment(filename, size, content_type, data=b""):
+        a = MagicMock()
+        a.filename = filename
+        a.size = size
+        a.content_type = content_type
+        a.read = AsyncMock(return_value=data)
+        return a
+
+    small = attachment("notes.txt", 5, "text/plain; charset=utf-8", b"notes")
+    huge = attachment("dump.txt", 10 * 1024 * 1024, "text/plain")
+    image = attachment("photo.png", 100, "image/png")
+    message = MagicMock()
+    message.content = "Column"
+    message.attachments = [small, huge, image]
+
+    async def history(**kwargs):
+        yield message
+
+    thread = MagicMock()
+    thread.name = "Thread"
+    thread.history = history
+    forum = MagicMock()
+    forum.threads = [thread]
+
+    acc = await cog.fetch_forum_messages(forum)
+
+    assert "Column" in acc and "notes" in acc
+    huge.read.assert_not_awaited()
+    image.read.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_updates_skip_quiet_chat(cog, mock_bot):
+    """Test that jingles and news are not generated when chat is quiet."""
+    cog.generate_news_content = AsyncMock()
+    cog.generate_jingles_gen = MagicMock()
+    mock_bot.get_channel = MagicMock(return_value=None)
+    cog._msg_cache_primed.update(cog.msg_cache)
+    for i in range(4):
+        cog._cache_message(_chat_message(GENERAL_CHANNEL_ID, "A", f"msg {i}"))
+
+    await cog._update_jingles_logic()
+    cog.generate_jingles_gen.assert_not_called()
+
+    mock_bot.get_channel = MagicMock(return_value=MagicMock())
+    await cog._update_news_logic()
+    cog.generate_news_content.assert_not_awaited()
+
+    cog._cache_message(_chat_message(GENERAL_CHANNEL_ID, "A", "one more"))
+    assert await cog._has_recent_activity()
+
+
+@pytest.mark.asyncio
+async def test_game_chat_commands(cog, mock_bot):
+    """Test that relayed game chat commands are parsed, with or without args."""
+    cog.lq = MagicMock()
+    cog.game_like_song = MagicMock()
+
+    await cog.on_message(_chat_message(GAME_CHAT_CHANNEL_ID, "Relay", "**Bob:** /skip"))
+    cog.lq.skip_current_track.assert_called_once_with("song_requests")
+
+    await cog.on_message(
+        _chat_message(GAME_CHAT_CHANNEL_ID, "Relay", "**Ann Lee:** /like this one")
+    )
+    cog.game_like_song.assert_called_once_with("Ann Lee")
+
+    await cog.on_message(_chat_message(GAME_CHAT_CHANNEL_ID, "Relay", "just chat"))
+    assert mock_bot.loop.create_task.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_game_chat_event_mode(cog, mock_bot):
+    """Test that /event_mode goes through set_vars and ignores non-boolean args."""
+    cog.lq = MagicMock()
+
+    await cog.on_message(
+        _chat_message(GAME_CHAT_CHANNEL_ID, "Relay", "**Bob:** /event_mode True")
+    )
+    cog.lq.set_vars.assert_called_once_with({"event_mode": True})
+
+    await cog.on_message(
+        _chat_message(
+            GAME_CHAT_CHANNEL_ID, "Relay", "**Bob:** /event_mode true; radio.skip"
+        )
+    )
+    cog.lq.set_vars.assert_called_once()
+    assert mock_bot.loop.create_task.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Test Song Title", "Test_Song_Title"),
+        ('a/b\\c:d*e?"<>|', "a_b_c_d_e_____"),
+        ("Café Ñandú 東京", "Caf___and____"),
+        ("", ""),
+    ],
+)
+def test_safe_filename(text, expected):
+    """Test that only ASCII letters and digits survive in request filenames."""
+    assert _safe_filename(text) == expected
@@ -1,16 +1,9 @@
-import sys
+import asyncio
+import threading
 from unittest.mock import MagicMock, AsyncMock, patch
-
-# Mock google.cloud.texttospeech before importing RadioCog
-mock_texttospeech = MagicMock()
-mock_texttospeech.TextToSpeechClient = MagicMock()
-sys.modules["google.cloud.texttospeech"] = mock_texttospeech
-sys.modules["google.cloud"] = MagicMock()
-sys.modules["google"] = MagicMock()
-
-import pytest  # noqa: E402
-from amc_peripheral.radio.radio_cog import RadioCog  # noqa: E402
-from amc_peripheral.settings import REQUESTS_PATH  # noqa: E402
+import pytest
+from amc_peripheral.radio.radio_cog import RadioCog, YDL_INFO_OPTS
+from amc_peripheral.settings import REQUESTS_PATH
 
 @pytest.fixture
 def mock_bot():
@@ -26,13 +19,13 @@ def mock_bot():
     return bot
 
 @pytest.fixture
-def cog(mock_bot, tmp_path, monkeypatch):
-    db_path = str(tmp_path / "radio.db")
-    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", db_path)
+def cog(mock_bot, monkeypatch):
+    # Nothing here reads rows back, so the database can live in memory
+    monkeypatch.setattr("amc_peripheral.radio.radio_cog.RADIO_DB_PATH", ":memory:")
     with patch("amc_peripheral.radio.radio_cog.LiquidsoapController"):
         with patch("amc_peripheral.radio.radio_cog.AsyncOpenAI"):
             cog = RadioCog(mock_bot)
-            cog.lq = MagicMock()
+            cog.lq = AsyncMock()
             return cog
 
 @pytest.mark.asyncio
@@ -49,7 +42,8 @@ async def test_request_song_pushes_to_queue(cog):
     }
     
     with patch("yt_dlp.YoutubeDL") as mock_ydl:
-        instance = mock_ydl.return_value.__enter__.return_value
+        instance = mock_ydl.return_value
+        instance.__enter__.return_value = instance
         instance.extract_info.return_value = mock_info
         
         # Mock successful download
@@ -79,7 +73,8 @@ async def test_request_song_handles_telnet_exception(cog):
     }
     
     with patch("yt_dlp.YoutubeDL") as mock_ydl:
-        instance = mock_ydl.return_value.__enter__.return_value
+        instance = mock_ydl.return_value
+        instance.__enter__.return_value = instance
         instance.extract_info.return_value = mock_info
         instance.download = MagicMock()
         
@@ -100,7 +95,9 @@ async def test_game_request_song_announces_success(cog):
     song_name = "Test Song"
     
     # Mock request_song success
-    cog.request_song = AsyncMock(return_value=("Test Song Title", 120))
+    download = asyncio.get_running_loop().create_future()
+    download.set_result(None)
+    cog.start_song_request = AsyncMock(return_value=("Test Song Title", 120, download))
     
     # Mock announcement
     with patch("amc_peripheral.radio.radio_cog.announce_in_game", new_callable=AsyncMock) as mock_announce:
@@ -122,9 +119,106 @@ async def test_game_request_song_announces_even_if_push_failed(cog):
     song_name = "Test Song"
     
     # request_song succeeds (even if telnet failed internally, it catches it)
-    cog.request_song = AsyncMock(return_value=("Test Song Title", 120))
+    download = asyncio.get_running_loop().create_future()
+    download.set_result(None)
+    cog.start_song_request = AsyncMock(return_value=("Test Song Title", 120, download))
     
     with patch("amc_peripheral.radio.radio_cog.announce_in_game", new_callable=AsyncMock) as mock_announce:
         await cog.game_request_song(song_name, requester)
         
         mock_announce.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_game_request_song_announces_during_download(cog):
+    """Test that the announcement goes out before the download finishes."""
+    mock_info = {
+        "title": "Test Song Title",
+        "duration": 120,
+        "webpage_url": "https://youtube.com/watch?v=123"
+    }
+    release = threading.Event()
+    released = []
+
+    def download(urls):
+        # Only returns promptly if the announcement went out meanwhile
+        released.append(release.wait(5))
+
+    async def announce(*args, **kwargs):
+        release.set()
+
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
+        instance = mock_ydl.return_value
+        instance.__enter__.return_value = instance
+        instance.extract_info.return_value = mock_info
+        instance.download = MagicMock(side_effect=download)
+
+        with patch("amc_peripheral.radio.radio_cog.announce_in_game", side_effect=announce):
+            await cog.game_request_song("Test Song", "TestUser")
+
+    assert released == [True]
+    cog.lq.push_to_queue.assert_awaited_once_with(
+        "song_requests", f"{REQUESTS_PATH}/TestUser-Test_Song_Title.mp3"
+    )
+
+@pytest.mark.asyncio
+async def test_game_request_song_reports_failed_download(cog):
+    """Test that a download failing after the announcement is reported."""
+    download = asyncio.get_running_loop().create_future()
+    download.set_exception(Exception("Failed to download audio: gone"))
+    cog.start_song_request = AsyncMock(return_value=("Test Song Title", 120, download))
+
+    with patch("amc_peripheral.radio.radio_cog.announce_in_game", new_callable=AsyncMock) as mock_announce:
+        await cog.game_request_song("Test Song", "TestUser")
+
+    channel = cog.bot.get_channel.return_value
+    assert "Failed to queue Test Song" in channel.send.call_args.args[0]
+    # The in-game player hears about the failure too
+    assert "Failed to queue Test Song" in mock_announce.call_args.args[1]
+
+@pytest.mark.asyncio
+async def test_game_request_song_awaits_download_when_announce_fails(cog):
+    """Test that the download is still collected if the announcement raises."""
+    download_done = asyncio.Event()
+
+    async def download():
+        await asyncio.sleep(0)
+        download_done.set()
+
+    task = asyncio.ensure_future(download())
+    cog.start_song_request = AsyncMock(return_value=("Test Song Title", 120, task))
+    cog.bot.get_channel.return_value.send.side_effect = Exception("Discord down")
+
+    with patch("amc_peripheral.radio.radio_cog.announce_in_game", new_callable=AsyncMock):
+        await cog.game_request_song("Test Song", "TestUser")
+
+    assert download_done.is_set()
+    assert task.done()
+
+@pytest.mark.asyncio
+async def test_request_song_rejects_recent_duplicates(cog):
+    """Test that a recently queued title is refused until it leaves the queue."""
+    def info(title):
+        return {"title": title, "duration": 120, "webpage_url": "https://youtube.com/watch?v=1"}
+
+    with patch("yt_dlp.YoutubeDL") as mock_ydl:
+        instance = mock_ydl.return_value
+        instance.__enter__.return_value = instance
+        instance.download = MagicMock()
+
+        instance.extract_info.return_value = info("Repeat Song")
+        await cog.request_song("repeat", "A", bypass_throttling=True)
+        instance.extract_info.return_value = info("  repeat song ")
+        with pytest.raises(Exception, match="queued recently"):
+            await cog.request_song("repeat", "B", bypass_throttling=True)
+
+        for i in range(10):
+            instance.extract_info.return_value = info(f"Song {i}")
+            await cog.request_song(f"song {i}", "A", bypass_throttling=True)
+
+        instance.extract_info.return_value = info("Repeat Song")
+        await cog.request_song("repeat", "A", bypass_throttling=True)
+        assert len(cog._recent_songs) == len(cog.recent_song_queue) == 10
+
+        # Lookups share one YoutubeDL; only downloads build their own
+        info_instances = [c for c in mock_ydl.call_args_list if c.args[0] is YDL_INFO_OPTS]
+        assert len(info_instances) == 1
@@ -1,142 +1,115 @@
 """Tests for the radio_server module."""
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import patch
 from amc_peripheral.radio.radio_server import (
     get_current_song_metadata,
     parse_song_info,
     get_current_song,
 )
+from amc_peripheral.utils.http_utils import close_shared_session, get_shared_session
+
+
+@pytest.mark.parametrize(
+    "metadata, expected",
+    [
+        (
+            {"filename": "/var/lib/radio/requests/JohnDoe-Cool_Song.mp3"},
+            {"folder": "requests", "requester": "JohnDoe", "song_title": "Cool_Song"},
+        ),
+        # Songs that already played move to prev_requests
+        (
+            {"filename": "/var/lib/radio/prev_requests/Alice-Another_Track.mp3"},
+            {
+                "folder": "prev_requests",
+                "requester": "Alice",
+                "song_title": "Another_Track",
+            },
+        ),
+        # Only the first hyphen separates requester and title
+        (
+            {"filename": "/var/lib/radio/requests/Bob-Song-With-Hyphens.mp3"},
+            {
+                "folder": "requests",
+                "requester": "Bob",
+                "song_title": "Song-With-Hyphens",
+            },
+        ),
+        ({"filename": "/var/lib/radio/requests/InvalidNoHyphen.mp3"}, None),
+        ({"filename": "just_a_file.mp3"}, None),
+        ({"filename": ""}, None),
+        ({}, None),
+        ({"filename": "/var/lib/radio/a/b/User-Song.mp3"}, None),
+    ],
+)
+def test_parse_song_info(metadata, expected):
+    """Test parse_song_info on valid and malformed metadata."""
+    assert parse_song_info(metadata) == expected
+
+
+def make_session(fake_http_session, mock_http_session, payload):
+    """A session serving payload from /metadata, or raising it if it is an error."""
+    if isinstance(payload, Exception):
+        mock_http_session.get.side_effect = payload
+        return mock_http_session
+    return fake_http_session({"/metadata": payload})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fn, payload, expected",
+    [
+        (
+            get_current_song_metadata,
+            {"filename": "/var/lib/radio/requests/User-Song.mp3"},
+            {"filename": "/var/lib/radio/requests/User-Song.mp3"},
+        ),
+        (get_current_song_metadata, Exception("Connection refused"), None),
+        (
+            get_current_song,
+            {"filename": "/var/lib/radio/requests/Alice-My_Favorite_Song.mp3"},
+            "My_Favorite_Song (requested by Alice)",
+        ),
+        (get_current_song, Exception("Connection refused"), None),
+        (get_current_song, {"filename": "invalid_format.mp3"}, None),
+    ],
+)
+async def test_current_song_lookups(
+    fake_http_session, mock_http_session, fn, payload, expected
+):
+    """Test metadata and song lookups, including fetch errors and bad filenames."""
+    session = make_session(fake_http_session, mock_http_session, payload)
 
+    assert await fn(session) == expected
 
-class TestParseFileInfo:
-    """Tests for parse_song_info function."""
-
-    def test_parse_valid_filename(self):
-        """Test parsing a valid metadata dict."""
-        metadata = {"filename": "/var/lib/radio/requests/JohnDoe-Cool_Song.mp3"}
-        result = parse_song_info(metadata)
-
-        assert result is not None
-        assert result["folder"] == "requests"
-        assert result["requester"] == "JohnDoe"
-        assert result["song_title"] == "Cool_Song"
-
-    def test_parse_prev_requests_folder(self):
-        """Test parsing a song from prev_requests folder."""
-        metadata = {"filename": "/var/lib/radio/prev_requests/Alice-Another_Track.mp3"}
-        result = parse_song_info(metadata)
-
-        assert result is not None
-        assert result["folder"] == "prev_requests"
-        assert result["requester"] == "Alice"
-        assert result["song_title"] == "Another_Track"
-
-    def test_parse_song_with_hyphens_in_title(self):
-        """Test parsing a song with hyphens in the title."""
-        metadata = {"filename": "/var/lib/radio/requests/Bob-Song-With-Hyphens.mp3"}
-        result = parse_song_info(metadata)
-
-        assert result is not None
-        assert result["requester"] == "Bob"
-        assert result["song_title"] == "Song-With-Hyphens"
-
-    def test_parse_invalid_format_missing_hyphen(self):
-        """Test parsing fails gracefully for invalid format."""
-        metadata = {"filename": "/var/lib/radio/requests/InvalidNoHyphen.mp3"}
-        result = parse_song_info(metadata)
-
-        assert result is None
-
-    def test_parse_invalid_format_missing_folder(self):
-        """Test parsing fails gracefully for missing folder structure."""
-        metadata = {"filename": "just_a_file.mp3"}
-        result = parse_song_info(metadata)
-
-        assert result is None
-
-    def test_parse_empty_filename(self):
-        """Test parsing fails gracefully for empty filename."""
-        metadata = {"filename": ""}
-        result = parse_song_info(metadata)
-
-        assert result is None
-
-    def test_parse_missing_filename_key(self):
-        """Test parsing fails gracefully when filename key is missing."""
-        metadata = {}
-        result = parse_song_info(metadata)
-
-        assert result is None
-
-
-class TestGetCurrentSongMetadata:
-    """Tests for get_current_song_metadata function."""
-
-    @pytest.mark.asyncio
-    async def test_get_metadata_success(self):
-        """Test successfully fetching metadata."""
-        mock_response = AsyncMock()
-        mock_response.json = AsyncMock(
-            return_value={"filename": "/var/lib/radio/requests/User-Song.mp3"}
-        )
-
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)))
-
-        result = await get_current_song_metadata(mock_session)
-
-        assert result is not None
-        assert result["filename"] == "/var/lib/radio/requests/User-Song.mp3"
-
-    @pytest.mark.asyncio
-    async def test_get_metadata_error(self):
-        """Test handling of HTTP errors."""
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(side_effect=Exception("Connection refused"))
-
-        result = await get_current_song_metadata(mock_session)
-
-        assert result is None
-
-
-class TestGetCurrentSong:
-    """Tests for get_current_song function."""
-
-    @pytest.mark.asyncio
-    async def test_get_current_song_success(self):
-        """Test getting a human-readable current song string."""
-        mock_response = AsyncMock()
-        mock_response.json = AsyncMock(
-            return_value={"filename": "/var/lib/radio/requests/Alice-My_Favorite_Song.mp3"}
-        )
-
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)))
-
-        result = await get_current_song(mock_session)
 
-        assert result == "My_Favorite_Song (requested by Alice)"
+class TestSharedSession:
+    """Tests for the shared session fallback."""
 
     @pytest.mark.asyncio
-    async def test_get_current_song_no_metadata(self):
-        """Test returns None when metadata fetch fails."""
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(side_effect=Exception("Connection refused"))
+    async def test_metadata_without_session_uses_shared_session(self, fake_http_session):
+        """Test that omitting the session reuses one process-wide session."""
+        mock_session = fake_http_session({"/metadata": {"filename": "x"}})
 
-        result = await get_current_song(mock_session)
+        with patch(
+            "amc_peripheral.radio.radio_server.get_shared_session",
+            return_value=mock_session,
+        ) as shared:
+            assert await get_current_song_metadata() == {"filename": "x"}
+            assert await get_current_song_metadata() == {"filename": "x"}
 
-        assert result is None
+        assert shared.call_count == 2
+        assert len(mock_session.requested) == 2
 
     @pytest.mark.asyncio
-    async def test_get_current_song_invalid_format(self):
-        """Test returns None when metadata format is invalid."""
-        mock_response = AsyncMock()
-        mock_response.json = AsyncMock(return_value={"filename": "invalid_format.mp3"})
-
-        mock_session = AsyncMock()
-        mock_session.get = MagicMock(return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response)))
+    async def test_shared_session_is_reused_until_closed(self):
+        """Test that the shared session is created once and recreated after close."""
+        first = get_shared_session()
+        assert get_shared_session() is first
 
-        result = await get_current_song(mock_session)
+        await close_shared_session()
+        assert first.closed
 
-        assert result is None
+        second = get_shared_session()
+        assert second is not first
+        await close_shared_session()
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from amc_peripheral.utils.rate_limiter import RateLimiter
+
+
+def test_limits_within_window(monkeypatch):
+    """Test that calls beyond the limit wait for the oldest to expire."""
+    now = 1000.0
+    monkeypatch.setattr("time.monotonic", lambda: now)
+    limiter = RateLimiter(max_calls=2, period_minutes=1)
+
+    assert limiter.check() == (True, None)
+    now += 10
+    assert limiter.check() == (True, None)
+    now += 5
+    assert limiter.check() == (False, timedelta(seconds=45))
+
+    # The first call has left the window
+    now = 1060.0
+    assert limiter.check() == (True, None)
+    assert len(limiter.calls) == 2
+
+
+def test_reset():
+    """Test that reset clears the history."""
+    limiter = RateLimiter(max_calls=1, period_minutes=1)
+    assert limiter.check()[0]
+    assert not limiter.check()[0]
+    limiter.reset()
+    assert limiter.check()[0]
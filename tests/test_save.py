@@ -0,0 +1,37 @@
+import pytest
+from amc_peripheral.utils.save import (
+    BLOCK_SIZE,
+    decrypt,
+    decrypt_file_async,
+    encrypt,
+    encrypt_file_async,
+)
+
+
+@pytest.mark.parametrize("size", [0, 1, 11, 12, 1000])
+def test_round_trip(size):
+    """Test that decrypt restores what encrypt produced."""
+    data = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+    encrypted = encrypt(data)
+    assert len(encrypted) % BLOCK_SIZE == 0
+    assert decrypt(encrypted) == data
+
+
+def test_bytes_are_shifted_before_encryption():
+    """Test the header and byte shift under the AES layer."""
+    from Crypto.Cipher import AES
+    from amc_peripheral.utils.save import KEY
+
+    plain = AES.new(KEY, AES.MODE_ECB).decrypt(encrypt(b"\x00\x01"))
+    assert plain[:6] == b"\x02\x00\x00\x00\xff\x00"
+
+
+@pytest.mark.asyncio
+async def test_file_round_trip_async(tmp_path):
+    """Test the async file helpers against each other."""
+    plain = tmp_path / "save.json"
+    plain.write_bytes(b'{"money": 1}')
+    encrypted = tmp_path / "save.sav"
+    encrypted.write_bytes(await encrypt_file_async(str(plain)))
+
+    assert await decrypt_file_async(str(encrypted)) == b'{"money": 1}'
@@ -0,0 +1,36 @@
+"""Tests for the JARVIS tool cache."""
+
+import pytest
+from amc_peripheral.devbot.tool_cache import ToolCacheStorage
+
+
+@pytest.fixture
+def tool_cache(tmp_path):
+    cache = ToolCacheStorage(db_path=str(tmp_path / "jarvis_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_nix_hash_miss(tool_cache):
+    assert tool_cache.get_nix_hash("https://example.com/a.zip", True) is None
+
+
+def test_nix_hash_roundtrip(tool_cache):
+    url = "https://example.com/a.zip"
+    tool_cache.set_nix_hash(url, True, "sha256-abc")
+
+    assert tool_cache.get_nix_hash(url, True) == "sha256-abc"
+    # unpack is part of the key
+    assert tool_cache.get_nix_hash(url, False) is None
+
+
+def test_nix_hash_persists(tmp_path):
+    db_path = str(tmp_path / "jarvis_cache.db")
+    cache = ToolCacheStorage(db_path=db_path)
+    cache.set_nix_hash("https://example.com/a.zip", False, "sha256-old")
+    cache.set_nix_hash("https://example.com/a.zip", False, "sha256-new")
+    cache.close()
+
+    reopened = ToolCacheStorage(db_path=db_path)
+    assert reopened.get_nix_hash("https://example.com/a.zip", False) == "sha256-new"
+    reopened.close()
@@ -0,0 +1,42 @@
+"""Tests for the Liquidsoap track event receiver."""
+
+import aiohttp
+import pytest
+from amc_peripheral.radio.track_events import TRACK_EVENTS_PATH, TrackEventServer
+
+
+@pytest.fixture
+async def server():
+    server = TrackEventServer(port=0)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def _url(server):
+    host, port = server._runner.addresses[0][:2]
+    return f"http://{host}:{port}{TRACK_EVENTS_PATH}"
+
+
+@pytest.mark.asyncio
+async def test_posted_metadata_is_queued(server):
+    """Test that each posted track lands on the queue in order."""
+    async with aiohttp.ClientSession() as session:
+        for filename in ("a.mp3", "b.mp3"):
+            async with session.post(_url(server), json={"filename": filename}) as resp:
+                assert resp.status == 204
+
+    assert server.queue.get_nowait() == {"filename": "a.mp3"}
+    assert server.queue.get_nowait() == {"filename": "b.mp3"}
+
+
+@pytest.mark.asyncio
+async def test_rejects_non_object_body(server):
+    """Test that a body that is not a JSON object is refused and not queued."""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(_url(server), data="not json") as resp:
+            assert resp.status == 400
+        async with session.post(_url(server), json=["a.mp3"]) as resp:
+            assert resp.status == 400
+
+    assert server.queue.empty()
@@ -1,27 +1,53 @@
+import aiohttp
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
-from amc_peripheral.bot.translation_cog import TranslationCog
+from unittest.mock import MagicMock
 
 
-@pytest.fixture
-def mock_bot():
+@pytest.fixture(scope="session")
+def translation_cog_cls():
+    # Imported on first use so collecting this module stays cheap
+    from amc_peripheral.bot.translation_cog import TranslationCog
+
+    return TranslationCog
+
+
+@pytest.fixture(scope="module")
+def bot_template():
     bot = MagicMock()
     bot.user = MagicMock()
     bot.user.id = 12345
-    bot.http_session = AsyncMock()
-    bot.loop = MagicMock()
-    bot.loop.create_task = MagicMock()
+    bot.http_session = MagicMock(spec=aiohttp.ClientSession)
     bot.tree = MagicMock()
     bot.tree.add_command = MagicMock()
     return bot
 
 
 @pytest.fixture
-def cog(mock_bot, tmp_path):
-    # Use temp db path for tests
-    db_path = str(tmp_path / "test_radio.db")
-    with patch("amc_peripheral.bot.translation_cog.RADIO_DB_PATH", db_path):
-        return TranslationCog(mock_bot)
+def mock_bot(bot_template):
+    # Built once per module; only the call records need clearing
+    bot_template.reset_mock()
+    return bot_template
+
+
+@pytest.fixture(scope="module", autouse=True)
+def translation_env():
+    with pytest.MonkeyPatch.context() as mp:
+        # The tests never call the API, so skip building real HTTP clients
+        mp.setattr("amc_peripheral.bot.translation_cog.AsyncOpenAI", MagicMock())
+        # Nothing here reads rows back, so the database can live in memory
+        mp.setattr("amc_peripheral.bot.translation_cog.RADIO_DB_PATH", ":memory:")
+        yield mp
+
+
+@pytest.fixture
+def cog(translation_cog_cls, mock_bot):
+    return translation_cog_cls(mock_bot)
+
+
+@pytest.fixture(scope="module")
+def shared_cog(translation_cog_cls, bot_template, translation_env):
+    # For tests that only inspect the cog and never change its state
+    return translation_cog_cls(bot_template)
 
 
 def test_translation_cog_init(cog):
@@ -31,29 +57,39 @@ def test_translation_cog_init(cog):
     assert cog.openai_client_openrouter is not None
 
 
-@pytest.mark.asyncio
-async def test_translate_method_exists(cog):
+def test_translate_method_exists(shared_cog):
     """Verify translate method exists and has correct signature."""
-    assert hasattr(cog, 'translate')
-    assert callable(cog.translate)
+    assert hasattr(shared_cog, 'translate')
+    assert callable(shared_cog.translate)
 
 
-@pytest.mark.asyncio
-async def test_translate_multi_method_exists(cog):
+def test_translate_multi_method_exists(shared_cog):
     """Verify translate_multi method exists and has correct signature."""
-    assert hasattr(cog, 'translate_multi')
-    assert callable(cog.translate_multi)
+    assert hasattr(shared_cog, 'translate_multi')
+    assert callable(shared_cog.translate_multi)
 
 
-@pytest.mark.asyncio
-async def test_translate_multi_with_english_method_exists(cog):
+def test_translate_multi_with_english_method_exists(shared_cog):
     """Verify translate_multi_with_english method exists and has correct signature."""
-    assert hasattr(cog, 'translate_multi_with_english')
-    assert callable(cog.translate_multi_with_english)
+    assert hasattr(shared_cog, 'translate_multi_with_english')
+    assert callable(shared_cog.translate_multi_with_english)
 
 
-@pytest.mark.asyncio
-async def test_translate_to_language_method_exists(cog):
+def test_translate_to_language_method_exists(shared_cog):
     """Verify translate_to_language method exists and has correct signature."""
-    assert hasattr(cog, 'translate_to_language')
-    assert callable(cog.translate_to_language)
+    assert hasattr(shared_cog, 'translate_to_language')
+    assert callable(shared_cog.translate_to_language)
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("**Alice:** hello", ("Alice", "hello")),
+        ("<t:1700000000:t> **Bob**: hi\nthere", ("Bob", "hi\nthere")),
+        ("Carol: hey", ("Carol", "hey")),
+        ("no prefix here", (None, "no prefix here")),
+    ],
+)
+def test_extract_username_and_content(shared_cog, message, expected):
+    """Test the username formats used by the game chat bridges."""
+    assert shared_cog.extract_username_and_content(message) == expected
@@ -0,0 +1,55 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from amc_peripheral.radio import tts
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts, "TTS_CACHE_PATH", str(tmp_path))
+    client = MagicMock()
+
+    async def synthesize_speech(input, voice, audio_config):
+        await asyncio.sleep(0.01)
+        return MagicMock(audio_content=b"mp3")
+
+    client.synthesize_speech = AsyncMock(side_effect=synthesize_speech)
+    monkeypatch.setattr(tts, "_get_client", lambda: client)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_tts_uses_disk_cache(client, tmp_path):
+    """Test that repeated text is served from disk instead of the API."""
+    assert await tts.tts("Hello") == b"mp3"
+    assert await tts.tts("Hello") == b"mp3"
+    assert client.synthesize_speech.await_count == 1
+
+    # A different voice setting is a different cache entry
+    await tts.tts("Hello", volume_gain_db=3.0)
+    assert client.synthesize_speech.await_count == 2
+    assert len(list(tmp_path.rglob("*.mp3"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_tts_coalesces_concurrent_requests(client):
+    """Test that identical concurrent requests share one API call."""
+    results = await asyncio.gather(*(tts.tts("Up next") for _ in range(5)))
+
+    assert results == [b"mp3"] * 5
+    assert client.synthesize_speech.await_count == 1
+    assert not tts._cache_locks
+
+
+def test_prune_cache_removes_oldest(tmp_path, monkeypatch):
+    """Test that pruning deletes the least recently used files first."""
+    monkeypatch.setattr(tts, "TTS_CACHE_PATH", str(tmp_path))
+    for age, name in enumerate(["new", "mid", "old"]):
+        path = tmp_path / name[:2] / f"{name}.mp3"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    assert tts.prune_cache(max_bytes=15) == 2
+    assert [p.name for p in tmp_path.rglob("*.mp3")] == ["new.mp3"]
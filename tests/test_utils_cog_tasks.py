@@ -1,38 +1,53 @@
+import aiohttp
 import pytest
-from unittest.mock import MagicMock, AsyncMock
+import discord
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 from discord.ext import tasks
 from amc_peripheral.bot.utils_cog import UtilsCog
 
 
-@pytest.fixture
-def mock_bot():
+@pytest.fixture(scope="module")
+def bot_template():
     bot = MagicMock()
     bot.tree = MagicMock()
     bot.user.id = 12345
     # Add http_session mock
-    bot.http_session = AsyncMock()
+    bot.http_session = MagicMock(spec=aiohttp.ClientSession)
     return bot
 
 
+@pytest.fixture
+def mock_bot(bot_template):
+    # Built once per module; only the call records need clearing
+    bot_template.reset_mock()
+    return bot_template
+
+
 @pytest.fixture
 def cog(mock_bot):
     return UtilsCog(mock_bot)
 
 
-@pytest.mark.asyncio
-async def test_tasks_exist(cog):
+@pytest.fixture(scope="module")
+def readonly_cog(bot_template):
+    # For tests that only inspect the cog and never change its state
+    return UtilsCog(bot_template)
+
+
+def test_tasks_exist(readonly_cog):
     """Verify that background tasks are defined as Loop objects on the Cog."""
-    assert hasattr(cog, "regular_announcement")
-    assert isinstance(cog.regular_announcement, tasks.Loop)
+    assert hasattr(readonly_cog, "regular_announcement")
+    assert isinstance(readonly_cog.regular_announcement, tasks.Loop)
 
-    assert hasattr(cog, "race_announcement")
-    assert isinstance(cog.race_announcement, tasks.Loop)
+    assert hasattr(readonly_cog, "race_announcement")
+    assert isinstance(readonly_cog.race_announcement, tasks.Loop)
 
-    assert hasattr(cog, "rent_reminders")
-    assert isinstance(cog.rent_reminders, tasks.Loop)
+    assert hasattr(readonly_cog, "rent_reminders")
+    assert isinstance(readonly_cog.rent_reminders, tasks.Loop)
 
-    assert hasattr(cog, "update_time_embed")
-    assert isinstance(cog.update_time_embed, tasks.Loop)
+    assert hasattr(readonly_cog, "update_time_embed")
+    assert isinstance(readonly_cog.update_time_embed, tasks.Loop)
 
 
 @pytest.mark.asyncio
@@ -62,10 +77,16 @@ async def test_cog_unload_cancels_tasks(cog):
     cog.update_time_embed.cancel = MagicMock()
 
     # Manually populate ctx_menus for unload test
-    cog.ctx_menus = [MagicMock(), MagicMock()]
+    cog.ctx_menus = [
+        SimpleNamespace(name="ctx1", type=discord.AppCommandType.message),
+        SimpleNamespace(name="ctx2", type=discord.AppCommandType.user),
+    ]
 
     await cog.cog_unload()
 
     cog.regular_announcement.cancel.assert_called_once()
     cog.rent_reminders.cancel.assert_called_once()
     cog.update_time_embed.cancel.assert_called_once()
+    cog.bot.tree.remove_command.assert_any_call(
+        "ctx1", type=discord.AppCommandType.message
+    )